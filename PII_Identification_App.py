@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
-import re
+
+from pii_engine import (HAVE_ARROW, PII_PATTERNS, default_workers, find_pii, highlight_matches,
+                        match_labels, scan_csv, scan_text)
+from scan_cache import ScanCache, content_hash, ruleset_version
 
 # -------------------------------------------------------------
 # Streamlit App: PII Data Identification and Classification
@@ -20,37 +23,36 @@ Upload a dataset (CSV or TXT) and this app will:
 # -------------------------------------------------------------
 uploaded_file = st.file_uploader("📂 Upload dataset", type=["csv", "txt"])
 
-def detect_pii(text):
-    """Detect possible PII using regex patterns"""
-    patterns = {
-        "Email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-        "Phone": r"\b\d{10}\b",
-        "Aadhaar/SSN": r"\b\d{12}\b|\b\d{3}-\d{2}-\d{4}\b",
-        "Credit Card": r"\b\d{4}-\d{4}-\d{4}-\d{4}\b",
-        "IP Address": r"\b(?:\d{1,3}\.){3}\d{1,3}\b"
-    }
+workers = st.sidebar.number_input(
+    "Scanner worker processes", min_value=1, max_value=default_workers(),
+    value=min(4, default_workers()), step=1,
+    help="CSV columns are split into shards and scanned on this many processes."
+)
+vectorized = st.sidebar.checkbox(
+    "Vectorized column scan", value=HAVE_ARROW,
+    help="Count PII per row with pandas/Arrow string kernels instead of the Python regex loop."
+)
 
-    found = []
-    for label, pattern in patterns.items():
-        if re.search(pattern, text):
-            found.append(label)
-    return found
+def detect_pii(text, matches=None):
+    """Detect possible PII using the combined regex matcher"""
+    if matches is None:
+        matches = find_pii(text)
+    return match_labels(matches)
 
 
-def highlight_pii(text):
+def highlight_pii(text, matches=None):
     """Highlights detected PII patterns in red"""
-    patterns = {
-        "Email": r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",
-        "Phone": r"(\b\d{10}\b)",
-        "Aadhaar/SSN": r"(\b\d{12}\b|\b\d{3}-\d{2}-\d{4}\b)",
-        "Credit Card": r"(\b\d{4}-\d{4}-\d{4}-\d{4}\b)",
-        "IP Address": r"((?:\d{1,3}\.){3}\d{1,3})"
-    }
+    if matches is None:
+        matches = find_pii(text)
+    return highlight_matches(text, matches)
+
 
-    highlighted_text = text
-    for label, pattern in patterns.items():
-        highlighted_text = re.sub(pattern, r'<span style="color:red; font-weight:bold;">\1</span>', highlighted_text)
-    return highlighted_text
+def show_detected_columns(placeholder, report):
+    """Render the columns with PII found so far"""
+    placeholder.markdown("\n".join(
+        f"- **{col}** → {', '.join(report.labels(col))}"
+        for col in report.counts if report.labels(col)
+    ))
 
 
 # -------------------------------------------------------------
@@ -67,23 +69,36 @@ if uploaded_file:
         try:
             # try utf-8 first; fallback to latin1
             try:
-                df = pd.read_csv(uploaded_file, encoding="utf-8")
+                preview_df = pd.read_csv(uploaded_file, encoding="utf-8", nrows=5)
             except UnicodeDecodeError:
                 uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file, encoding="latin1")
+                preview_df = pd.read_csv(uploaded_file, encoding="latin1", nrows=5)
+            uploaded_file.seek(0)
 
             st.write("### 🧾 Dataset Preview")
-            st.dataframe(df.head())
+            st.dataframe(preview_df)
 
             st.markdown("### 🔎 Detected PII Fields")
-            pii_report = []
 
-            for col in df.columns:
-                sample_text = " ".join(df[col].astype(str).values[:100])
-                pii_found = detect_pii(sample_text)
-                if pii_found:
-                    st.write(f"**{col}** → {', '.join(pii_found)}")
-                    pii_report.append({"Column": col, "Detected PII": ", ".join(pii_found)})
+            # Reuse the report of an identical earlier upload, if cached
+            digest = content_hash(uploaded_file)
+            cache = ScanCache("pii", ruleset_version(PII_PATTERNS, "csv", vectorized))
+            report = cache.get(digest)
+            status = st.empty()
+            live_results = st.empty()
+            if report is not None:
+                status.caption(f"Loaded cached scan of {report.rows_scanned:,} rows.")
+                show_detected_columns(live_results, report)
+            else:
+                # Stream the whole file in chunks; results refresh after every chunk
+                for report in scan_csv(uploaded_file, workers=int(workers), vectorized=vectorized):
+                    status.caption(f"Scanned {report.rows_scanned:,} rows...")
+                    show_detected_columns(live_results, report)
+                if report is not None:
+                    status.caption(f"Scanned all {report.rows_scanned:,} rows.")
+                    cache.put(digest, report)
+
+            pii_report = report.to_records() if report is not None else []
 
             if not pii_report:
                 st.info("No PII detected in this dataset.")
@@ -106,22 +121,34 @@ if uploaded_file:
     # ---------------------------------------------------------
     elif filename.endswith(".txt"):
         try:
-            try:
-                text = uploaded_file.read().decode("utf-8")
-            except UnicodeDecodeError:
-                uploaded_file.seek(0)
-                text = uploaded_file.read().decode("latin1")
-
+            head = uploaded_file.read(2000)
+            uploaded_file.seek(0)
             st.markdown("### 📄 Uploaded Text Preview")
-            st.code(text[:500])
-
-            pii_found = detect_pii(text)
+            st.code(head.decode("utf-8", errors="ignore")[:500])
+
+            digest = content_hash(uploaded_file)
+            cache = ScanCache("pii", ruleset_version(PII_PATTERNS, "txt"))
+            report = cache.get(digest)
+            status = st.empty()
+            if report is not None:
+                status.caption(f"Loaded cached scan of {report.rows_scanned:,} lines.")
+            else:
+                # Stream line by line; only lines containing PII are kept for display
+                for report in scan_text(uploaded_file):
+                    status.caption(f"Scanned {report.rows_scanned:,} lines...")
+                if report is not None:
+                    status.caption(f"Scanned all {report.rows_scanned:,} lines.")
+                    cache.put(digest, report)
+
+            pii_found = report.all_labels() if report is not None else []
             if pii_found:
                 st.markdown("### 🔎 Detected PII Elements:")
                 st.success(", ".join(pii_found))
 
                 st.markdown("### 🟥 Highlighted PII in Text")
-                st.markdown(highlight_pii(text), unsafe_allow_html=True)
+                st.caption(f"Showing the first {len(report.samples)} lines that contain PII.")
+                sample_text = "  \n".join(report.samples)
+                st.markdown(highlight_pii(sample_text, find_pii(sample_text)), unsafe_allow_html=True)
             else:
                 st.info("No PII detected in this text.")
 
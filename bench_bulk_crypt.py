@@ -0,0 +1,145 @@
+# bench_bulk_crypt.py
+# -------------------------------------------------------------
+# Benchmark: per-blob JSON encryption vs bulk_crypt jobs
+# -------------------------------------------------------------
+# A temporary tree of --files files of --size bytes each is encrypted and
+# decrypted file by file with the original helpers from hashing.py (a fresh
+# PBKDF2 derivation, Fernet and base64-in-JSON per blob), then by bulk_crypt
+# jobs (one KDF run per job, an HKDF file key and chunked AEAD container per
+# file) serially and on thread and process pools.  Every decrypted tree is compared with the source.
+# Usage:  python bench_bulk_crypt.py --files 100 --size 256KB --workers 8
+import argparse
+import base64
+import filecmp
+import json
+import os
+import secrets
+import shutil
+import tempfile
+import time
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from bulk_crypt import default_workers, iter_jobs, run_job
+from code_crypto import key_deriver
+from perf_utils import UNITS, parse_size
+
+PASSWORD = "bench-password"
+
+
+# ---------------- Previous implementation (for comparison) ----------------
+def derive_fernet_key(password: str, salt: bytes, iterations: int = 390000) -> bytes:
+    pwd = password.encode("utf-8")
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    key = kdf.derive(pwd)
+    return base64.urlsafe_b64encode(key)
+
+
+def encrypt_code_bytes(code_bytes: bytes, password: str) -> bytes:
+    salt = secrets.token_bytes(16)
+    key = derive_fernet_key(password, salt)
+    f = Fernet(key)
+    token = f.encrypt(code_bytes)
+    payload = {"salt": base64.b64encode(salt).decode("ascii"),
+               "ct": base64.b64encode(token).decode("ascii"),
+               "iters": 390000}
+    return json.dumps(payload).encode("utf-8")
+
+
+def decrypt_code_bytes(encrypted_json_bytes: bytes, password: str) -> bytes:
+    payload = json.loads(encrypted_json_bytes.decode("utf-8"))
+    salt = base64.b64decode(payload["salt"])
+    token = base64.b64decode(payload["ct"])
+    iterations = int(payload.get("iters", 390000))
+    key = derive_fernet_key(password, salt, iterations)
+    f = Fernet(key)
+    return f.decrypt(token)
+
+
+def per_blob(mode, src_root, dst_root):
+    """The hashing.py path, one file at a time; returns plaintext bytes."""
+    total = 0
+    for src, dst in iter_jobs(src_root, dst_root, mode, legacy=True):
+        if mode == "encrypt":
+            dst = dst[:-len(".enc")] + ".json"
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(src, "rb") as f:
+            data = f.read()
+        out = encrypt_code_bytes(data, PASSWORD) if mode == "encrypt" else decrypt_code_bytes(data, PASSWORD)
+        with open(dst, "wb") as f:
+            f.write(out)
+        total += len(data) if mode == "encrypt" else len(out)
+    return total
+
+
+# ---------------- Helpers ----------------
+def build_tree(root, n_files, size):
+    for i in range(n_files):
+        folder = os.path.join(root, f"batch{i % 10}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"artifact{i:05d}.bin"), "wb") as f:
+            f.write(os.urandom(size))
+
+
+def tree_bytes(root):
+    return sum(os.path.getsize(os.path.join(d, n)) for d, _, names in os.walk(root) for n in names)
+
+
+def same_tree(a, b):
+    cmp = filecmp.dircmp(a, b)
+    if cmp.left_only or cmp.right_only or cmp.diff_files:
+        return False
+    files = [os.path.join(d, n) for d, _, names in os.walk(a) for n in names]
+    return all(filecmp.cmp(p, os.path.join(b, os.path.relpath(p, a)), shallow=False) for p in files)
+
+
+# ---------------- Main ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-blob encryption with bulk_crypt jobs.")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size", default="256KB", help="bytes per file")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="bench_bulk_crypt_")
+    try:
+        src = os.path.join(work, "src")
+        build_tree(src, args.files, parse_size(args.size))
+        mb = tree_bytes(src) / UNITS["MB"]
+        print(f"{args.files:,} files, {mb:.1f} MB; {args.workers} workers")
+        print(f"{'impl':>16} {'encrypt s':>10} {'MB/s':>8} {'decrypt s':>10} {'MB/s':>8} {'out MB':>8} ok")
+
+        runs = {
+            "per-blob JSON": lambda mode, a, b: per_blob(mode, a, b),
+            "bulk serial": lambda mode, a, b: run_job(mode, a, b, PASSWORD, workers=1),
+            "bulk threads": lambda mode, a, b: run_job(mode, a, b, PASSWORD, workers=args.workers),
+            "bulk processes": lambda mode, a, b: run_job(mode, a, b, PASSWORD, workers=args.workers,
+                                                         pool="process"),
+        }
+        for name, run in runs.items():
+            enc, dec = os.path.join(work, "enc"), os.path.join(work, "dec")
+            start = time.perf_counter()
+            run("encrypt", src, enc)
+            t_enc = time.perf_counter() - start
+            key_deriver.cache.clear()  # decryption derives its own key, as in a separate job
+            start = time.perf_counter()
+            run("decrypt", enc, dec)
+            t_dec = time.perf_counter() - start
+            out_mb = tree_bytes(enc) / UNITS["MB"]
+            ok = "yes" if same_tree(src, dec) else "MISMATCH"
+            print(f"{name:>16} {t_enc:10.3f} {mb / t_enc:8.1f} {t_dec:10.3f} {mb / t_dec:8.1f} {out_mb:8.1f} {ok}")
+            shutil.rmtree(enc)
+            shutil.rmtree(dec)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
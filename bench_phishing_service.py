@@ -0,0 +1,116 @@
+# bench_phishing_service.py
+# -------------------------------------------------------------
+# Load test: concurrent single-URL requests against phishing_service.py
+# -------------------------------------------------------------
+# Starts the service in a subprocess (unless --url points at a running one),
+# opens --concurrency keep-alive connections and sends --requests GET /score
+# calls, a --repeat share of them for URLs already seen (cache hits).
+# Reports client-side QPS and p50/p99 latency plus the service's /metrics.
+# Usage:  python bench_phishing_service.py --requests 20000 --concurrency 64
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+from bench_url_features import synthetic_urls
+
+
+async def _get(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    if b" 200 " not in status:
+        raise RuntimeError(f"{status!r} {body!r}")
+    return json.loads(body)
+
+
+async def _client(host, port, paths, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            await _get(reader, writer, path)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def _wait_ready(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            await _get(reader, writer, "/health")
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def run(host, port, n_requests, concurrency, repeat):
+    urls = synthetic_urls(n_requests).tolist()
+    rng = np.random.default_rng(1)
+    repeated = rng.random(n_requests) < repeat
+    picks = rng.integers(0, max(int(n_requests * 0.01), 1), n_requests)
+    paths = [f"/score?url={quote(urls[p] if rep else u, safe='')}"
+             for u, rep, p in zip(urls, repeated, picks)]
+
+    await _wait_ready(host, port)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths[i::concurrency], latencies)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    metrics = await _get(reader, writer, "/metrics")
+    writer.close()
+    lat = np.array(latencies) * 1000
+    print(f"{n_requests:,} requests, {concurrency} connections, {repeat:.0%} repeated URLs")
+    print(f"client: {n_requests / elapsed:,.0f} QPS, p50 {np.percentile(lat, 50):.2f} ms, "
+          f"p99 {np.percentile(lat, 99):.2f} ms")
+    print(f"server: {json.dumps(metrics)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the phishing scoring service.")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--repeat", type=float, default=0.5, help="share of requests for repeated URLs")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--no-spawn", action="store_true", help="use a service already on --port")
+    args = parser.parse_args(argv)
+
+    server = None
+    if not args.no_spawn:
+        server = subprocess.Popen([sys.executable, "phishing_service.py", "--port", str(args.port),
+                                   "--max-batch", str(args.max_batch),
+                                   "--max-wait-ms", str(args.max_wait_ms)])
+    try:
+        asyncio.run(run("127.0.0.1", args.port, args.requests, args.concurrency, args.repeat))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
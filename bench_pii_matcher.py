@@ -0,0 +1,79 @@
+# bench_pii_matcher.py
+# -------------------------------------------------------------
+# Benchmark: per-pattern detect_pii/highlight_pii vs pii_engine.find_pii
+# -------------------------------------------------------------
+# Synthetic text is built by repeating sample_data.txt up to each size.
+# Usage:  python bench_pii_matcher.py --sizes 1MB 100MB 1GB
+# (the 1 GB run needs several GB of RAM because highlighting copies the text)
+import argparse
+import re
+
+from perf_utils import UNITS, parse_size, repo_path, timed
+from pii_engine import find_pii, highlight_matches, match_labels
+
+
+# ---------------- Previous implementation (for comparison) ----------------
+def legacy_detect_pii(text):
+    patterns = {
+        "Email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+        "Phone": r"\b\d{10}\b",
+        "Aadhaar/SSN": r"\b\d{12}\b|\b\d{3}-\d{2}-\d{4}\b",
+        "Credit Card": r"\b\d{4}-\d{4}-\d{4}-\d{4}\b",
+        "IP Address": r"\b(?:\d{1,3}\.){3}\d{1,3}\b"
+    }
+    found = []
+    for label, pattern in patterns.items():
+        if re.search(pattern, text):
+            found.append(label)
+    return found
+
+
+def legacy_highlight_pii(text):
+    patterns = {
+        "Email": r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",
+        "Phone": r"(\b\d{10}\b)",
+        "Aadhaar/SSN": r"(\b\d{12}\b|\b\d{3}-\d{2}-\d{4}\b)",
+        "Credit Card": r"(\b\d{4}-\d{4}-\d{4}-\d{4}\b)",
+        "IP Address": r"((?:\d{1,3}\.){3}\d{1,3})"
+    }
+    highlighted_text = text
+    for label, pattern in patterns.items():
+        highlighted_text = re.sub(pattern, r'<span style="color:red; font-weight:bold;">\1</span>', highlighted_text)
+    return highlighted_text
+
+
+# ---------------- Helpers ----------------
+def build_text(n_bytes, seed_path=repo_path("sample_data.txt")):
+    with open(seed_path, encoding="utf-8") as f:
+        seed = f.read()
+    reps = n_bytes // len(seed) + 1
+    return (seed * reps)[:n_bytes]
+
+
+def legacy(text):
+    return legacy_detect_pii(text), legacy_highlight_pii(text)
+
+
+def engine(text):
+    matches = find_pii(text)
+    return match_labels(matches), highlight_matches(text, matches)
+
+
+# ---------------- Main ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PII matchers on synthetic text.")
+    parser.add_argument("--sizes", nargs="+", default=["1MB", "100MB", "1GB"])
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>8} {'impl':>12} {'seconds':>9} {'MB/s':>9} labels")
+    for size in args.sizes:
+        text = build_text(parse_size(size))
+        mb = len(text) / UNITS["MB"]
+        for name, fn in (("per-pattern", legacy), ("find_pii", engine)):
+            elapsed, (labels, _) = timed(fn, text)
+            print(f"{size:>8} {name:>12} {elapsed:9.3f} {mb / elapsed:9.1f} {', '.join(labels)}")
+        del text
+
+
+if __name__ == "__main__":
+    main()
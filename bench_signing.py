@@ -0,0 +1,104 @@
+# bench_signing.py
+# -------------------------------------------------------------
+# Benchmark: signatures/sec for the digital.py signing paths
+# -------------------------------------------------------------
+# --messages transaction strings are signed and verified by:
+#   per-click   the previous button handler: a fresh RSA-2048 key pair and
+#               new PSS padding objects for every message (run on a
+#               --keygen-sample of the messages, it is that slow)
+#   rsa-pss     the cached keystore pair, serially and with sign_batch
+#   ed25519     the same for Ed25519
+# A keystore in a temporary directory is used, so no real keys are touched.
+# Usage:  python bench_signing.py --messages 5000 --workers 4
+import argparse
+import shutil
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from perf_utils import timed
+from signing import MODES, SIGN_WORKERS, load_keypair, sign_batch, sign_message, verify_batch
+
+
+# ---------------- Previous implementation (for comparison) ----------------
+def generate_keys():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key()
+    return private_key, public_key
+
+
+def legacy_sign_message(private_key, message):
+    signature = private_key.sign(
+        message.encode(),
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        ),
+        hashes.SHA256()
+    )
+    return signature
+
+
+def legacy_verify_signature(public_key, message, signature):
+    try:
+        public_key.verify(
+            signature,
+            message.encode(),
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.MAX_LENGTH
+            ),
+            hashes.SHA256()
+        )
+        return True
+    except Exception:
+        return False
+
+
+def per_click(messages):
+    """Sign + verify as the old button did; returns (seconds, all verified)."""
+    start = time.perf_counter()
+    ok = True
+    for message in messages:
+        private_key, public_key = generate_keys()
+        ok &= legacy_verify_signature(public_key, message, legacy_sign_message(private_key, message))
+    return time.perf_counter() - start, ok
+
+
+# ---------------- Helpers ----------------
+def report(name, n, sign_s, verify_s, ok):
+    verify = f"{n / verify_s:12,.0f}" if verify_s else f"{'-':>12}"
+    print(f"{name:>22} {n:9,} {n / sign_s:12,.0f} {verify} {'yes' if ok else 'NO'}")
+
+
+# ---------------- Main ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure signatures/sec for each signing mode.")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--keygen-sample", type=int, default=50, help="messages for the per-click path")
+    parser.add_argument("--workers", type=int, default=SIGN_WORKERS)
+    args = parser.parse_args(argv)
+
+    messages = [f"Payment of ${i % 997 + 1} to account {i:08d}" for i in range(args.messages)]
+    keystore = tempfile.mkdtemp(prefix="bench_signing_")
+    try:
+        print(f"{'path':>22} {'messages':>9} {'signs/s':>12} {'verifies/s':>12} ok")
+        sample = messages[:args.keygen_sample]
+        seconds, ok = per_click(sample)
+        report("per-click keygen", len(sample), seconds, None, ok)
+        for mode in MODES:
+            keypair = load_keypair(mode, keystore)
+            sign_s, signatures = timed(lambda: [sign_message(keypair, m) for m in messages])
+            verify_s, verified = timed(verify_batch, keypair.public_key, messages, signatures, 1)
+            report(f"{mode} serial", len(messages), sign_s, verify_s, all(verified))
+            sign_s, signatures = timed(sign_batch, keypair, messages, args.workers)
+            verify_s, verified = timed(verify_batch, keypair.public_key, messages, signatures, args.workers)
+            report(f"{mode} batch x{args.workers}", len(messages), sign_s, verify_s, all(verified))
+    finally:
+        shutil.rmtree(keystore, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+# code_crypto.py
+# -------------------------------------------------------------
+# Password-based encryption of code blobs (the Encrypt & Run app)
+# -------------------------------------------------------------
+# Key derivation is the expensive step: 390,000 PBKDF2 rounds, or a
+# memory-hard scrypt/Argon2id run, per blob.  Derived keys are kept in an
+# in-memory cache bounded in size and expiring KEY_TTL seconds after they
+# were derived, keyed by (password digest, salt, KDF parameters).  The
+# password itself is never stored: the digest is an HMAC under a random
+# per-process secret.  Derivations run on a thread pool (the KDFs release
+# the GIL), so concurrent sessions don't serialize on the Streamlit thread,
+# and simultaneous requests for the same key share one derivation.
+#
+# The KDF parameter set travels in the payload ("kdf"):
+#   {"name": "pbkdf2-sha256", "iterations": 390000}
+#   {"name": "scrypt", "n": 65536, "r": 8, "p": 1}
+#   {"name": "argon2id", "iterations": 3, "lanes": 4, "memory_kib": 65536}
+# Payloads without one (the original format) are PBKDF2 with "iters" rounds.
+# Parameters read from a payload are bounded (MAX_KDF_MEMORY etc.), so a
+# crafted blob can't tie up the server.
+#
+# Two payload formats:
+#   JSON (original)  Fernet token, base64 inside JSON; the whole blob in memory
+#   container        binary: a header (magic, cipher, chunk size, salt, KDF
+#                    parameters, nonce prefix, file salt) followed by
+#                    fixed-size chunks, each sealed with AES-256-GCM or
+#                    ChaCha20-Poly1305
+# A container is never sealed with the password-derived key itself but with
+# a file key, HKDF-SHA256(derived key, file salt): batches that stretch the
+# password once for many files (bulk_crypt) still use one AEAD key per file,
+# so the short per-file nonce prefix can't collide across files.
+# (Version 1 containers, without a file salt, use the derived key directly.)
+# Container chunks are authenticated independently, with the header as
+# associated data and a nonce of (prefix, chunk index, last-chunk flag), so
+# chunks can't be reordered, dropped or appended and the file can't be
+# truncated.  Files are encrypted and decrypted as streams in constant
+# memory, chunks can be decrypted in parallel, and Container reads any
+# byte range without touching the rest.  decrypt_payload() reads both.
+import base64
+import hashlib
+import hmac
+import io
+import json
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id  # cryptography 44+
+    HAVE_ARGON2 = True
+except ImportError:
+    HAVE_ARGON2 = False
+
+PBKDF2_ITERATIONS = 390000
+KEY_LENGTH = 32
+SALT_BYTES = 16
+KEY_CACHE_SIZE = int(os.environ.get("KDF_CACHE_SIZE", 256))
+KEY_TTL = float(os.environ.get("KDF_CACHE_TTL", 600))
+KDF_WORKERS = int(os.environ.get("KDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+# ---------------- KDF Parameters ----------------
+KDF_PRESETS = {
+    "pbkdf2-sha256": {"name": "pbkdf2-sha256", "iterations": PBKDF2_ITERATIONS},
+    "scrypt": {"name": "scrypt", "n": 2 ** 16, "r": 8, "p": 1},
+    "argon2id": {"name": "argon2id", "iterations": 3, "lanes": 4, "memory_kib": 64 * 1024},  # RFC 9106
+}
+DEFAULT_KDF = "pbkdf2-sha256"
+
+# upper bounds for parameters taken from a payload
+MAX_KDF_MEMORY = 256 * 1024 * 1024
+MAX_PBKDF2_ITERATIONS = 10_000_000
+MAX_ARGON2_ITERATIONS = 64
+MAX_LANES = 64
+
+
+def available_kdfs():
+    """Names of the KDF presets this installation can derive with."""
+    return [name for name in KDF_PRESETS if name != "argon2id" or HAVE_ARGON2]
+
+
+def _bounded(params, field, low, high):
+    value = params.get(field)
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        raise ValueError(f"{params.get('name')}: {field} must be an integer in [{low}, {high}], got {value!r}")
+    return value
+
+
+def kdf_params(kdf=None):
+    """
+    Validated parameter dict for `kdf`: None (the default preset), a preset
+    name, or a parameter dict as stored in a payload.  Raises ValueError for
+    unknown or out-of-range parameters.
+    """
+    if kdf is None:
+        kdf = DEFAULT_KDF
+    if isinstance(kdf, str):
+        if kdf not in KDF_PRESETS:
+            raise ValueError(f"Unknown KDF preset {kdf!r}; choose from {sorted(KDF_PRESETS)}")
+        kdf = KDF_PRESETS[kdf]
+    if not isinstance(kdf, dict):
+        raise ValueError(f"KDF parameters must be a dict, got {type(kdf).__name__}")
+    name = kdf.get("name")
+    if name == "pbkdf2-sha256":
+        return {"name": name, "iterations": _bounded(kdf, "iterations", 1, MAX_PBKDF2_ITERATIONS)}
+    if name == "scrypt":
+        params = {"name": name, "n": _bounded(kdf, "n", 2, 2 ** 30), "r": _bounded(kdf, "r", 1, 64),
+                  "p": _bounded(kdf, "p", 1, 16)}
+        if params["n"] & (params["n"] - 1):
+            raise ValueError(f"scrypt: n must be a power of 2, got {params['n']}")
+        if 128 * params["n"] * params["r"] > MAX_KDF_MEMORY:
+            raise ValueError(f"scrypt: n * r needs more than {MAX_KDF_MEMORY // 2 ** 20} MiB")
+        return params
+    if name == "argon2id":
+        if not HAVE_ARGON2:
+            raise ValueError("argon2id needs cryptography 44 or newer")
+        lanes = _bounded(kdf, "lanes", 1, MAX_LANES)
+        return {"name": name, "iterations": _bounded(kdf, "iterations", 1, MAX_ARGON2_ITERATIONS),
+                "lanes": lanes, "memory_kib": _bounded(kdf, "memory_kib", 8 * lanes, MAX_KDF_MEMORY // 1024)}
+    raise ValueError(f"Unknown KDF {name!r}")
+
+
+def derive_key(password, salt, params):
+    """Raw KEY_LENGTH-byte key for `password` (str) and `salt`; uncached, on the calling thread."""
+    pwd = password.encode("utf-8")
+    name = params["name"]
+    if name == "pbkdf2-sha256":
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=KEY_LENGTH, salt=salt,
+                         iterations=params["iterations"])
+    elif name == "scrypt":
+        kdf = Scrypt(salt=salt, length=KEY_LENGTH, n=params["n"], r=params["r"], p=params["p"])
+    else:
+        kdf = Argon2id(salt=salt, length=KEY_LENGTH, iterations=params["iterations"],
+                       lanes=params["lanes"], memory_cost=params["memory_kib"])
+    return kdf.derive(pwd)
+
+
+# ---------------- Key Cache ----------------
+class KeyCache:
+    """Thread-safe LRU of derived keys; entries expire `ttl` seconds after they were added."""
+
+    def __init__(self, maxsize=KEY_CACHE_SIZE, ttl=KEY_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expires, derived key)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class KeyDeriver:
+    """
+    Derives keys on a thread pool through a KeyCache.  submit() returns a
+    Future; requests for a key that is already being derived get the same one.
+    """
+
+    def __init__(self, workers=KDF_WORKERS, cache=None):
+        self.cache = cache if cache is not None else KeyCache()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kdf")
+        self._pending = {}
+        self._lock = threading.RLock()  # done-callbacks may run inside submit()
+        self._secret = secrets.token_bytes(32)
+
+    def _cache_key(self, password, salt, params):
+        digest = hmac.new(self._secret, password.encode("utf-8"), hashlib.sha256).digest()
+        return digest, bytes(salt), tuple(sorted(params.items()))
+
+    def submit(self, password, salt, kdf=None):
+        """Future for the raw key; resolved immediately on a cache hit."""
+        params = kdf_params(kdf)
+        key = self._cache_key(password, salt, params)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool.submit(derive_key, password, bytes(salt), params)
+                self._pending[key] = future
+                future.add_done_callback(lambda f: self._finish(key, f))
+            return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if not future.cancelled() and future.exception() is None:
+                self.cache.put(key, future.result())
+
+    def derive(self, password, salt, kdf=None):
+        return self.submit(password, salt, kdf).result()
+
+    def derive_many(self, requests):
+        """Raw keys for [(password, salt, kdf), ...], derived concurrently, in order."""
+        futures = [self.submit(password, salt, kdf) for password, salt, kdf in requests]
+        return [future.result() for future in futures]
+
+
+# one per process, so the cache outlives Streamlit reruns and is shared by sessions
+key_deriver = KeyDeriver()
+
+
+# ---------------- Fernet Payloads ----------------
+def derive_fernet_key(password, salt, iterations=PBKDF2_ITERATIONS, kdf=None):
+    """
+    Urlsafe-base64 Fernet key for `password` and `salt`: PBKDF2-HMAC-SHA256
+    with `iterations` rounds unless a `kdf` parameter set is given.  Cached.
+    """
+    if kdf is None:
+        kdf = {"name": "pbkdf2-sha256", "iterations": iterations}
+    return base64.urlsafe_b64encode(key_deriver.derive(password, salt, kdf))
+
+
+def payload_kdf(payload):
+    """KDF parameters of a JSON payload; the original format only records PBKDF2 "iters"."""
+    if "kdf" in payload:
+        return kdf_params(payload["kdf"])
+    return kdf_params({"name": "pbkdf2-sha256", "iterations": int(payload.get("iters", PBKDF2_ITERATIONS))})
+
+
+def encrypt_code_bytes(code_bytes, password, kdf=None):
+    """
+    Encrypt code bytes with a password.
+    Returns JSON bytes: {"salt": base64..., "ct": base64..., "kdf": {...}}
+    (plus "iters" for PBKDF2, so older readers can still decrypt it).
+    """
+    params = kdf_params(kdf)
+    salt = secrets.token_bytes(SALT_BYTES)
+    token = Fernet(derive_fernet_key(password, salt, kdf=params)).encrypt(code_bytes)
+    payload = {"salt": base64.b64encode(salt).decode("ascii"),
+               "ct": base64.b64encode(token).decode("ascii"),
+               "kdf": params}
+    if params["name"] == "pbkdf2-sha256":
+        payload["iters"] = params["iterations"]
+    return json.dumps(payload).encode("utf-8")
+
+
+def decrypt_code_bytes(encrypted_json_bytes, password):
+    """
+    Decrypt a JSON blob produced by encrypt_code_bytes (any version).
+    Raises InvalidToken on wrong password / corrupted blob, ValueError on
+    unsupported KDF parameters.
+    """
+    payload = json.loads(encrypted_json_bytes.decode("utf-8"))
+    salt = base64.b64decode(payload["salt"])
+    token = base64.b64decode(payload["ct"])
+    key = derive_fernet_key(password, salt, kdf=payload_kdf(payload))
+    return Fernet(key).decrypt(token)  # may raise InvalidToken
+
+
+# ---------------- Chunked Container ----------------
+MAGIC = b"DSPC"
+CONTAINER_VERSION = 2
+CONTAINER_VERSIONS = (1, 2)  # readable
+CHUNK_SIZE = 256 * 1024
+MIN_CHUNK_SIZE = 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+TAG_BYTES = 16
+NONCE_PREFIX_BYTES = 7  # + 4-byte chunk index + 1-byte last flag = 12-byte nonce
+FILE_SALT_BYTES = 16
+FILE_KEY_INFO = b"DSPC file key"
+CIPHERS = {"aes-256-gcm": (1, AESGCM), "chacha20-poly1305": (2, ChaCha20Poly1305)}
+DEFAULT_CIPHER = "aes-256-gcm"
+_CIPHER_IDS = {cid: name for name, (cid, _) in CIPHERS.items()}
+_FIXED = struct.Struct(">4sBBIBH")  # magic, version, cipher id, chunk size, salt length, kdf length
+
+
+@dataclass(frozen=True)
+class ContainerHeader:
+    cipher: str
+    chunk_size: int
+    salt: bytes
+    kdf: dict
+    nonce_prefix: bytes
+    raw: bytes  # the encoded header, authenticated with every chunk
+    file_salt: bytes = b""  # empty in version 1 containers
+
+    @property
+    def size(self):
+        return len(self.raw)
+
+    @property
+    def key_id(self):
+        """(salt, KDF parameters): containers sharing it derive their file keys from the same key."""
+        return self.salt, tuple(sorted(self.kdf.items()))
+
+    @classmethod
+    def new(cls, kdf=None, cipher=DEFAULT_CIPHER, chunk_size=CHUNK_SIZE, salt=None):
+        """
+        Header for a new container; pass `salt` to stretch the password once
+        for a batch of files (each still gets its own file salt, and key).
+        """
+        if cipher not in CIPHERS:
+            raise ValueError(f"Unknown cipher {cipher!r}; choose from {sorted(CIPHERS)}")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be in [{MIN_CHUNK_SIZE}, {MAX_CHUNK_SIZE}]")
+        params = kdf_params(kdf)
+        salt = secrets.token_bytes(SALT_BYTES) if salt is None else bytes(salt)
+        prefix = secrets.token_bytes(NONCE_PREFIX_BYTES)
+        file_salt = secrets.token_bytes(FILE_SALT_BYTES)
+        kdf_json = json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        raw = (_FIXED.pack(MAGIC, CONTAINER_VERSION, CIPHERS[cipher][0], chunk_size, len(salt), len(kdf_json))
+               + salt + kdf_json + prefix + file_salt)
+        return cls(cipher, chunk_size, salt, params, prefix, raw, file_salt)
+
+    @classmethod
+    def read(cls, f):
+        """Parse the header at the current position of binary file `f`; ValueError if it isn't one."""
+        fixed = f.read(_FIXED.size)
+        if len(fixed) < _FIXED.size or not fixed.startswith(MAGIC):
+            raise ValueError("Not an encrypted container")
+        _, version, cipher_id, chunk_size, salt_len, kdf_len = _FIXED.unpack(fixed)
+        if version not in CONTAINER_VERSIONS:
+            raise ValueError(f"Unsupported container version {version}")
+        if cipher_id not in _CIPHER_IDS:
+            raise ValueError(f"Unknown cipher id {cipher_id}")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE or kdf_len > 1024:
+            raise ValueError("Corrupted container header")
+        file_salt_len = FILE_SALT_BYTES if version >= 2 else 0
+        end = salt_len + kdf_len + NONCE_PREFIX_BYTES
+        rest = f.read(end + file_salt_len)
+        if len(rest) < end + file_salt_len:
+            raise ValueError("Truncated container header")
+        try:
+            kdf = kdf_params(json.loads(rest[salt_len:salt_len + kdf_len].decode("utf-8")))
+        except UnicodeDecodeError:
+            raise ValueError("Corrupted container header") from None
+        return cls(_CIPHER_IDS[cipher_id], chunk_size, rest[:salt_len], kdf,
+                   rest[salt_len + kdf_len:end], fixed + rest, rest[end:])
+
+    def file_key(self, key):
+        """The key this container is sealed with, from the password-derived `key`."""
+        if not self.file_salt:
+            return key
+        return HKDF(algorithm=hashes.SHA256(), length=KEY_LENGTH, salt=self.file_salt,
+                    info=FILE_KEY_INFO).derive(key)
+
+    def aead(self, password=None, key=None):
+        """AEAD instance for the password-derived `key`, or derived from `password` (through the key cache)."""
+        if key is None:
+            key = key_deriver.derive(password, self.salt, self.kdf)
+        return CIPHERS[self.cipher][1](self.file_key(key))
+
+    def nonce(self, index, last):
+        return self.nonce_prefix + struct.pack(">IB", index, last)
+
+
+def _read_full(f, n):
+    """Up to n bytes; short only at end of stream."""
+    parts, remaining = [], n
+    while remaining:
+        data = f.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+
+def _ordered_map(fn, items, workers):
+    """fn over items on up to `workers` threads, results in order, at most 2 * workers in flight."""
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aead") as pool:
+        window = deque()
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def _iter_marked(f, size):
+    """(index, block, is_last) for consecutive `size`-byte blocks; one empty block for empty input."""
+    index, block = 0, _read_full(f, size)
+    while True:
+        following = _read_full(f, size)
+        yield index, block, not following
+        if not following:
+            return
+        index, block = index + 1, following
+
+
+def seal_stream(src, dst, header, aead, workers=1):
+    """Write `header` and the sealed chunks of binary stream `src` to `dst`; returns the plaintext size."""
+    dst.write(header.raw)
+    total = 0
+
+    def seal(item):
+        index, block, last = item
+        return len(block), aead.encrypt(header.nonce(index, last), block, header.raw)
+
+    for size, sealed in _ordered_map(seal, _iter_marked(src, header.chunk_size), workers):
+        dst.write(sealed)
+        total += size
+    return total
+
+
+def open_stream(src, dst, header, aead, workers=1):
+    """
+    Decrypt the chunks following `header` in `src` into `dst`; returns the
+    plaintext size.  Raises InvalidToken on a wrong key or a modified,
+    reordered or truncated file.
+    """
+    total = 0
+
+    def open_chunk(item):
+        index, sealed, last = item
+        try:
+            return aead.decrypt(header.nonce(index, last), sealed, header.raw)
+        except InvalidTag:
+            raise InvalidToken from None
+
+    for block in _ordered_map(open_chunk, _iter_marked(src, header.chunk_size + TAG_BYTES), workers):
+        dst.write(block)
+        total += len(block)
+    return total
+
+
+def encrypt_stream(src, dst, password, kdf=None, cipher=DEFAULT_CIPHER, chunk_size=CHUNK_SIZE, workers=1):
+    """Encrypt binary stream `src` into `dst` as a container; returns the plaintext size."""
+    header = ContainerHeader.new(kdf, cipher, chunk_size)
+    return seal_stream(src, dst, header, header.aead(password), workers)
+
+
+def decrypt_stream(src, dst, password, workers=1):
+    """Decrypt a container from binary stream `src` into `dst`; returns the plaintext size."""
+    header = ContainerHeader.read(src)
+    return open_stream(src, dst, header, header.aead(password), workers)
+
+
+class Container:
+    """
+    Random access to a container in a seekable binary file: read_chunk(i)
+    and read(offset, length) decrypt only the chunks they need.  Safe to use
+    from several threads.
+    """
+
+    def __init__(self, f, password):
+        self.f = f
+        f.seek(0)
+        self.header = ContainerHeader.read(f)
+        self._aead = self.header.aead(password)
+        self._lock = threading.Lock()
+        body = f.seek(0, os.SEEK_END) - self.header.size
+        if body < TAG_BYTES:
+            raise InvalidToken
+        stride = self.header.chunk_size + TAG_BYTES
+        self.chunks = -(-body // stride)
+        last = body - (self.chunks - 1) * stride
+        if last < TAG_BYTES:
+            raise InvalidToken
+        self.size = (self.chunks - 1) * self.header.chunk_size + last - TAG_BYTES
+
+    def read_chunk(self, index):
+        if not 0 <= index < self.chunks:
+            raise IndexError(f"chunk {index} out of range (0..{self.chunks - 1})")
+        stride = self.header.chunk_size + TAG_BYTES
+        with self._lock:
+            self.f.seek(self.header.size + index * stride)
+            sealed = _read_full(self.f, stride)
+        try:
+            return self._aead.decrypt(self.header.nonce(index, index == self.chunks - 1), sealed, self.header.raw)
+        except InvalidTag:
+            raise InvalidToken from None
+
+    def read(self, offset=0, length=None):
+        """Plaintext bytes [offset, offset + length)."""
+        end = self.size if length is None else min(self.size, offset + length)
+        if offset >= end:
+            return b""
+        chunk = self.header.chunk_size
+        first, last = offset // chunk, (end - 1) // chunk
+        data = b"".join(self.read_chunk(i) for i in range(first, last + 1))
+        return data[offset - first * chunk:end - first * chunk]
+
+
+# ---------------- Files ----------------
+@contextmanager
+def atomic_output(path):
+    """Binary file object whose content replaces `path` only if the block completes."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def is_container(data):
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def encrypt_file(src_path, dst_path, password, kdf=None, cipher=DEFAULT_CIPHER, chunk_size=CHUNK_SIZE,
+                 workers=1):
+    with open(src_path, "rb") as src, atomic_output(dst_path) as dst:
+        return encrypt_stream(src, dst, password, kdf, cipher, chunk_size, workers)
+
+
+def decrypt_file(src_path, dst_path, password, workers=1):
+    """Decrypt a container or a JSON payload file; nothing is written unless it authenticates."""
+    with open(src_path, "rb") as src, atomic_output(dst_path) as dst:
+        if is_container(src.read(len(MAGIC))):
+            src.seek(0)
+            return decrypt_stream(src, dst, password, workers)
+        src.seek(0)
+        plain = decrypt_code_bytes(src.read(), password)
+        dst.write(plain)
+        return len(plain)
+
+
+def encrypt_container_bytes(data, password, kdf=None, cipher=DEFAULT_CIPHER, chunk_size=CHUNK_SIZE):
+    out = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), out, password, kdf, cipher, chunk_size)
+    return out.getvalue()
+
+
+def decrypt_payload(data, password):
+    """Plaintext of a container or a JSON payload (bytes)."""
+    if is_container(data):
+        out = io.BytesIO()
+        decrypt_stream(io.BytesIO(data), out, password)
+        return out.getvalue()
+    return decrypt_code_bytes(data, password)
@@ -1,40 +1,12 @@
 import streamlit as st
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
-from cryptography.hazmat.primitives import hashes, serialization
 import jwt
 import datetime
 
-# ---------------- RSA Digital Signature ----------------
-def generate_keys():
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    public_key = private_key.public_key()
-    return private_key, public_key
-
-def sign_message(private_key, message):
-    signature = private_key.sign(
-        message.encode(),
-        padding.PSS(
-            mgf=padding.MGF1(hashes.SHA256()),
-            salt_length=padding.PSS.MAX_LENGTH
-        ),
-        hashes.SHA256()
-    )
-    return signature
-
-def verify_signature(public_key, message, signature):
-    try:
-        public_key.verify(
-            signature,
-            message.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
-        return True
-    except Exception:
-        return False
+from signing import load_keypair, rotate_keypair, sign_batch, sign_message, verify_batch, verify_signature
+
+# ---------------- Digital Signature ----------------
+# Key pairs come from the keystore (signing.py), loaded once per process.
+MODE_LABELS = {"RSA-2048 (PSS)": "rsa-pss", "Ed25519": "ed25519"}
 
 # ---------------- Authentication & JWT ----------------
 SECRET_KEY = "my_super_secret_key"
@@ -76,21 +48,34 @@ col1, col2 = st.columns(2)
 # -------- Column 1: Digital Signature --------
 with col1:
     st.markdown("### 🖊 Digital Signature")
+    mode = MODE_LABELS[st.radio("Signature scheme", list(MODE_LABELS), horizontal=True, key="ds_mode")]
     message = st.text_area("Enter transaction/message:", value="Payment of $100 to Bob", key="ds_message")
-    if st.button("Generate Keys & Sign", key="ds_sign_btn"):
-        private_key, public_key = generate_keys()
-        signature = sign_message(private_key, message)
+    sign_col, rotate_col = st.columns(2)
+    if rotate_col.button("Rotate Keys", key="ds_rotate_btn"):
+        rotated = rotate_keypair(mode)
+        st.warning(f"New {mode} key pair {rotated.key_id}; earlier signatures no longer verify against it.")
+    if sign_col.button("Sign", key="ds_sign_btn"):
+        keypair = load_keypair(mode)
+        signature = sign_message(keypair, message)
         st.success("Message signed successfully!")
         st.code(signature.hex(), language="bash")
 
-        verified = verify_signature(public_key, message, signature)
+        verified = verify_signature(keypair.public_key, message, signature)
         st.info(f"Signature Verified: {'Valid' if verified else 'Invalid'}")
 
-        pem = public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        )
-        st.text_area("Public Key (share with recipient):", pem.decode(), height=150)
+        st.text_area(f"Public Key {keypair.key_id} (share with recipient):", keypair.public_pem().decode(),
+                     height=150)
+
+    with st.expander("Batch signing"):
+        batch_text = st.text_area("Transactions (one per line):", key="ds_batch",
+                                  value="Payment of $100 to Bob\nPayment of $25 to Alice\nRefund of $10 to Nakul")
+        if st.button("Sign & Verify Batch", key="ds_batch_btn"):
+            messages = [line for line in batch_text.splitlines() if line.strip()]
+            keypair = load_keypair(mode)
+            signatures = sign_batch(keypair, messages)
+            verified = verify_batch(keypair.public_key, messages, signatures)
+            st.dataframe([{"Message": m, "Signature": s.hex(), "Verified": v}
+                          for m, s, v in zip(messages, signatures, verified)], hide_index=True)
 
 # -------- Column 2: Authentication & Authorization --------
 with col2:
@@ -0,0 +1,238 @@
+# domain_reputation.py
+# -------------------------------------------------------------
+# Domain reputation index: blocklist/allowlist with suffix matching
+# -------------------------------------------------------------
+# Every listed domain covers itself and all of its subdomains, so listing
+# "evil.com" also flags "login.evil.com" but not "notevil.com".  A lookup
+# hashes each label suffix of the host ("a.b.evil.com", "b.evil.com",
+# "evil.com", "com"), most specific first, and probes an open-addressing
+# hash table; the first listed suffix decides.  Cost depends on the number
+# of labels in the host, not on the size of the lists.
+#
+# The table is two flat arrays (8-byte key hashes + 1-byte verdicts, about
+# 18 bytes per domain at the default load factor) and is saved as one binary
+# file that load() memory-maps, so opening a multi-million-entry list is
+# instant.
+#
+#   python domain_reputation.py build --block blocklist.txt --allow allowlist.txt -o reputation.bin
+#   python domain_reputation.py lookup reputation.bin http://login.evil.com/x bob@bad.example
+import argparse
+import hashlib
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+REPUTATION_PATH = os.environ.get("DOMAIN_REPUTATION", "reputation.bin")
+
+UNKNOWN, BLOCK, ALLOW = 0, 1, 2
+VERDICT_NAMES = {UNKNOWN: "unknown", BLOCK: "blocked", ALLOW: "allowed"}
+
+MAGIC = b"DREP0001"
+HEADER = struct.Struct("<8sQQ")  # magic, capacity, count
+LOAD_FACTOR = 0.5
+
+
+# ---------------- Domains ----------------
+def host_of(value):
+    """
+    Lower-case host name from a URL, e-mail address or bare domain:
+    "HTTPS://user@Login.Evil.com:8443/x" -> "login.evil.com", "bob@bad.example" -> "bad.example".
+    """
+    value = str(value).strip().lower()
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    for sep in "/?#":
+        value = value.split(sep, 1)[0]
+    value = value.rsplit("@", 1)[-1]
+    if value.startswith("["):  # IPv6 literal
+        return value.split("]", 1)[0] + "]"
+    value = value.split(":", 1)[0].strip(".")
+    if not value.isascii():
+        try:
+            value = value.encode("idna").decode("ascii")
+        except UnicodeError:
+            pass
+    return value
+
+
+def suffixes(host):
+    """Label suffixes of `host`, most specific first ("a.b.c" -> "a.b.c", "b.c", "c")."""
+    out = []
+    start = 0
+    while start < len(host):
+        dot = host.find(".", start)
+        if dot != start:
+            out.append(host[start:])
+        if dot < 0:
+            break
+        start = dot + 1
+    return out
+
+
+def _key(domain):
+    """Stable 64-bit key for a domain (0 marks an empty slot, so it is never used)."""
+    key = int.from_bytes(hashlib.blake2b(domain.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+# ---------------- Index ----------------
+class DomainReputation:
+    """Open-addressing hash table of domain keys -> BLOCK / ALLOW."""
+
+    def __init__(self, keys, verdicts, count):
+        self._keys = keys
+        self._verdicts = verdicts
+        # memoryviews index to plain ints several times faster than NumPy scalars
+        self._key_view = memoryview(keys.view(np.uint64))
+        self._verdict_view = memoryview(verdicts.view(np.uint8))
+        self._mask = len(keys) - 1
+        self._count = count
+        self._fingerprint = None
+
+    @classmethod
+    def empty(cls, capacity=8):
+        return cls(np.zeros(capacity, dtype=np.uint64), np.zeros(capacity, dtype=np.uint8), 0)
+
+    @classmethod
+    def from_lists(cls, block=(), allow=()):
+        """Build from iterables of domains (or URLs/e-mails).  Allow entries override block entries."""
+        entries = {}
+        for verdict, domains in ((BLOCK, block), (ALLOW, allow)):
+            for domain in domains:
+                host = host_of(domain)
+                if host and not host.startswith("#"):
+                    entries[host] = verdict
+        capacity = 8
+        while capacity * LOAD_FACTOR < len(entries):
+            capacity *= 2
+        index = cls.empty(capacity)
+        for host, verdict in entries.items():
+            index._insert(_key(host), verdict)
+        return index
+
+    def _slot(self, key):
+        """Slot holding `key`, or the empty slot where it would go (linear probing)."""
+        keys, mask = self._key_view, self._mask
+        i = key & mask
+        while True:
+            k = keys[i]
+            if k == key or k == 0:
+                return i
+            i = (i + 1) & mask
+
+    def _insert(self, key, verdict):
+        i = self._slot(key)
+        if self._key_view[i] == 0:
+            self._count += 1
+        self._key_view[i] = key
+        self._verdict_view[i] = verdict
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """Short content hash of the table, for keying results that depend on it."""
+        if self._fingerprint is None:
+            h = hashlib.sha256(np.ascontiguousarray(self._keys, dtype="<u8").tobytes())
+            h.update(np.ascontiguousarray(self._verdicts, dtype=np.uint8).tobytes())
+            self._fingerprint = h.hexdigest()[:16]
+        return self._fingerprint
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, value):
+        """(verdict, matched suffix) for a URL / e-mail / domain; (UNKNOWN, None) if unlisted."""
+        if not self._count:
+            return UNKNOWN, None
+        for suffix in suffixes(host_of(value)):
+            i = self._slot(_key(suffix))
+            if self._key_view[i]:
+                return self._verdict_view[i], suffix
+        return UNKNOWN, None
+
+    def verdict(self, value):
+        return self.lookup(value)[0]
+
+    def is_blocked(self, value):
+        return self.verdict(value) == BLOCK
+
+    def verdicts(self, values):
+        """Verdict codes (uint8 array) for many values."""
+        if not self._count:
+            return np.zeros(len(values), dtype=np.uint8)
+        return np.fromiter((self.verdict(v) for v in values), dtype=np.uint8, count=len(values))
+
+    # ---------------- Persistence ----------------
+    def save(self, path):
+        """Write the table as one binary file (header + keys + verdicts), atomically."""
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, len(self._keys), self._count))
+                f.write(np.ascontiguousarray(self._keys, dtype="<u8").tobytes())
+                f.write(np.ascontiguousarray(self._verdicts, dtype=np.uint8).tobytes())
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a table written by save()."""
+        with open(path, "rb") as f:
+            magic, capacity, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a domain reputation file")
+        keys = np.memmap(path, dtype="<u8", mode="r", offset=HEADER.size, shape=(capacity,))
+        verdicts = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size + 8 * capacity,
+                             shape=(capacity,))
+        return cls(np.asarray(keys), np.asarray(verdicts), count)
+
+
+_default = {}
+
+
+def load_default(path=REPUTATION_PATH):
+    """The reputation file at `path`, loaded once per process; an empty index if it is missing."""
+    path = os.path.abspath(path)
+    if path not in _default:
+        _default[path] = DomainReputation.load(path) if os.path.exists(path) else DomainReputation.empty()
+    return _default[path]
+
+
+# ---------------- CLI ----------------
+def _read_list(path):
+    if not path:
+        return []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a domain reputation file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="build a reputation file from domain lists")
+    p_build.add_argument("--block", help="blocklist, one domain per line")
+    p_build.add_argument("--allow", help="allowlist, one domain per line (overrides --block)")
+    p_build.add_argument("-o", "--out", default=REPUTATION_PATH)
+    p_lookup = sub.add_parser("lookup", help="look up URLs, e-mails or domains")
+    p_lookup.add_argument("path", help="reputation file")
+    p_lookup.add_argument("values", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = DomainReputation.from_lists(_read_list(args.block), _read_list(args.allow))
+        index.save(args.out)
+        print(f"wrote {len(index):,} domains to {args.out}")
+    else:
+        index = DomainReputation.load(args.path)
+        for value in args.values:
+            verdict, suffix = index.lookup(value)
+            print(f"{value}\t{VERDICT_NAMES[verdict]}" + (f"\t({suffix})" if suffix else ""))
+
+
+if __name__ == "__main__":
+    main()
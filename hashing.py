@@ -1,61 +1,17 @@
 # encrypt_run_streamlit.py
 import streamlit as st
-import base64
-import json
-import os
-import io
-import contextlib
+import time
 from datetime import datetime
 
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.fernet import Fernet, InvalidToken
-import secrets
+from code_crypto import (DEFAULT_KDF, InvalidToken, available_kdfs, decrypt_payload, encrypt_code_bytes,
+                         encrypt_container_bytes)
+from sandbox_pool import Limits, default_pool
 
-# ------------------ Helpers ------------------
+FORMATS = ["Chunked container (.enc)", "JSON (legacy)"]
+OUTPUT_REFRESH = 0.1  # seconds between live output updates
 
-def derive_fernet_key(password: str, salt: bytes, iterations: int = 390000) -> bytes:
-    """
-    Derive a 32-byte key for Fernet using PBKDF2-HMAC-SHA256.
-    Returns a urlsafe-base64-encoded key (as bytes) usable by cryptography.Fernet.
-    """
-    pwd = password.encode("utf-8")
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=iterations,
-    )
-    key = kdf.derive(pwd)
-    return base64.urlsafe_b64encode(key)
-
-def encrypt_code_bytes(code_bytes: bytes, password: str) -> bytes:
-    """
-    Encrypt code bytes with a password.
-    Returns a JSON bytes: {"salt": base64..., "ct": base64..., "iters": N}
-    """
-    salt = secrets.token_bytes(16)
-    key = derive_fernet_key(password, salt)
-    f = Fernet(key)
-    token = f.encrypt(code_bytes)
-    payload = {"salt": base64.b64encode(salt).decode("ascii"),
-               "ct": base64.b64encode(token).decode("ascii"),
-               "iters": 390000}
-    return json.dumps(payload).encode("utf-8")
-
-def decrypt_code_bytes(encrypted_json_bytes: bytes, password: str) -> bytes:
-    """
-    Decrypt JSON blob produced by encrypt_code_bytes.
-    Raises InvalidToken on wrong password / corrupted blob.
-    """
-    payload = json.loads(encrypted_json_bytes.decode("utf-8"))
-    salt = base64.b64decode(payload["salt"])
-    token = base64.b64decode(payload["ct"])
-    iterations = int(payload.get("iters", 390000))
-    key = derive_fernet_key(password, salt, iterations)
-    f = Fernet(key)
-    plain = f.decrypt(token)  # may raise InvalidToken
-    return plain
+# ------------------ Helpers ------------------
+# Key derivation, its cache and the payload format live in code_crypto.py.
 
 def make_download_bytesio(content_bytes: bytes, filename: str, mime="application/octet-stream"):
     st.download_button("Download " + filename, data=content_bytes, file_name=filename, mime=mime)
@@ -90,6 +46,11 @@ with tab_encrypt:
             raw = uploaded.read()
             code_bytes = raw if isinstance(raw, bytes) else raw.encode("utf-8")
 
+    kdf_names = available_kdfs()
+    kdf_name = st.selectbox("Key derivation", kdf_names, index=kdf_names.index(DEFAULT_KDF),
+                            help="scrypt and Argon2id are memory-hard; the choice is stored in the encrypted file.")
+    out_format = st.radio("Output format", FORMATS, index=0, horizontal=True,
+                          help="The container is binary, about the size of the source; JSON is about 1.8x larger.")
     password = st.text_input("Encryption password (choose a strong one)", type="password")
     password_confirm = st.text_input("Confirm password", type="password")
 
@@ -101,22 +62,35 @@ with tab_encrypt:
         elif password != password_confirm:
             st.warning("Passwords do not match.")
         else:
-            enc_blob = encrypt_code_bytes(code_bytes, password)
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"encrypted_code_{ts}.json"
+            if out_format == FORMATS[0]:
+                enc_blob = encrypt_container_bytes(code_bytes, password, kdf=kdf_name)
+                filename = f"encrypted_code_{ts}.enc"
+            else:
+                enc_blob = encrypt_code_bytes(code_bytes, password, kdf=kdf_name)
+                filename = f"encrypted_code_{ts}.json"
             st.success("Encryption successful.")
             st.write("You can download the encrypted file and give it + the password to someone who can decrypt & run it.")
             make_download_bytesio(enc_blob, filename)
-            st.code(enc_blob.decode("utf-8")[:1000] + ("\n... (truncated)" if len(enc_blob) > 1000 else ""), language="json")
+            if filename.endswith(".json"):
+                st.code(enc_blob.decode("utf-8")[:1000] + ("\n... (truncated)" if len(enc_blob) > 1000 else ""), language="json")
+            else:
+                st.caption(f"{len(enc_blob):,} bytes ({len(code_bytes):,} bytes of source)")
             st.info("Keep the password safe. Without it the code cannot be decrypted.")
 
 # ---------- Decrypt & Run Tab ----------
 with tab_run:
     st.subheader("Decrypt an encrypted snippet and run it")
-    uploaded_enc = st.file_uploader("Upload encrypted JSON file (from 'Encrypt' tab)", type=["json"], accept_multiple_files=False)
+    uploaded_enc = st.file_uploader("Upload encrypted file (.enc or .json from 'Encrypt' tab)", type=["enc", "json"], accept_multiple_files=False)
     enc_text = st.text_area("Or paste encrypted JSON (from 'Encrypt' tab)", height=150)
     pw = st.text_input("Decryption password", type="password", key="pw_run")
     show_decoded = st.checkbox("Show decrypted source (before running)", value=False)
+    with st.expander("Sandbox limits"):
+        col_cpu, col_mem, col_wall = st.columns(3)
+        cpu_limit = col_cpu.number_input("CPU seconds", min_value=1, max_value=60, value=Limits.cpu_seconds)
+        memory_limit = col_mem.number_input("Memory (MB)", min_value=64, max_value=2048, value=Limits.memory_mb)
+        wall_limit = col_wall.number_input("Wall-clock timeout (s)", min_value=1, max_value=120,
+                                           value=int(Limits.timeout))
     run_button = st.button("Decrypt & Run")
 
     enc_bytes = None
@@ -129,12 +103,12 @@ with tab_run:
 
     if run_button:
         if not enc_bytes:
-            st.warning("Please upload or paste the encrypted JSON blob.")
+            st.warning("Please upload an encrypted file or paste the encrypted JSON blob.")
         elif not pw:
             st.warning("Please provide the decryption password.")
         else:
             try:
-                plain = decrypt_code_bytes(enc_bytes, pw)
+                plain = decrypt_payload(enc_bytes, pw)
             except InvalidToken:
                 st.error("Decryption failed — wrong password or corrupted file.")
             except Exception as e:
@@ -152,25 +126,33 @@ with tab_run:
                     else:
                         st.write("Binary content (not text).")
 
-                # Execute the decrypted code safely (trusted only). Capture stdout.
-                st.info("Executing decrypted code (trusted only). Output below:")
-                buf = io.StringIO()
-                # Minimal execution context providing builtins so print works
-                exec_globals = {"__builtins__": __builtins__}
-                with contextlib.redirect_stdout(buf):
-                    try:
-                        exec(plain, exec_globals)
-                    except Exception as e:
-                        st.error(f"Error during execution: {e}")
-                out = buf.getvalue()
-                if out.strip():
-                    st.subheader("Program output")
-                    st.code(out)
+                # Run in a pooled worker interpreter, never in the server process.
+                st.info("Running decrypted code in a sandboxed worker (trusted only). Output below:")
+                limits = Limits(cpu_seconds=int(cpu_limit), memory_mb=int(memory_limit), timeout=float(wall_limit))
+                output_box = st.empty()
+                run = default_pool().run(plain, limits)
+                shown, last_update = "", 0.0
+                for text in run.iter_output():
+                    shown += text
+                    if time.monotonic() - last_update > OUTPUT_REFRESH:
+                        output_box.code(shown)
+                        last_update = time.monotonic()
+                result = run.result()
+                if result.output.strip():
+                    output_box.code(result.output)
+                elif result.ok:
+                    output_box.info("Program executed but produced no output.")
+                else:
+                    output_box.empty()
+                if result.status == "error":
+                    st.error(f"Error during execution (exit status {result.returncode}).")
+                elif not result.ok:
+                    st.error(f"Stopped: {result.status} exceeded after {result.seconds:.1f} s.")
                 else:
-                    st.info("Program executed but produced no stdout output.")
+                    st.caption(f"Finished in {result.seconds:.2f} s.")
 
 st.markdown("---")
-st.caption("Demo: password-based encryption (PBKDF2 + Fernet). Executing decrypted code is potentially dangerous — only run trusted snippets.")
+st.caption("Demo: password-based encryption (PBKDF2, scrypt or Argon2id; AEAD containers or Fernet). Decrypted code runs in a resource-limited worker process, which is not a security boundary — only run trusted snippets.")
 
 
 
@@ -1,9 +1,24 @@
 # -------------------------------------------------------------
 # Streamlit App : k-Anonymity Based Data Anonymization (Final)
 # -------------------------------------------------------------
+import os
+import tempfile
+
 import streamlit as st
 import pandas as pd
-import math
+
+from kanon_hierarchies import generalize_column
+from kanon_index import EquivalenceIndex
+from kanon_lattice import search
+from kanon_mondrian import anonymize, estimate_memory
+from kanon_outofcore import anonymize_partitioned, detect_encoding
+
+# Uploads above this size (or above the sidebar memory budget) are anonymized
+# out of core (two streaming passes) instead of being loaded into one
+# DataFrame.  Mondrian runs whose estimated working set exceeds the budget
+# fall back to the out-of-core path as well.
+LARGE_UPLOAD_BYTES = 50 * 1024 * 1024
+DEFAULT_MEMORY_BUDGET_MB = 1024
 
 # -------------------------------------------------------------
 # Page Setup
@@ -19,7 +34,88 @@ st.write("---")
 # -------------------------------------------------------------
 uploaded_file = st.file_uploader("📂 Upload your dataset (CSV only)", type=["csv"])
 
-if uploaded_file:
+max_workers = os.cpu_count() or 1
+workers = st.sidebar.number_input(
+    "Lattice search worker processes", min_value=1, max_value=max_workers,
+    value=min(4, max_workers), step=1,
+    help="Generalization levels of the same height are evaluated on this many processes."
+)
+memory_budget_mb = st.sidebar.number_input(
+    "Memory budget (MB)", min_value=16, value=DEFAULT_MEMORY_BUDGET_MB, step=64,
+    help="Datasets that would need more than this are anonymized out of core, in chunks."
+)
+memory_budget = int(memory_budget_mb) * 1024 * 1024
+
+
+def run_out_of_core(quasi_cols, k, max_suppression):
+    """Anonymize the upload in chunks (kanon_outofcore); returns the result and its output file."""
+    status = st.empty()
+    seen = {"aggregate": 0, "write": 0}
+
+    def progress(stage, rows):
+        seen[stage] += rows
+        status.info(f"⏳ {'Counting groups' if stage == 'aggregate' else 'Writing output'}: "
+                    f"{seen[stage]:,} rows")
+
+    out = tempfile.TemporaryFile()
+    try:
+        result = anonymize_partitioned(uploaded_file, out, quasi_cols, k,
+                                       max_suppression=max_suppression, workers=int(workers),
+                                       progress=progress)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    status.success(f"✅ k = {result.k} with levels "
+                   f"{', '.join(f'{c}={lv}' for c, lv in result.levels.items())} "
+                   f"({result.rows_in:,} rows in {result.seconds:.1f} s)")
+    out.seek(0)
+    return result, out
+
+
+if uploaded_file and uploaded_file.size > min(LARGE_UPLOAD_BYTES, memory_budget):
+    # ---------------------------------------------------------
+    # Large Upload: out-of-core anonymization
+    # ---------------------------------------------------------
+    st.info(f"📦 Large dataset ({uploaded_file.size / 1e6:.0f} MB): it is processed in chunks "
+            "with the optimal generalization search, without loading it all into memory.")
+    # same encoding the out-of-core reader will use, so the column names match
+    preview = pd.read_csv(uploaded_file, nrows=5, encoding=detect_encoding(uploaded_file), sep=",")
+    preview.columns = preview.columns.str.strip()
+    st.subheader("📄 Original Dataset (first rows)")
+    st.dataframe(preview)
+
+    quasi_cols = st.multiselect(
+        "Select Quasi-Identifier Columns (attributes that could indirectly identify a person):",
+        options=preview.columns.tolist(),
+        help="Examples: Name, Email, Phone, Aadhaar, Address, Age, etc."
+    )
+    k_value = st.number_input("Enter desired k-value:", min_value=2, value=3, step=1)
+    max_suppression = st.slider(
+        "Maximum share of rows that may be suppressed:",
+        min_value=0.0, max_value=0.2, value=0.0, step=0.01
+    )
+
+    if st.button("🔐 Apply k-Anonymization"):
+        if not quasi_cols:
+            st.warning("⚠️ Please select at least one quasi-identifier column.")
+        else:
+            result, out = run_out_of_core(quasi_cols, int(k_value), max_suppression)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Distinct quasi-identifier tuples", f"{result.distinct_tuples:,}")
+            m2.metric("Equivalence classes", f"{result.n_classes:,}")
+            m3.metric("Suppressed rows", f"{result.suppressed:,}")
+
+            st.subheader("🔒 After Anonymization")
+            st.dataframe(pd.read_csv(out, nrows=5))
+            out.seek(0)
+            st.download_button(
+                label="📥 Download Anonymized Dataset",
+                data=out.read(),  # st.download_button takes bytes, not a temporary file object
+                file_name="anonymized_data.csv",
+                mime="text/csv"
+            )
+
+elif uploaded_file:
     # Safe CSV reading with proper delimiter and encoding
     try:
         df = pd.read_csv(uploaded_file, encoding="utf-8", sep=",")
@@ -50,6 +146,21 @@ if uploaded_file:
         help="Higher k means stronger privacy but more data generalization."
     )
 
+    method = st.radio(
+        "Anonymization method:",
+        ["Mondrian partitioning (guarantees k)", "Optimal generalization search (lattice)",
+         "Simple generalization (single level)"],
+        help="Mondrian recursively splits records on the quasi-identifiers until every group has at least k rows. "
+             "The lattice search finds the per-column generalization levels with the least information loss."
+    )
+
+    if method.startswith("Optimal"):
+        max_suppression = st.slider(
+            "Maximum share of rows that may be suppressed:",
+            min_value=0.0, max_value=0.2, value=0.0, step=0.01,
+            help="Rows left in groups smaller than k are removed, up to this fraction of the dataset."
+        )
+
     # ---------------------------------------------------------
     # Helper Functions
     # ---------------------------------------------------------
@@ -57,24 +168,19 @@ if uploaded_file:
         """Compute minimum group size (k)"""
         if len(cols) == 0:
             return 0
-        return data.groupby(cols).size().min()
-
-    def generalize_value(val):
-        """Simple generalization logic"""
-        if pd.isna(val):
-            return val
-        if isinstance(val, str) and val.isdigit() and len(val) == 6:
-            return val[:3] + "XXX"  # Example: 560034 → 560XXX
-        if isinstance(val, (int, float)):
-            grp = math.floor(val / 5) * 5
-            return f"{grp}-{grp+4}"  # Example: 27 → 25-29
-        if isinstance(val, str) and "@" in val:
-            # Generalize email → hide username
-            return val.split("@")[0][:2] + "***@" + val.split("@")[1]
-        if isinstance(val, str) and len(val) > 4:
-            # Mask last few characters for other strings
-            return val[:3] + "***"
-        return val
+        return EquivalenceIndex(data, cols).k
+
+    def equivalence_index(cols):
+        """Equivalence-class index of the uploaded data, kept across reruns"""
+        key = (uploaded_file.file_id, tuple(cols))
+        cached = st.session_state.get("eq_index")
+        if cached is None or cached[0] != key:
+            cached = (key, EquivalenceIndex(df, cols))
+            st.session_state["eq_index"] = cached
+        return cached[1].copy()
+
+    # Column generalization (vectorized; see kanon_hierarchies.generalize_column):
+    #   560034 → 560XXX, 27 → 25-29, ravi@xyz.in → ra***@xyz.in, Rakshitha → Rak***
 
     # ---------------------------------------------------------
     # Apply Anonymization
@@ -83,7 +189,8 @@ if uploaded_file:
         if not quasi_cols:
             st.warning("⚠️ Please select at least one quasi-identifier column.")
         else:
-            current_k = compute_k(df, quasi_cols)
+            index = equivalence_index(quasi_cols)
+            current_k = index.k
             st.info(f"📊 Current dataset k = **{current_k}**")
 
             if current_k >= k_value:
@@ -93,12 +200,57 @@ if uploaded_file:
                 st.warning("⚠️ Dataset does NOT satisfy desired k-Anonymity.")
                 st.info("Applying generalization to quasi-identifier columns...")
 
-                anon_df = df.copy()
-                for col in quasi_cols:
-                    anon_df[col] = anon_df[col].apply(generalize_value)
+                if method.startswith("Mondrian"):
+                    try:
+                        result = anonymize(df, quasi_cols, int(k_value), memory_budget=memory_budget)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        st.stop()
+                    except MemoryError:  # estimated working set over the budget
+                        result = None
+                    if result is None:
+                        st.info(f"📦 Mondrian would need about "
+                                f"{estimate_memory(len(df), len(quasi_cols)) / 1e6:.0f} MB, over the "
+                                f"{memory_budget_mb} MB budget: anonymizing out of core instead "
+                                "(optimal generalization search, in chunks).")
+                        result, out = run_out_of_core(quasi_cols, int(k_value), 0.0)
+                        anon_df = pd.read_csv(out)
+                        m1, m2, m3 = st.columns(3)
+                        m1.metric("Distinct quasi-identifier tuples", f"{result.distinct_tuples:,}")
+                        m2.metric("Equivalence classes", f"{result.n_classes:,}")
+                        m3.metric("Suppressed rows", f"{result.suppressed:,}")
+                    else:
+                        anon_df = result.data
+                        new_k = compute_k(anon_df, quasi_cols)
+                        st.success(f"✅ After Mondrian partitioning, new k = {new_k} "
+                                   f"({result.n_classes} equivalence classes)")
+                        m1, m2, m3 = st.columns(3)
+                        m1.metric("NCP (information loss)", f"{result.metrics['NCP']:.3f}")
+                        m2.metric("Discernibility", f"{result.metrics['DM']:,}")
+                        m3.metric("Avg class size / k", f"{result.metrics['CAVG']:.2f}")
+                elif method.startswith("Optimal"):
+                    try:
+                        result = search(df, quasi_cols, int(k_value), max_suppression=max_suppression,
+                                        workers=int(workers))
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        st.stop()
+                    anon_df = result.data
+                    st.success(f"✅ After lattice search, new k = {result.k} "
+                               f"(levels: {', '.join(f'{c}={lv}' for c, lv in result.levels.items())})")
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("Nodes evaluated", f"{result.nodes_evaluated:,} / {result.nodes_total:,}")
+                    m2.metric("Discernibility", f"{result.loss['discernibility']:,}")
+                    m3.metric("Suppressed rows", f"{result.loss['suppressed']:,}")
+                else:
+                    anon_df = df.copy()
+                    for col in quasi_cols:
+                        anon_df[col] = generalize_column(anon_df[col])
 
-                new_k = compute_k(anon_df, quasi_cols)
-                st.success(f"✅ After generalization, new k = {new_k}")
+                    # Level 1 of each default hierarchy is generalize_column, so the
+                    # index rolls its classes up instead of regrouping every row.
+                    new_k = index.set_levels({col: 1 for col in quasi_cols}).k
+                    st.success(f"✅ After generalization, new k = {new_k}")
 
                 st.markdown("---")
                 st.subheader("🔍 Before Anonymization")
@@ -0,0 +1,342 @@
+# kanon_index.py
+# -------------------------------------------------------------
+# Incremental equivalence-class index for k-anonymity
+# -------------------------------------------------------------
+# Maps every quasi-identifier tuple (at the current generalization levels)
+# to the number of records holding it, so k and the violating groups can be
+# read off without a full DataFrame groupby each time.
+#
+#   * Raising a column's level on a nested hierarchy (every value at level a
+#     maps to exactly one value at level b > a) rolls the existing group table
+#     up: cost is O(groups), not O(rows).
+#   * Lowering a level, or a non-nested jump, rebuilds from the per-row codes.
+#   * Appending or deleting rows only touches the affected groups.
+#
+# Values are stored as integer codes into each column's distinct original
+# values; generalized values are only materialized when reporting groups.
+#
+# A missing quasi-identifier value is a value of its own: rows holding NaN
+# form their own equivalence classes and count towards k, like
+# groupby(dropna=False).  (A plain groupby drops those rows, and with them
+# records that may well be unique.)  kanon_outofcore aggregates the same way.
+import numpy as np
+import pandas as pd
+
+from kanon_hierarchies import default_hierarchy
+
+NA_CODE = -1
+
+
+def _radix(*code_arrays):
+    """Per-column radix covering every (shifted) code in the given code tables."""
+    radix = np.ones(code_arrays[0].shape[1], dtype=np.int64)
+    for codes in code_arrays:
+        if len(codes):
+            radix = np.maximum(radix, codes.max(axis=0) + 2)
+    return radix
+
+
+def _pack(codes, radix):
+    """One mixed-radix int64 key per code row, or None if the key space overflows int64."""
+    if np.prod(radix.astype(object)) >= np.iinfo(np.int64).max:
+        return None
+    return np.ravel_multi_index((codes + 1).T, radix)
+
+
+def _regroup(codes, counts):
+    """
+    Merge duplicate code rows of a group table, summing their counts and
+    dropping empty groups.  Code rows are packed into one int64 key (mixed
+    radix) and hashed, falling back to a row-wise unique for very wide keys.
+    """
+    if codes.shape[1] == 0:
+        total = int(counts.sum())
+        return codes[:1 if total else 0], np.array([total] if total else [], dtype=np.int64)
+    keys = _pack(codes, _radix(codes))
+    if keys is not None:
+        ids, uniques = pd.factorize(keys)
+        n_groups = len(uniques)
+    else:
+        _, ids = np.unique(codes, axis=0, return_inverse=True)
+        ids = ids.ravel()
+        n_groups = int(ids.max()) + 1 if len(ids) else 0
+    summed = np.rint(np.bincount(ids, weights=counts, minlength=n_groups)).astype(np.int64)
+    first = np.empty(n_groups, dtype=np.int64)
+    first[ids[::-1]] = np.arange(len(ids) - 1, -1, -1)
+    keep = summed > 0
+    return codes[first[keep]], summed[keep]
+
+
+class EquivalenceIndex:
+    """
+    Equivalence-class counts for `quasi_cols` of `df` at per-column
+    generalization levels.  `weights` gives a record count per row of `df`,
+    so a pre-aggregated table of distinct tuples can stand in for the data.
+    Columns without a given hierarchy get default_hierarchy() of their
+    distinct values, chosen only once a level above 0 is needed.  Missing
+    values are kept: they form classes of their own.
+    """
+
+    def __init__(self, df, quasi_cols, hierarchies=None, levels=None, weights=None):
+        self.quasi_cols = list(quasi_cols)
+        self._given_hierarchies = dict(hierarchies or {})
+        self._hierarchies = {}
+        self.levels = {col: 0 for col in self.quasi_cols}
+        self.levels.update(levels or {})
+
+        self._row_index = df.index
+        self._uniques = {}      # col -> distinct original values (Index)
+        self._level_codes = {}  # (col, level) -> array mapping base code -> level code
+        self._level_values = {}  # (col, level) -> array of generalized values per level code
+        self._nested = {}        # (col, old, new) -> whether old level nests in new
+        self._rows = np.empty((len(df), len(self.quasi_cols)), dtype=np.int64)
+        for j, col in enumerate(self.quasi_cols):
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+            self._uniques[col] = pd.Index(uniques)
+            self._rows[:, j] = codes
+        self._weights = (np.ones(len(df), dtype=np.int64) if weights is None
+                         else np.asarray(weights, dtype=np.int64))
+        self._codes, self._counts = self._group_rows(self._rows, self._weights)
+
+    # ---------------- Hierarchies ----------------
+    def hierarchy(self, col):
+        h = self._hierarchies.get(col)
+        if h is None:
+            h = self._given_hierarchies.get(col) or default_hierarchy(pd.Series(self._uniques[col]))
+            self._hierarchies[col] = h
+        return h
+
+    @property
+    def hierarchies(self):
+        """{col: hierarchy} for every quasi-identifier (resolving any not chosen yet)."""
+        return {col: self.hierarchy(col) for col in self.quasi_cols}
+
+    # ---------------- Level maps ----------------
+    def _level_map(self, col, level):
+        """Array mapping each base code of `col` to its code at `level` (computed once, cached)."""
+        key = (col, level)
+        uniques = self._uniques[col]
+        cached = self._level_codes.get(key)
+        if cached is None or len(cached) != len(uniques):
+            if level == 0:  # original values: the base codes themselves, no hierarchy needed
+                codes, values = np.arange(len(uniques)), uniques
+            else:
+                generalized = self.hierarchy(col).generalize(pd.Series(uniques), level)
+                codes, values = pd.factorize(generalized, use_na_sentinel=False)
+            self._level_codes[key] = codes.astype(np.int64)
+            self._level_values[key] = np.asarray(values, dtype=object)
+        return self._level_codes[key]
+
+    def _to_level_codes(self, base_codes, col):
+        level_map = self._level_map(col, self.levels[col])
+        out = np.full(len(base_codes), NA_CODE, dtype=np.int64)
+        valid = base_codes != NA_CODE
+        out[valid] = level_map[base_codes[valid]]
+        return out
+
+    def _level_rows(self, rows):
+        codes = np.empty(rows.shape, dtype=np.int64)
+        for j, col in enumerate(self.quasi_cols):
+            codes[:, j] = self._to_level_codes(rows[:, j], col)
+        return codes
+
+    def _group_rows(self, rows, weights):
+        """(codes, counts) group table for base-coded rows at the current levels."""
+        return _regroup(self._level_rows(rows), weights)
+
+    def _encode(self, df, extend=False):
+        """
+        Base codes for the quasi-identifiers of `df`.  Values never seen before
+        are added to the column's uniques when `extend` is set; otherwise the
+        rows holding them are flagged in the returned `unseen` mask.
+        """
+        rows = np.empty((len(df), len(self.quasi_cols)), dtype=np.int64)
+        unseen = np.zeros(len(df), dtype=bool)
+        for j, col in enumerate(self.quasi_cols):
+            uniques = self._uniques[col]
+            values = df[col]
+            missing = values.isna().to_numpy()
+            if extend:
+                new = pd.Index(values.dropna().unique()).difference(uniques)
+                if len(new):
+                    uniques = uniques.append(new)
+                    self._uniques[col] = uniques
+            codes = uniques.get_indexer(values)
+            unseen |= (codes == NA_CODE) & ~missing
+            codes[missing] = NA_CODE
+            rows[:, j] = codes
+        return rows, unseen
+
+    # ---------------- Queries ----------------
+    @property
+    def k(self):
+        """Smallest equivalence-class size (0 when there are no rows)."""
+        return int(self._counts.min()) if len(self._counts) else 0
+
+    @property
+    def n_classes(self):
+        return len(self._counts)
+
+    @property
+    def n_rows(self):
+        return int(self._counts.sum())
+
+    def class_sizes(self):
+        """Sizes of all equivalence classes as an int64 array."""
+        return self._counts
+
+    def _decode(self, mask):
+        out = {}
+        for j, col in enumerate(self.quasi_cols):
+            self._level_map(col, self.levels[col])
+            values = np.append(self._level_values[(col, self.levels[col])],
+                               np.array([np.nan], dtype=object))
+            out[col] = values[self._codes[mask, j]]
+        out["count"] = self._counts[mask]
+        return pd.DataFrame(out)
+
+    def violations(self, k):
+        """Generalized quasi-identifier tuples whose class has fewer than k records."""
+        return self._decode(self._counts < k)
+
+    def groups(self):
+        """All equivalence classes with their generalized values and counts."""
+        return self._decode(np.ones(len(self._counts), dtype=bool))
+
+    def rows_below(self, k):
+        """Number of records that sit in classes smaller than k (suppression cost)."""
+        return int(self._counts[self._counts < k].sum())
+
+    def sizes_of(self, df):
+        """
+        Size of the equivalence class each row of `df` falls into at the
+        current levels, as an int64 array (0 for tuples not in the index).
+        Works on row-less copies, e.g. to suppress small classes chunk by chunk.
+        """
+        rows, unseen = self._encode(df)
+        codes = self._level_rows(rows)
+        radix = _radix(self._codes, codes)
+        table_keys, row_keys = _pack(self._codes, radix), _pack(codes, radix)
+        if table_keys is not None:
+            positions = pd.Index(table_keys).get_indexer(row_keys)
+        else:
+            positions = pd.MultiIndex.from_arrays(self._codes.T).get_indexer(
+                pd.MultiIndex.from_arrays(codes.T))
+        sizes = np.where(positions >= 0, self._counts[positions], 0)
+        sizes[unseen] = 0
+        return sizes
+
+    # ---------------- Updates ----------------
+    def _is_nested(self, col, old, new):
+        """True if every level-`old` code of `col` maps to a single level-`new` code."""
+        key = (col, old, new)
+        if key not in self._nested:
+            old_map = self._level_map(col, old)
+            new_map = self._level_map(col, new)
+            rollup = np.full(old_map.max() + 1 if len(old_map) else 0, -1, dtype=np.int64)
+            rollup[old_map] = new_map
+            self._nested[key] = bool(np.array_equal(rollup[old_map], new_map))
+        return self._nested[key]
+
+    def can_roll_up(self, col, level):
+        """True if set_level(col, level) can be done from the group table alone."""
+        old = self.levels[col]
+        return level > old and self._is_nested(col, old, level)
+
+    def set_level(self, col, level):
+        """Change one column's generalization level, rolling the group table up when possible."""
+        old = self.levels[col]
+        if level == old:
+            return self
+        if self.can_roll_up(col, level):
+            old_map = self._level_map(col, old)
+            new_map = self._level_map(col, level)
+            rollup = np.empty(old_map.max() + 1 if len(old_map) else 0, dtype=np.int64)
+            rollup[old_map] = new_map
+            j = self.quasi_cols.index(col)
+            codes = self._codes.copy()
+            valid = codes[:, j] != NA_CODE
+            codes[valid, j] = rollup[codes[valid, j]]
+            self.levels[col] = level
+            self._codes, self._counts = _regroup(codes, self._counts)
+        else:
+            if self._rows is None:
+                raise ValueError(f"Cannot regroup {col!r} at level {level}: row codes were dropped.")
+            self.levels[col] = level
+            self._codes, self._counts = self._group_rows(self._rows, self._weights)
+        return self
+
+    def set_levels(self, levels):
+        for col, level in levels.items():
+            self.set_level(col, level)
+        return self
+
+    def append(self, df, weights=None):
+        """Add rows (same quasi-identifier columns) and update the affected classes."""
+        new_rows, _ = self._encode(df, extend=True)
+        new_weights = (np.ones(len(df), dtype=np.int64) if weights is None
+                       else np.asarray(weights, dtype=np.int64))
+        self._rows = np.concatenate([self._rows, new_rows])
+        self._weights = np.concatenate([self._weights, new_weights])
+        self._row_index = self._row_index.append(df.index)
+        self._nested.clear()  # new values may break a roll-up that held before
+        self._merge(new_rows, new_weights, sign=1)
+        return self
+
+    def delete(self, labels):
+        """Remove rows by index label and update the affected classes."""
+        positions = self._row_index.get_indexer(pd.Index(labels))
+        positions = positions[positions >= 0]
+        removed, removed_weights = self._rows[positions], self._weights[positions]
+        keep = np.ones(len(self._rows), dtype=bool)
+        keep[positions] = False
+        self._rows = self._rows[keep]
+        self._weights = self._weights[keep]
+        self._row_index = self._row_index[keep]
+        self._nested.clear()
+        self._merge(removed, removed_weights, sign=-1)
+        return self
+
+    def _merge(self, rows, weights, sign):
+        codes, counts = self._group_rows(rows, weights)
+        self._codes, self._counts = _regroup(np.concatenate([self._codes, codes]),
+                                             np.concatenate([self._counts, sign * counts]))
+
+    def copy(self, with_rows=True):
+        """
+        Independent copy; row codes and cached level maps are shared until
+        replaced.  with_rows=False drops the per-row codes, giving a small
+        object (group table + level maps) that can only roll up.
+        """
+        other = object.__new__(EquivalenceIndex)
+        other.__dict__.update(self.__dict__)
+        if not with_rows:
+            other._rows = None
+            other._weights = None
+            other._row_index = None
+        other.levels = dict(self.levels)
+        other._uniques = dict(self._uniques)
+        other._level_codes = dict(self._level_codes)
+        other._level_values = dict(self._level_values)
+        other._nested = dict(self._nested)
+        other._hierarchies = dict(self._hierarchies)
+        return other
+
+    def group_table(self):
+        """(levels, codes, counts): the group table alone, cheap to send to another process."""
+        return dict(self.levels), self._codes, self._counts
+
+    def with_group_table(self, levels, codes, counts):
+        """
+        Row-less copy holding a group_table() of an index built from the same
+        data.  Unlike copy(), it shares this index's level-map caches, so
+        maps computed through any such copy are computed once.
+        """
+        other = self.copy(with_rows=False)
+        other._level_codes = self._level_codes
+        other._level_values = self._level_values
+        other._nested = self._nested
+        other._hierarchies = self._hierarchies
+        other.levels = dict(levels)
+        other._codes, other._counts = codes, counts
+        return other
@@ -0,0 +1,213 @@
+# kanon_lattice.py
+# -------------------------------------------------------------
+# Optimal full-domain generalization search (Incognito/Flash-style)
+# -------------------------------------------------------------
+# Every quasi-identifier has a hierarchy with levels 0..max_level; a lattice
+# node is one level per column.  Nodes are visited bottom-up by height (sum
+# of levels) and pruned with monotonicity: once a node is k-anonymous, every
+# node above it is too, so those are never evaluated.  The nodes that are
+# evaluated and pass are the minimal anonymous nodes, and the one with the
+# least information loss wins (loss is assumed to grow with the levels).
+#
+# A node is evaluated by rolling up the equivalence-class table of one of its
+# parents (see kanon_index.EquivalenceIndex), so no node regroups the raw
+# rows when the hierarchies are nested.  The nodes of one height are
+# independent and are evaluated on a process pool: every worker receives a
+# row-less copy of the root index once (pool initializer) and computes the
+# generalization level maps it needs itself, so a task carries only its
+# parent's group table and the roll-up, nesting check and k test all run in
+# the worker.  Non-nested steps are regrouped from the row codes in the
+# parent.
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from kanon_hierarchies import default_hierarchy, generalize_frame
+from kanon_index import EquivalenceIndex
+
+METRICS = ("discernibility", "precision", "suppressed")
+
+
+# ---------------- Node evaluation ----------------
+def _is_anonymous(index, k, max_suppressed):
+    return index.rows_below(k) <= max_suppressed
+
+
+def _evaluate(template, task):
+    """
+    Raise one column of a parent's group table and test k.  Returns (node,
+    group table, anonymous), with no table if the step isn't a roll-up.
+    """
+    node, table, col, level, k, max_suppressed = task
+    index = template.with_group_table(*table)
+    if not index.can_roll_up(col, level):
+        return node, None, False
+    index.set_level(col, level)
+    return node, index.group_table(), _is_anonymous(index, k, max_suppressed)
+
+
+_template = None  # per worker process, set by _init_worker
+
+
+def _init_worker(template):
+    global _template
+    _template = template
+
+
+def _roll_up(task):
+    """Worker entry point (see _evaluate)."""
+    return _evaluate(_template, task)
+
+
+def _predecessors(node):
+    for j, level in enumerate(node):
+        if level > 0:
+            yield j, node[:j] + (level - 1,) + node[j + 1:]
+
+
+def _successors(node, max_levels):
+    for j, level in enumerate(node):
+        if level < max_levels[j]:
+            yield node[:j] + (level + 1,) + node[j + 1:]
+
+
+def node_loss(index, node, max_levels, k):
+    """
+    Information loss of a lattice node:
+      precision       Sweeney's Prec loss, mean of level / max_level over columns
+      discernibility  sum of squared class sizes, suppressed rows cost n each
+      suppressed      number of rows in classes smaller than k
+    """
+    n = index.n_rows
+    sizes = index.class_sizes()
+    small = sizes < k
+    suppressed = int(sizes[small].sum())
+    return {
+        "precision": float(np.mean([lv / m for lv, m in zip(node, max_levels)])) if node else 0.0,
+        "discernibility": int((sizes[~small] ** 2).sum()) + suppressed * n,
+        "suppressed": suppressed,
+    }
+
+
+# ---------------- Search ----------------
+@dataclass
+class LatticeResult:
+    levels: dict
+    k: int
+    loss: dict
+    data: pd.DataFrame
+    nodes_total: int
+    nodes_evaluated: int
+    nodes_pruned: int
+    minimal_nodes: list = field(default_factory=list)
+    index: EquivalenceIndex = None
+
+
+def achieved_k(sizes, k):
+    """Smallest class size kept at threshold k; 0 when every class is suppressed."""
+    kept = sizes[sizes >= k]
+    return int(kept.min()) if len(kept) else 0
+
+
+def apply_levels(df, index, k):
+    """
+    Generalize `df` to the levels of `index` and suppress rows left in classes
+    smaller than k.  `index` may be a row-less copy, so this also works chunk
+    by chunk on data the index was built from.
+    """
+    keep = index.sizes_of(df) >= k
+    return generalize_frame(df[keep], index.levels, index.hierarchies)
+
+
+def search(df, quasi_cols, k, hierarchies=None, max_suppression=0.0,
+           metric="discernibility", workers=1, weights=None):
+    """
+    Find the full-domain generalization of `quasi_cols` with minimal `metric`
+    loss such that every equivalence class has >= k rows, allowing at most a
+    `max_suppression` fraction of rows to be suppressed.  Nodes of the same
+    height are evaluated on `workers` processes (1 = serial).  `weights`
+    gives a record count per row when `df` holds pre-aggregated tuples.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    quasi_cols = list(quasi_cols)
+    hierarchies = hierarchies or {}
+    hierarchies = {col: hierarchies.get(col) or default_hierarchy(df[col]) for col in quasi_cols}
+    max_levels = tuple(hierarchies[col].max_level for col in quasi_cols)
+    nodes_total = math.prod(m + 1 for m in max_levels)
+
+    root = EquivalenceIndex(df, quasi_cols, hierarchies, weights=weights)
+    max_suppressed = int(max_suppression * root.n_rows)
+    root_node = tuple(0 for _ in quasi_cols)
+    minimal = {}
+    evaluated = 1
+    if _is_anonymous(root, k, max_suppressed):
+        minimal[root_node] = root
+        previous = {}
+    else:
+        previous = {root_node: root.copy(with_rows=False)}
+
+    template = root.copy(with_rows=False)
+    pool = (ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(template,))
+            if workers > 1 else None)
+    try:
+        # `previous` holds the failing nodes of the last height.  Only their
+        # successors can still be minimal, and only if every predecessor
+        # failed too; anything else sits above an anonymous node and is never
+        # generated, so the lattice is not enumerated up front.
+        while previous:
+            candidates = sorted({succ for node in previous for succ in _successors(node, max_levels)})
+            tasks = []
+            for node in candidates:
+                preds = list(_predecessors(node))
+                if any(pred not in previous for _, pred in preds):
+                    continue
+                j, parent_node = min(preds, key=lambda p: previous[p[1]].n_classes)
+                tasks.append((node, previous[parent_node].group_table(), quasi_cols[j], node[j],
+                              k, max_suppressed))
+
+            if pool is not None and len(tasks) > 1:
+                outcomes = pool.map(_roll_up, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+            else:
+                outcomes = (_evaluate(template, task) for task in tasks)
+            results = []
+            for node, table, ok in outcomes:
+                if table is None:
+                    # Non-nested hierarchy step: regroup from the row codes.
+                    index = root.copy().set_levels(dict(zip(quasi_cols, node)))
+                    results.append((node, index.copy(with_rows=False), _is_anonymous(index, k, max_suppressed)))
+                else:
+                    results.append((node, template.with_group_table(*table), ok))
+            evaluated += len(results)
+
+            current = {}
+            for node, index, ok in results:
+                if ok:
+                    minimal[node] = index
+                else:
+                    current[node] = index
+            previous = current
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if not minimal:
+        raise ValueError(f"No generalization reaches k={k} with the allowed suppression.")
+
+    losses = {node: node_loss(index, node, max_levels, k) for node, index in minimal.items()}
+    best = min(losses, key=lambda node: (losses[node][metric], losses[node]["precision"], node))
+    sizes = minimal[best].class_sizes()
+    return LatticeResult(
+        levels=dict(zip(quasi_cols, best)),
+        k=achieved_k(sizes, k),
+        loss=losses[best],
+        data=apply_levels(df, minimal[best], k),
+        nodes_total=nodes_total,
+        nodes_evaluated=evaluated,
+        nodes_pruned=nodes_total - evaluated,
+        minimal_nodes=[dict(zip(quasi_cols, node)) for node in sorted(minimal)],
+        index=minimal[best],
+    )
@@ -0,0 +1,228 @@
+# kanon_mondrian.py
+# -------------------------------------------------------------
+# Mondrian multidimensional k-anonymity (used by k_anonymity_app.py)
+# -------------------------------------------------------------
+# Records are split recursively on one quasi-identifier at a time (the one
+# with the widest normalized range in the current partition) at its median,
+# as long as both halves keep at least k records.  Each final partition
+# becomes one equivalence class whose quasi-identifiers are generalized to
+# the partition's range (numeric) or value set (categorical), so every
+# class has >= k members by construction.
+#
+# Quasi-identifiers are encoded once as compact integer codes (categorical
+# values by sorted order), partitions are index arrays, and medians come
+# from np.partition, so the whole run is O(n log n) in time with memory of
+# roughly one int32 per cell plus one index per row.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------- Encoding ----------------
+def _encode(df, quasi_cols):
+    """
+    Integer codes (n_rows x n_cols, int32) for the quasi-identifiers, ordered
+    like the sorted values, plus per-column (is_numeric, uniques) tables for
+    turning codes back into values.  Missing values get the code len(uniques).
+    """
+    codes = np.empty((len(df), len(quasi_cols)), dtype=np.int32)
+    tables = []
+    for j, col in enumerate(quasi_cols):
+        series = df[col]
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        col_codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+        col_codes[col_codes < 0] = len(uniques)
+        codes[:, j] = col_codes
+        tables.append((numeric, np.asarray(uniques)))
+    return codes, tables
+
+
+def estimate_memory(n_rows, n_quasi):
+    """Rough peak bytes for anonymize(): two copies of the codes plus row/class indices."""
+    return n_rows * (2 * n_quasi * 4 + 3 * 8)
+
+
+# ---------------- Partitioning ----------------
+def _partition(codes, k, spans):
+    """
+    Split rows into Mondrian partitions.  Returns a list of row-index arrays,
+    each of length >= k.  `spans` holds each column's full code range and is
+    used to normalize per-partition ranges when choosing a split column.
+    """
+    n = codes.shape[0]
+    if n < k:
+        raise ValueError(f"Dataset has {n} rows; cannot reach k={k}.")
+    done = []
+    stack = [np.arange(n, dtype=np.int64)]
+    while stack:
+        rows = stack.pop()
+        if len(rows) < 2 * k:
+            done.append(rows)
+            continue
+        block = codes[rows]
+        widths = (block.max(axis=0) - block.min(axis=0)) / spans
+        split = False
+        for j in np.argsort(-widths, kind="stable"):
+            if widths[j] <= 0:
+                break
+            column = block[:, j]
+            median = np.partition(column, len(column) // 2)[len(column) // 2]
+            left = column < median
+            if left.sum() < k:
+                # Too many values tie with the median; put it on the left instead.
+                left = column <= median
+            n_left = int(left.sum())
+            if n_left >= k and len(rows) - n_left >= k:
+                stack.append(rows[~left])
+                stack.append(rows[left])
+                split = True
+                break
+        if not split:
+            done.append(rows)
+    return done
+
+
+def _class_bounds(col_codes, class_ids, n_classes, na_code):
+    """Per-class min/max of the non-missing codes and whether a class holds missing values."""
+    real = col_codes != na_code
+    lo = np.full(n_classes, na_code, dtype=np.int64)
+    hi = np.full(n_classes, -1, dtype=np.int64)
+    np.minimum.at(lo, class_ids[real], col_codes[real])
+    np.maximum.at(hi, class_ids[real], col_codes[real])
+    has_na = np.bincount(class_ids[~real], minlength=n_classes) > 0
+    return lo, hi, has_na
+
+
+# ---------------- Generalization ----------------
+def _value_strings(values):
+    """str() of each value, printing integral floats without the trailing .0"""
+    values = pd.Series(values)
+    if pd.api.types.is_float_dtype(values) and np.all(np.mod(values, 1) == 0):
+        values = values.astype(np.int64)
+    return values.astype(str).to_numpy(dtype=object)
+
+
+def _generalize_column(col_codes, class_ids, n_classes, numeric, uniques):
+    """
+    Generalized value for every row of one quasi-identifier column: the
+    class's "lo-hi" range for numeric columns, or its "{a, b, ...}" value
+    set for categorical ones.  Classes holding missing values get " | NaN".
+    A column with no values at all stays missing.
+    """
+    na_code = len(uniques)
+    if na_code == 0:
+        return np.full(len(class_ids), np.nan, dtype=object)
+    lo, hi, has_na = _class_bounds(col_codes, class_ids, n_classes, na_code)
+    empty = hi < 0
+    lo[empty] = hi[empty] = 0
+    lo_str = _value_strings(uniques[lo])
+    labels = lo_str.copy()
+
+    multi = (lo != hi) & ~empty
+    if numeric:
+        hi_str = _value_strings(uniques[hi])
+        labels[multi] = lo_str[multi] + "-" + hi_str[multi]
+    elif multi.any():
+        # Join the distinct values of each multi-valued class.
+        rows = multi[class_ids] & (col_codes != na_code)
+        stride = np.int64(na_code + 1)
+        pairs = np.unique(class_ids[rows] * stride + col_codes[rows])
+        value_str = _value_strings(uniques[pairs % stride]).tolist()
+        pair_cls = pairs // stride
+        starts = np.flatnonzero(np.r_[True, pair_cls[1:] != pair_cls[:-1]])
+        ends = np.r_[starts[1:], len(pairs)]
+        labels[pair_cls[starts]] = ["{" + ", ".join(value_str[a:b]) + "}"
+                                    for a, b in zip(starts.tolist(), ends.tolist())]
+
+    labels[has_na & ~empty] = labels[has_na & ~empty] + " | NaN"
+    labels[empty] = np.nan
+    return labels[class_ids]
+
+
+# ---------------- Information Loss ----------------
+def information_loss(codes, tables, class_ids, n_classes, k):
+    """
+    Standard utility metrics for a partitioning:
+      NCP  - normalized certainty penalty (0 = no loss, 1 = fully generalized):
+             mean over records and quasi-identifiers of the class's value range
+             over the column's range (numeric), or of its code range over the
+             number of distinct values (categorical)
+      DM   - discernibility metric, sum of squared class sizes
+      CAVG - normalized average class size, (n / classes) / k  (1 is ideal)
+    """
+    n = len(class_ids)
+    sizes = np.bincount(class_ids, minlength=n_classes)
+    ncp_total = 0.0
+    for j, (numeric, uniques) in enumerate(tables):
+        if len(uniques) < 2:
+            continue
+        lo, hi, _ = _class_bounds(codes[:, j], class_ids, n_classes, len(uniques))
+        present = hi >= 0
+        if numeric:
+            values = uniques.astype(np.float64)
+            width = np.zeros(n_classes)
+            width[present] = values[hi[present]] - values[lo[present]]
+            span = values[-1] - values[0]
+        else:
+            width = np.where(present, hi - lo, 0).astype(np.float64)
+            span = len(uniques) - 1
+        ncp_total += float((width / span * sizes).sum())
+    return {
+        "NCP": ncp_total / (n * codes.shape[1]) if n and codes.shape[1] else 0.0,
+        "DM": int((sizes.astype(np.int64) ** 2).sum()),
+        "CAVG": float(n / n_classes / k) if n_classes else 0.0,
+    }
+
+
+# ---------------- Public API ----------------
+@dataclass
+class MondrianResult:
+    data: pd.DataFrame
+    k: int
+    n_classes: int
+    min_class_size: int
+    metrics: dict
+
+
+def anonymize(df, quasi_cols, k, memory_budget=None):
+    """
+    Mondrian k-anonymization of `df` on `quasi_cols`.
+
+    Returns a MondrianResult whose `data` is a copy of `df` with every
+    quasi-identifier replaced by its equivalence-class generalization, so
+    each class has at least k rows.  If `memory_budget` (bytes) is given and
+    the estimated working set exceeds it, a MemoryError is raised before any
+    work is done.
+    """
+    quasi_cols = list(quasi_cols)
+    if not quasi_cols:
+        raise ValueError("Select at least one quasi-identifier column.")
+    if memory_budget is not None and estimate_memory(len(df), len(quasi_cols)) > memory_budget:
+        raise MemoryError(
+            f"Estimated {estimate_memory(len(df), len(quasi_cols)) / 1e6:.0f} MB exceeds "
+            f"the {memory_budget / 1e6:.0f} MB budget; use the out-of-core mode instead."
+        )
+
+    codes, tables = _encode(df, quasi_cols)
+    spans = np.array([max(len(uniques), 1) for _, uniques in tables], dtype=np.float64)
+    partitions = _partition(codes, k, spans)
+
+    class_ids = np.empty(len(df), dtype=np.int64)
+    for cls, rows in enumerate(partitions):
+        class_ids[rows] = cls
+    n_classes = len(partitions)
+
+    out = df.copy()
+    for j, col in enumerate(quasi_cols):
+        numeric, uniques = tables[j]
+        out[col] = _generalize_column(codes[:, j], class_ids, n_classes, numeric, uniques)
+
+    sizes = np.bincount(class_ids, minlength=n_classes)
+    return MondrianResult(
+        data=out,
+        k=k,
+        n_classes=n_classes,
+        min_class_size=int(sizes.min()),
+        metrics=information_loss(codes, tables, class_ids, n_classes, k),
+    )
@@ -0,0 +1,296 @@
+# kanon_outofcore.py
+# -------------------------------------------------------------
+# Out-of-core k-anonymity over partitioned Parquet or chunked CSV
+# -------------------------------------------------------------
+# Datasets larger than memory are anonymized in two streaming passes:
+#
+#   1. Aggregate: every chunk is reduced to its distinct quasi-identifier
+#      tuples with counts and merged into a running table, so memory is
+#      bounded by the number of distinct tuples rather than the row count.
+#   2. Rewrite: the lattice search (or caller-supplied levels) runs on that
+#      weighted table; then each chunk is generalized, rows in classes
+#      smaller than k are suppressed, and the chunk is written out as its own
+#      partition (one Parquet file per chunk, or appended to one CSV).
+#
+# Peak memory is one chunk plus the distinct-tuple table.
+#
+#   python kanon_outofcore.py extract/ anonymized/ --quasi Age Zipcode --k 5
+import argparse
+import codecs
+import glob
+import os
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from kanon_hierarchies import default_hierarchy
+from kanon_index import EquivalenceIndex
+from kanon_lattice import achieved_k, apply_levels, search
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+CHUNK_ROWS = 200_000
+COMPACT_TUPLES = 2_000_000
+BLOCK_SIZE = 1024 * 1024
+COUNT = "count"
+
+
+# ---------------- Input ----------------
+def _is_parquet(source):
+    return isinstance(source, str) and (os.path.isdir(source) or source.lower().endswith(".parquet"))
+
+
+def _parquet_files(source):
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "**", "*.parquet"), recursive=True))
+    return [source]
+
+
+def detect_encoding(source):
+    """"utf-8" if the CSV decodes cleanly, else "latin1" (one streaming pass, no DataFrame)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    f = open(source, "rb") if isinstance(source, str) else source
+    try:
+        f.seek(0)
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+    finally:
+        if isinstance(source, str):
+            f.close()
+        else:
+            f.seek(0)
+
+
+def iter_chunks(source, columns=None, chunksize=CHUNK_ROWS, encoding="utf-8"):
+    """
+    Yield DataFrame chunks of at most `chunksize` rows from a Parquet file, a
+    directory of Parquet partitions, or a CSV path / binary file object.
+    """
+    if _is_parquet(source):
+        if not HAVE_ARROW:
+            raise ImportError("Reading Parquet requires pyarrow (pip install pyarrow).")
+        for path in _parquet_files(source):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        return
+    if hasattr(source, "seek"):
+        source.seek(0)
+    # `columns` are stripped names; match them against the header the same way
+    usecols = None if columns is None else (lambda name, wanted=frozenset(columns): name.strip() in wanted)
+    with pd.read_csv(source, usecols=usecols, chunksize=chunksize, encoding=encoding) as reader:
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+
+
+# ---------------- Pass 1: Aggregation ----------------
+def _combine(parts, n_cols):
+    merged = pd.concat(parts)
+    return merged.groupby(level=list(range(n_cols)), dropna=False, sort=False).sum()
+
+
+def aggregate(chunks, quasi_cols, compact_tuples=COMPACT_TUPLES):
+    """
+    Distinct quasi-identifier tuples with their record counts (column "count")
+    across all `chunks`.  Per-chunk counts are merged whenever the pending
+    partial tables exceed `compact_tuples` rows.
+    """
+    parts, pending, rows = [], 0, 0
+    for chunk in chunks:
+        counts = chunk.groupby(quasi_cols, dropna=False, sort=False).size()
+        parts.append(counts)
+        pending += len(counts)
+        rows += len(chunk)
+        if pending > compact_tuples and len(parts) > 1:
+            parts = [_combine(parts, len(quasi_cols))]
+            pending = len(parts[0])
+    if not parts:
+        return pd.DataFrame({**{col: [] for col in quasi_cols}, COUNT: []}), 0
+    table = _combine(parts, len(quasi_cols)) if len(parts) > 1 else parts[0]
+    return table.rename(COUNT).reset_index(), rows
+
+
+# ---------------- Output ----------------
+class PartitionWriter:
+    """
+    Writes anonymized chunks either as numbered Parquet files in a directory
+    or appended to one CSV (path ending in .csv, or a binary file object).
+    Every file is written under a temporary name and renamed when complete.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.csv = not isinstance(target, str) or target.lower().endswith(".csv")
+        self.paths = []
+        self._csv_tmp = None
+        if not self.csv:
+            if not HAVE_ARROW:
+                raise ImportError("Writing Parquet requires pyarrow (pip install pyarrow).")
+            os.makedirs(target, exist_ok=True)
+
+    def write(self, df):
+        if self.csv:
+            first = self._csv_tmp is None
+            if isinstance(self.target, str):
+                if first:
+                    self._csv_tmp = open(self.target + ".tmp", "w", encoding="utf-8", newline="")
+                df.to_csv(self._csv_tmp, index=False, header=first)
+            else:
+                self._csv_tmp = self.target
+                self.target.write(df.to_csv(index=False, header=first).encode("utf-8"))
+            return
+        path = os.path.join(self.target, f"part-{len(self.paths):05d}.parquet")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.paths.append(path)
+
+    def close(self):
+        if self.csv and isinstance(self.target, str) and self._csv_tmp is not None:
+            self._csv_tmp.close()
+            os.replace(self.target + ".tmp", self.target)
+            self.paths.append(self.target)
+
+    def abort(self):
+        """Drop the unfinished CSV; finished Parquet parts are left in place."""
+        if self.csv and isinstance(self.target, str) and self._csv_tmp is not None:
+            self._csv_tmp.close()
+            os.remove(self.target + ".tmp")
+
+
+# ---------------- Public API ----------------
+@dataclass
+class OutOfCoreResult:
+    levels: dict
+    k: int
+    rows_in: int
+    rows_out: int
+    distinct_tuples: int
+    n_classes: int
+    seconds: float
+    outputs: list = field(default_factory=list)
+    lattice: object = None
+
+    @property
+    def suppressed(self):
+        return self.rows_in - self.rows_out
+
+
+def anonymize_partitioned(source, output, quasi_cols, k, levels=None, hierarchies=None,
+                          max_suppression=0.0, chunksize=CHUNK_ROWS, workers=1, progress=None):
+    """
+    k-anonymize `source` (Parquet file/directory or CSV) into `output` in two
+    streaming passes.  Without `levels` the optimal full-domain
+    generalization is found with kanon_lattice.search on the aggregated
+    tuple counts.  `progress(stage, rows)` is called after every chunk.
+    """
+    start = time.perf_counter()
+    quasi_cols = list(quasi_cols)
+    if not quasi_cols:
+        raise ValueError("Select at least one quasi-identifier column.")
+    encoding = "utf-8" if _is_parquet(source) else detect_encoding(source)
+
+    def chunks(columns=None):
+        for chunk in iter_chunks(source, columns, chunksize, encoding):
+            yield chunk
+            if progress is not None:
+                progress("aggregate" if columns else "write", len(chunk))
+
+    table, rows_in = aggregate(chunks(quasi_cols), quasi_cols)
+    if rows_in < k:
+        raise ValueError(f"Dataset has {rows_in} rows; cannot reach k={k}.")
+    hierarchies = hierarchies or {}
+    hierarchies = {col: hierarchies.get(col) or default_hierarchy(table[col]) for col in quasi_cols}
+
+    lattice = None
+    if levels is None:
+        lattice = search(table[quasi_cols], quasi_cols, k, hierarchies, max_suppression,
+                         workers=workers, weights=table[COUNT])
+        index = lattice.index
+    else:
+        index = EquivalenceIndex(table, quasi_cols, hierarchies, weights=table[COUNT])
+        index.set_levels(levels)
+        if index.rows_below(k) > max_suppression * rows_in:
+            raise ValueError(f"Levels {levels} leave {index.rows_below(k):,} rows in classes "
+                             f"smaller than k={k}, over the allowed suppression.")
+
+    writer = PartitionWriter(output)
+    rows_out = 0
+    try:
+        for chunk in chunks():
+            out = apply_levels(chunk, index, k)
+            writer.write(out)
+            rows_out += len(out)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    sizes = index.class_sizes()
+    return OutOfCoreResult(
+        levels=dict(index.levels),
+        k=achieved_k(sizes, k),
+        rows_in=rows_in,
+        rows_out=rows_out,
+        distinct_tuples=len(table),
+        n_classes=int((sizes >= k).sum()),
+        seconds=time.perf_counter() - start,
+        outputs=writer.paths,
+        lattice=lattice,
+    )
+
+
+# ---------------- CLI ----------------
+def _parse_levels(items):
+    levels = {}
+    for item in items or ():
+        col, _, level = item.rpartition("=")
+        levels[col] = int(level)
+    return levels or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="k-anonymize a Parquet dataset or CSV file that does not fit in memory.")
+    parser.add_argument("source", help="Parquet file, directory of Parquet partitions, or CSV file")
+    parser.add_argument("output", help="output directory (Parquet parts) or .csv file")
+    parser.add_argument("--quasi", nargs="+", required=True, help="quasi-identifier columns")
+    parser.add_argument("--k", type=int, required=True, help="minimum equivalence-class size")
+    parser.add_argument("--levels", nargs="+", metavar="COL=LEVEL",
+                        help="fixed generalization levels instead of the lattice search")
+    parser.add_argument("--max-suppression", type=float, default=0.0,
+                        help="fraction of rows that may be suppressed (default 0)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the lattice search")
+    args = parser.parse_args(argv)
+
+    seen = {"aggregate": 0, "write": 0}
+
+    def progress(stage, rows):
+        seen[stage] += rows
+        print(f"... {stage}: {seen[stage]:,} rows", flush=True)
+
+    result = anonymize_partitioned(args.source, args.output, args.quasi, args.k,
+                                   levels=_parse_levels(args.levels),
+                                   max_suppression=args.max_suppression,
+                                   chunksize=args.chunksize, workers=args.workers,
+                                   progress=progress)
+    print(f"levels: {result.levels}")
+    print(f"k = {result.k}, {result.n_classes:,} classes from {result.distinct_tuples:,} distinct tuples")
+    print(f"{result.rows_out:,} of {result.rows_in:,} rows written "
+          f"({result.suppressed:,} suppressed) in {result.seconds:.1f} s")
+    for path in result.outputs:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
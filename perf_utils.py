@@ -0,0 +1,32 @@
+# perf_utils.py
+# -------------------------------------------------------------
+# Small helpers shared by the command-line tools and benchmarks
+# -------------------------------------------------------------
+# parse_size() reads sizes such as "256KB" or "1.5MB" (binary units),
+# timed() times a single call, and repo_path() resolves a file shipped with
+# the repository (sample_data.txt, ...) independently of the working
+# directory.
+import os
+import time
+
+UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_size(size):
+    size = size.upper()
+    for unit, factor in UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[:-len(unit)]) * factor)
+    return int(size)
+
+
+def timed(fn, *args):
+    """(seconds, result) of fn(*args)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def repo_path(*parts):
+    return os.path.join(REPO_DIR, *parts)
@@ -1,54 +1,28 @@
 # phishing_detector.py
 import pandas as pd
 import streamlit as st
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score
-import time
-
-# ---------------- Feature Extraction ----------------
-def extract_features(url: str):
-    if not isinstance(url, str):
-        url = str(url)
-    return {
-        "url_length": len(url),
-        "has_at": 1 if "@" in url else 0,
-        "has_https": 1 if url.lower().startswith("https") else 0,
-        "num_digits": sum(c.isdigit() for c in url),
-        "num_hyphen": url.count("-"),
-        "num_subdir": url.count("/")  # crude approximation of subdirectories
-    }
-
-# ---------------- Example Training Dataset ----------------
-# small sample dataset (replace with real dataset for better results)
-data = {
-    "url": [
-        "https://www.google.com",
-        "http://phishing-site.com/login@secure",
-        "https://secure-bank.com/account",
-        "http://fake-update.com/install",
-        "https://amazon.com/payment",
-        "http://paypal.verify-account.com"
-    ],
-    "label": [0, 1, 0, 1, 0, 1]  # 0 = legitimate, 1 = phishing
-}
-df = pd.DataFrame(data)
-
-# Extract features for training
-feature_df = pd.DataFrame([extract_features(u) for u in df["url"]])
-X = feature_df
-y = df["label"]
-
-# Train/Test Split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Model Training (increase max_iter to avoid convergence warnings on small data)
-model = LogisticRegression(max_iter=200, solver="liblinear")
-model.fit(X_train, y_train)
-
-# Accuracy
-y_pred = model.predict(X_test)
-acc = accuracy_score(y_test, y_pred)
+
+from domain_reputation import ALLOW, BLOCK, load_default
+from phishing_model import load_model, save_model, train_demo
+from phishing_scorer import ScoreStats, iter_url_batches, score_batches
+from scan_cache import ScanCache, content_hash
+
+# ---------------- Model ----------------
+# The model is a versioned artifact (see phishing_model.py) loaded once per
+# process and shared by every session.  On a fresh checkout the demo model
+# is trained and saved once.
+try:
+    model = load_model()
+except FileNotFoundError:
+    save_model(train_demo())
+    model = load_model()
+acc = model.metadata.get("holdout_accuracy", float("nan"))
+
+# Blocklisted/allowlisted domains override the model (reputation.bin, if present)
+reputation = load_default()
+
+# Batch results are cached per uploaded file, model version and reputation table
+scan_cache = ScanCache("phishing", f"{model.version}-{reputation.fingerprint}")
 
 # ---------------- Streamlit UI ----------------
 st.set_page_config(page_title="Phishing Detector", page_icon="🛡️", layout="wide")
@@ -65,7 +39,7 @@ st.markdown(
 )
 st.markdown("<div class='main-title'>Batch Phishing Website Detection</div>", unsafe_allow_html=True)
 st.markdown("<div class='sub-text'>Upload a file with URLs or check a single URL. (Demo model trained with tiny sample)</div>", unsafe_allow_html=True)
-st.info(f"Model trained (demo) — accuracy on small holdout: **{acc*100:.2f}%**")
+st.info(f"Active model **{model.version}** — accuracy on holdout: **{acc*100:.2f}%**")
 
 # ---------------- Single URL Check ----------------
 st.subheader("Check a Single URL")
@@ -75,11 +49,17 @@ if st.button("Check Now"):
     if user_url.strip() == "":
         st.warning("Please enter a valid URL.")
     else:
-        features = pd.DataFrame([extract_features(user_url)])
+        features = model.featurize([user_url])
         try:
-            prediction = model.predict(features)[0]
-            result = "Phishing Website" if prediction == 1 else "Legitimate Website"
-            st.success(f"Result: {result}")
+            listed, suffix = reputation.lookup(user_url)
+            if listed == BLOCK:
+                st.error(f"Result: Phishing Website (blocklisted domain {suffix})")
+            elif listed == ALLOW:
+                st.success(f"Result: Legitimate Website (allowlisted domain {suffix})")
+            else:
+                prediction = model.predict(features)[0]
+                result = "Phishing Website" if prediction == 1 else "Legitimate Website"
+                st.success(f"Result: {result}")
         except Exception as e:
             st.error(f"Error making prediction: {e}")
 
@@ -91,43 +71,32 @@ uploaded_file = st.file_uploader("Upload your file (CSV: first column = URLs or
 
 if uploaded_file is not None:
     try:
-        # Read uploaded file robustly
-        if uploaded_file.name.lower().endswith(".csv"):
-            url_df = pd.read_csv(uploaded_file, header=None, encoding="utf-8", engine="python")
-            urls = url_df.iloc[:, 0].astype(str).tolist()
-        else:  # TXT file
-            content = uploaded_file.read()
-            # attempt decode in fallback-safe way
-            if isinstance(content, bytes):
-                try:
-                    text = content.decode("utf-8")
-                except Exception:
-                    text = content.decode("latin-1", errors="ignore")
-            else:
-                text = str(content)
-            urls = [line.strip() for line in text.splitlines() if line.strip()]
-
-        if not urls:
-            st.warning("No URLs found in the uploaded file.")
+        digest = content_hash(uploaded_file)
+        results = scan_cache.get(digest)
+        if results is not None:
+            st.write("Loaded cached results for this file.")
         else:
             st.write("File uploaded successfully. Running detection...")
 
-            # Progress simulation
+            # Stream the file through the scorer in batches with real progress
+            kind = "csv" if uploaded_file.name.lower().endswith(".csv") else "txt"
             progress = st.progress(0)
-            for i in range(100):
-                time.sleep(0.004)
-                progress.progress(i + 1)
-
-            # Extract features & predict
-            batch_features = pd.DataFrame([extract_features(u) for u in urls])
-            batch_preds = model.predict(batch_features)
-
-            # Create results table
-            results = pd.DataFrame({
-                "URL": urls,
-                "Prediction": ["Phishing" if p == 1 else "Legitimate" for p in batch_preds]
-            })
-
+            status = st.empty()
+            stats = ScoreStats()
+            parts = []
+            for part in score_batches(iter_url_batches(uploaded_file, kind), model, stats,
+                                      reputation):
+                parts.append(part)
+                progress.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0))
+                status.write(f"{stats.urls:,} URLs scored — {stats.rate:,.0f} URLs/s")
+            progress.progress(1.0)
+            if parts:
+                results = pd.concat(parts, ignore_index=True)
+                scan_cache.put(digest, results)
+
+        if results is None:
+            st.warning("No URLs found in the uploaded file.")
+        else:
             st.subheader("Results Table")
             st.dataframe(results, use_container_width=True)
 
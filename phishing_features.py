@@ -0,0 +1,202 @@
+# phishing_features.py
+# -------------------------------------------------------------
+# URL feature extraction for phishing_detector.py
+# -------------------------------------------------------------
+# extract_features() handles one URL; extract_features_batch() turns a whole
+# column of URLs into a contiguous float32 matrix (rows = URLs, columns =
+# FEATURE_NAMES) with Arrow/pandas string kernels, so scoring millions of
+# URLs costs a few passes in C instead of a dict per URL.
+#
+# ngram_features_batch() is the alternative pipeline: character n-grams
+# hashed into a fixed-size sparse vector, so no vocabulary is kept and
+# memory does not grow with the training data.
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+FEATURE_NAMES = ("url_length", "has_at", "has_https", "num_digits", "num_hyphen", "num_subdir")
+
+# Below this many URLs the per-URL path beats the fixed cost of building
+# Arrow arrays (e.g. single requests in phishing_service.py).
+SMALL_BATCH = 48
+
+
+# ---------------- Single URL ----------------
+def extract_features(url: str):
+    if not isinstance(url, str):
+        url = str(url)
+    return {
+        "url_length": len(url),
+        "has_at": 1 if "@" in url else 0,
+        "has_https": 1 if url.lower().startswith("https") else 0,
+        "num_digits": sum(c.isdigit() for c in url),
+        "num_hyphen": url.count("-"),
+        "num_subdir": url.count("/")  # crude approximation of subdirectories
+    }
+
+
+# ---------------- Batch ----------------
+def _as_strings(urls):
+    """URLs as a Series of str (non-strings go through str(), like extract_features)."""
+    series = urls if isinstance(urls, pd.Series) else pd.Series(urls, dtype=object)
+    if pd.api.types.infer_dtype(series, skipna=False) != "string":
+        series = series.astype(object).map(str)
+    return series.reset_index(drop=True)
+
+
+def _string_buffers(series):
+    """(offsets, bytes) of the URLs as one Arrow large_string array, as NumPy views."""
+    arr = pa.array(series, type=pa.large_string())
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+    data = np.frombuffer(arr.buffers()[2], dtype=np.uint8) if arr.buffers()[2] else np.empty(0, np.uint8)
+    return arr, offsets - offsets[0], data[offsets[0]:offsets[-1]]
+
+
+def _segment_counts(mask, offsets):
+    """Number of True bytes in each string's [offsets[i], offsets[i+1]) range."""
+    counts = np.zeros(len(offsets) - 1, dtype=np.int64)
+    nonempty = offsets[1:] > offsets[:-1]
+    if nonempty.any():
+        counts[nonempty] = np.add.reduceat(mask.view(np.uint8), offsets[:-1][nonempty], dtype=np.int32)
+    return counts
+
+
+def _arrow_columns(series, out):
+    arr, offsets, data = _string_buffers(series)
+    out[:, 0] = np.diff(offsets)
+    out[:, 1] = pc.count_substring(arr, "@").to_numpy(zero_copy_only=False) > 0
+    out[:, 2] = pc.starts_with(arr, "https", ignore_case=True).to_numpy(zero_copy_only=False)
+    out[:, 3] = _segment_counts((data - np.uint8(ord("0"))) < 10, offsets)
+    out[:, 4] = pc.count_substring(arr, "-").to_numpy(zero_copy_only=False)
+    out[:, 5] = pc.count_substring(arr, "/").to_numpy(zero_copy_only=False)
+    return pc.invert(pc.string_is_ascii(arr)).to_numpy(zero_copy_only=False)
+
+
+def _pandas_columns(series, out):
+    text = series.astype(object)
+    out[:, 0] = text.str.len()
+    out[:, 1] = text.str.contains("@", regex=False)
+    out[:, 2] = text.str.lower().str.startswith("https")
+    out[:, 3] = text.str.count("[0-9]")
+    out[:, 4] = text.str.count("-")
+    out[:, 5] = text.str.count("/")
+    return ~text.map(str.isascii).to_numpy(dtype=bool)
+
+
+def extract_features_batch(urls):
+    """
+    Feature matrix for many URLs: float32, shape (len(urls), 6), C-contiguous,
+    columns in FEATURE_NAMES order and values identical to extract_features().
+    The bulk kernels work on ASCII (lengths are byte counts, digits are 0-9);
+    the rare non-ASCII URLs are recomputed with extract_features().
+    """
+    if len(urls) <= SMALL_BATCH:
+        out = np.array([list(extract_features(u).values()) for u in urls], dtype=np.float32)
+        return out.reshape(len(urls), len(FEATURE_NAMES))
+    series = _as_strings(urls)
+    out = np.empty((len(series), len(FEATURE_NAMES)), dtype=np.float32)
+    if not len(series):
+        return out
+    non_ascii = _arrow_columns(series, out) if HAVE_ARROW else _pandas_columns(series, out)
+    for i in np.flatnonzero(non_ascii):
+        out[i] = list(extract_features(series.iat[i]).values())
+    return out
+
+
+# ---------------- Hashed Character N-grams ----------------
+# N-grams are taken over the lower-cased UTF-8 bytes of each URL.  Every
+# n-gram is hashed straight from the byte buffer with vectorized 64-bit
+# arithmetic (polynomial rolling hash + a murmur3 finalizer), so a batch is
+# a handful of NumPy passes plus one CSR build; nothing is kept between
+# batches.
+NGRAM_RANGE = (3, 5)
+HASH_FEATURES = 2 ** 20
+NGRAM_CHUNK = 65_536
+# Schema recorded in model artifacts: changing any of these needs retraining.
+NGRAM_FEATURE_NAMES = (f"utf8_{NGRAM_RANGE[0]}_{NGRAM_RANGE[1]}_grams", f"hashed_{HASH_FEATURES}",
+                       "murmur3_fmix64_l2")
+
+_BASE = np.uint64(0x100000001B3)
+_FMIX1 = np.uint64(0xFF51AFD7ED558CCD)
+_FMIX2 = np.uint64(0xC4CEB9FE1A85EC53)
+
+
+def _fmix64(h):
+    h ^= h >> np.uint64(33)
+    h *= _FMIX1
+    h ^= h >> np.uint64(33)
+    h *= _FMIX2
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def _utf8_buffers(series):
+    """(offsets, lower-cased bytes) of the URLs, via Arrow when available."""
+    if HAVE_ARROW:
+        _, offsets, data = _string_buffers(series)
+        data = data.copy()
+    else:
+        encoded = [u.encode("utf-8") for u in series]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+    upper = (data - np.uint8(ord("A"))) < 26
+    data[upper] += np.uint8(32)
+    return offsets, data
+
+
+def _ngram_block(series):
+    from scipy import sparse
+
+    lo, hi = NGRAM_RANGE
+    offsets, data = _utf8_buffers(series)
+    n_rows, n_bytes = len(offsets) - 1, len(data)
+    lengths = np.diff(offsets)
+    row = np.repeat(np.arange(n_rows, dtype=np.int32), lengths)
+    remaining = offsets[1:][row] - np.arange(n_bytes)  # bytes left in the URL from each position
+    padded = np.concatenate([data, np.zeros(hi, dtype=np.uint8)]).astype(np.uint64)
+
+    # grams[p, j] = hash of the (lo + j)-gram starting at byte p
+    grams = np.empty((n_bytes, hi - lo + 1), dtype=np.uint64)
+    h = np.zeros(n_bytes, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(hi):
+            h = h * _BASE + padded[k:k + n_bytes]
+            if k + 1 >= lo:
+                grams[:, k + 1 - lo] = _fmix64(h + np.uint64(k + 1))
+    valid = remaining[:, None] >= np.arange(lo, hi + 1)
+    cols = (grams[valid] & np.uint64(HASH_FEATURES - 1)).astype(np.int32)
+    per_row = sum(np.clip(lengths - n + 1, 0, None) for n in range(lo, hi + 1))
+    indptr = np.concatenate([[0], np.cumsum(per_row)])
+
+    X = sparse.csr_matrix((np.ones(len(cols)), cols, indptr), shape=(n_rows, HASH_FEATURES))
+    X.sum_duplicates()
+    row_nnz = np.diff(X.indptr)
+    norms = np.sqrt(np.bincount(np.repeat(np.arange(n_rows), row_nnz), weights=X.data ** 2,
+                                minlength=n_rows))
+    X.data /= np.repeat(norms, row_nnz)
+    return X
+
+
+def ngram_features_batch(urls):
+    """
+    Sparse CSR matrix (len(urls) x HASH_FEATURES, float64) of hashed byte
+    3-5-gram counts of the lower-cased URLs, L2-normalized per row.  The
+    hashing is stateless, so batches can be transformed independently.
+    """
+    from scipy import sparse
+
+    series = _as_strings(urls)
+    blocks = [_ngram_block(series.iloc[i:i + NGRAM_CHUNK])
+              for i in range(0, len(series), NGRAM_CHUNK)]
+    if not blocks:
+        return sparse.csr_matrix((0, HASH_FEATURES))
+    return blocks[0] if len(blocks) == 1 else sparse.vstack(blocks, format="csr")
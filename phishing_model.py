@@ -0,0 +1,342 @@
+# phishing_model.py
+# -------------------------------------------------------------
+# Versioned phishing model artifacts: training CLI and loader
+# -------------------------------------------------------------
+# A trained linear model (logistic regression, or an SGD logistic learner
+# trained online over streamed batches) is saved as a directory
+#
+#   models/phishing-<version>/model.json    version, feature schema, metrics
+#   models/phishing-<version>/weights.npy   coefficient vector
+#
+# plus models/LATEST naming the active version.  The version is a hash of
+# the schema and weights, so every worker that loads it scores identically.
+# load_model() memory-maps the weights once per process and hands the same
+# object to every caller (e.g. every Streamlit session); loading needs only
+# NumPy, not scikit-learn.
+#
+#   python phishing_model.py train --data labeled.csv --url-col url --label-col label
+#   python phishing_model.py train --featurizer char-ngram-v1 --online --resume --data feed.csv
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from phishing_features import (FEATURE_NAMES, NGRAM_FEATURE_NAMES, extract_features_batch,
+                               ngram_features_batch)
+from scan_cache import ruleset_version
+
+MODEL_DIR = os.environ.get("PHISHING_MODEL_DIR", "models")
+LATEST = "LATEST"
+PREFIX = "phishing-"
+
+# Featurizers by schema name; an artifact records which one it was trained on.
+FEATURIZERS = {
+    "handcrafted-v1": (FEATURE_NAMES, extract_features_batch),
+    "char-ngram-v1": (NGRAM_FEATURE_NAMES, ngram_features_batch),
+}
+DEFAULT_FEATURIZER = "handcrafted-v1"
+TRAIN_CHUNK_ROWS = 100_000
+
+# ---------------- Example Training Dataset ----------------
+# small sample dataset (replace with real dataset for better results)
+DEMO_DATA = {
+    "url": [
+        "https://www.google.com",
+        "http://phishing-site.com/login@secure",
+        "https://secure-bank.com/account",
+        "http://fake-update.com/install",
+        "https://amazon.com/payment",
+        "http://paypal.verify-account.com"
+    ],
+    "label": [0, 1, 0, 1, 0, 1]  # 0 = legitimate, 1 = phishing
+}
+
+
+# ---------------- Model ----------------
+@dataclass
+class PhishingModel:
+    """A loaded artifact: linear weights plus the feature schema they expect."""
+    version: str
+    featurizer: str
+    features: tuple
+    coef: np.ndarray
+    intercept: float
+    classes: tuple = (0, 1)
+    metadata: dict = field(default_factory=dict)
+
+    def featurize(self, urls):
+        return FEATURIZERS[self.featurizer][1](urls)
+
+    def decision_function(self, X):
+        return X @ self.coef + self.intercept
+
+    def predict_proba(self, X):
+        """Probability of the positive (phishing) class for each row of X."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X):
+        return np.where(self.decision_function(X) > 0, self.classes[1], self.classes[0])
+
+    def predict_urls(self, urls):
+        return self.predict(self.featurize(urls))
+
+
+# ---------------- Training ----------------
+def _version(featurizer, features, coef, intercept, classes):
+    weights = hashlib.sha256(np.ascontiguousarray(coef, dtype=np.float64).tobytes()).hexdigest()
+    return ruleset_version(featurizer, features, weights, intercept, classes)
+
+
+def train(urls, labels, featurizer=DEFAULT_FEATURIZER, test_size=0.3, random_state=42):
+    """Fit a logistic regression on `urls` and return an (unsaved) PhishingModel."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    features, featurize = FEATURIZERS[featurizer]
+    X = featurize(urls)
+    y = np.asarray(labels)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size,
+                                                        random_state=random_state)
+    # increase max_iter to avoid convergence warnings on small data
+    clf = LogisticRegression(max_iter=200, solver="liblinear")
+    clf.fit(X_train, y_train)
+
+    coef = clf.coef_.ravel().astype(np.float64)
+    intercept = float(clf.intercept_[0])
+    classes = tuple(int(c) for c in clf.classes_)
+    return PhishingModel(
+        version=_version(featurizer, features, coef, intercept, classes),
+        featurizer=featurizer,
+        features=tuple(features),
+        coef=coef,
+        intercept=intercept,
+        classes=classes,
+        metadata={
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "train_rows": int(len(y_train)),
+            "test_rows": int(len(y_test)),
+            "holdout_accuracy": float(accuracy_score(y_test, clf.predict(X_test))),
+            "params": clf.get_params(),
+        },
+    )
+
+
+def train_demo():
+    """The app's original demo model, trained on DEMO_DATA."""
+    return train(DEMO_DATA["url"], DEMO_DATA["label"])
+
+
+def train_online(batches, featurizer="char-ngram-v1", base=None, alpha=1e-6):
+    """
+    Fit a logistic-loss SGDClassifier with partial_fit over `batches` of
+    (urls, labels), holding one batch in memory at a time.  `base` (a loaded
+    PhishingModel with the same featurizer) warm-starts from its weights,
+    e.g. to continue on today's feed.  Accuracy is progressive validation:
+    every batch is scored before the model trains on it.
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    features, featurize = FEATURIZERS[featurizer]
+    clf = SGDClassifier(loss="log_loss", alpha=alpha, random_state=42)
+    classes = np.array([0, 1])
+    trained = 0
+    if base is not None:
+        if base.featurizer != featurizer:
+            raise ValueError(f"Cannot resume {base.featurizer!r} model with {featurizer!r} features.")
+        clf.coef_ = np.array(base.coef, dtype=np.float64).reshape(1, -1)
+        clf.intercept_ = np.array([base.intercept])
+        clf.classes_ = np.asarray(base.classes)
+        clf.t_ = float(base.metadata.get("sgd_t", 1.0))
+        clf.n_features_in_ = clf.coef_.shape[1]
+        trained = int(base.metadata.get("train_rows", 0))
+
+    correct = scored = rows = 0
+    for urls, labels in batches:
+        X = featurize(urls)
+        y = np.asarray(labels, dtype=np.int64)
+        if hasattr(clf, "coef_"):
+            correct += int((clf.predict(X) == y).sum())
+            scored += len(y)
+        clf.partial_fit(X, y, classes=classes)
+        rows += len(y)
+    if not rows and base is None:
+        raise ValueError("No labeled rows to train on.")
+
+    coef = clf.coef_.ravel().astype(np.float64)
+    intercept = float(clf.intercept_[0])
+    model_classes = tuple(int(c) for c in clf.classes_)
+    return PhishingModel(
+        version=_version(featurizer, features, coef, intercept, model_classes),
+        featurizer=featurizer,
+        features=tuple(features),
+        coef=coef,
+        intercept=intercept,
+        classes=model_classes,
+        metadata={
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "train_rows": trained + rows,
+            "test_rows": scored,
+            "holdout_accuracy": correct / scored if scored else float("nan"),
+            "evaluation": "progressive",
+            "resumed_from": base.version if base is not None else None,
+            "sgd_t": float(clf.t_),
+            "params": clf.get_params(),
+        },
+    )
+
+
+def iter_labeled_batches(path, url_col="url", label_col="label", chunksize=TRAIN_CHUNK_ROWS):
+    """(urls, labels) batches from a labeled CSV, `chunksize` rows at a time."""
+    with pd.read_csv(path, usecols=[url_col, label_col], chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk.dropna()
+            yield chunk[url_col].astype(str).tolist(), chunk[label_col].astype(np.int64).to_numpy()
+
+
+# ---------------- Artifacts ----------------
+def _atomic_write_text(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def save_model(model, directory=MODEL_DIR, activate=True):
+    """
+    Write `model` to <directory>/phishing-<version>/ and, with `activate`,
+    point <directory>/LATEST at it.  The artifact directory is assembled under
+    a temporary name and renamed into place.  Returns the artifact path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, PREFIX + model.version)
+    if not os.path.isdir(path):
+        tmp = tempfile.mkdtemp(dir=directory, prefix=".tmp-")
+        try:
+            np.save(os.path.join(tmp, "weights.npy"), np.ascontiguousarray(model.coef))
+            meta = {
+                "version": model.version,
+                "featurizer": model.featurizer,
+                "features": list(model.features),
+                "intercept": model.intercept,
+                "classes": list(model.classes),
+                "metadata": model.metadata,
+            }
+            with open(os.path.join(tmp, "model.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2, default=str)
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):  # else another process saved the same version
+                raise
+    if activate:
+        _atomic_write_text(os.path.join(directory, LATEST), model.version + "\n")
+    return path
+
+
+def latest_version(directory=MODEL_DIR):
+    """Active model version from <directory>/LATEST, or None if nothing was saved."""
+    try:
+        with open(os.path.join(directory, LATEST), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _read_model(path):
+    with open(os.path.join(path, "model.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    featurizer = meta["featurizer"]
+    if featurizer not in FEATURIZERS:
+        raise ValueError(f"Model {meta['version']} needs unknown featurizer {featurizer!r}.")
+    if tuple(meta["features"]) != tuple(FEATURIZERS[featurizer][0]):
+        raise ValueError(f"Model {meta['version']} was trained on features {meta['features']}, "
+                         f"but {featurizer!r} now produces {list(FEATURIZERS[featurizer][0])}.")
+    return PhishingModel(
+        version=meta["version"],
+        featurizer=featurizer,
+        features=tuple(meta["features"]),
+        coef=np.asarray(np.load(os.path.join(path, "weights.npy"), mmap_mode="r")),
+        intercept=float(meta["intercept"]),
+        classes=tuple(meta["classes"]),
+        metadata=meta.get("metadata", {}),
+    )
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def load_model(version=None, directory=MODEL_DIR):
+    """
+    The model `version` (default: the one named by LATEST) from `directory`.
+    Each artifact is read once per process; later calls return the same
+    object.  Raises FileNotFoundError if no model has been saved.
+    """
+    version = version or latest_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"No phishing model in {directory!r}; run "
+                                f"`python phishing_model.py train` first.")
+    path = os.path.abspath(os.path.join(directory, PREFIX + version))
+    with _load_lock:
+        if path not in _loaded:
+            _loaded[path] = _read_model(path)
+        return _loaded[path]
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and save a versioned phishing model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="train a model and make it the active version")
+    p_train.add_argument("--data", help="labeled CSV (default: the built-in demo URLs)")
+    p_train.add_argument("--url-col", default="url")
+    p_train.add_argument("--label-col", default="label")
+    p_train.add_argument("--featurizer", choices=sorted(FEATURIZERS), default=DEFAULT_FEATURIZER)
+    p_train.add_argument("--online", action="store_true",
+                         help="stream --data in chunks through an SGD learner (partial_fit)")
+    p_train.add_argument("--chunksize", type=int, default=TRAIN_CHUNK_ROWS,
+                         help="rows per --online training batch")
+    p_train.add_argument("--resume", action="store_true",
+                         help="with --online, continue from the active model's weights")
+    p_train.add_argument("--out", default=MODEL_DIR, help="model directory")
+    p_train.add_argument("--no-activate", action="store_true", help="save without updating LATEST")
+    p_show = sub.add_parser("show", help="print the active (or given) model's metadata")
+    p_show.add_argument("--version")
+    p_show.add_argument("--dir", default=MODEL_DIR, help="model directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        if args.online:
+            if args.data:
+                batches = iter_labeled_batches(args.data, args.url_col, args.label_col, args.chunksize)
+            else:
+                batches = [(DEMO_DATA["url"], DEMO_DATA["label"])]
+            base = load_model(directory=args.out) if args.resume else None
+            model = train_online(batches, args.featurizer, base=base)
+        elif args.data:
+            labeled = pd.read_csv(args.data, usecols=[args.url_col, args.label_col])
+            model = train(labeled[args.url_col], labeled[args.label_col], args.featurizer)
+        else:
+            model = train(DEMO_DATA["url"], DEMO_DATA["label"], args.featurizer)
+        path = save_model(model, args.out, activate=not args.no_activate)
+        print(f"saved model {model.version} to {path}")
+        evaluation = model.metadata.get("evaluation", "holdout")
+        print(f"{evaluation} accuracy: {model.metadata['holdout_accuracy'] * 100:.2f}% "
+              f"({model.metadata['test_rows']} rows)")
+    else:
+        model = load_model(args.version, args.dir)
+        print(json.dumps({"version": model.version, "featurizer": model.featurizer,
+                          "features": model.features, **model.metadata}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
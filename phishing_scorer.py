@@ -0,0 +1,171 @@
+# phishing_scorer.py
+# -------------------------------------------------------------
+# Streaming phishing scorer for large URL lists and log files
+# -------------------------------------------------------------
+# URLs are read from a file or stdin in fixed-size batches, featurized and
+# scored with the active model (phishing_model.load_model), and written out
+# incrementally as CSV or JSONL.  Memory is bounded by one batch, so input
+# size is unlimited.  Progress and throughput go to stderr.
+#
+#   python phishing_scorer.py proxy_urls.txt --out verdicts.jsonl
+#   zcat access.log.gz | python phishing_scorer.py - --format csv > verdicts.csv
+import argparse
+import itertools
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from domain_reputation import ALLOW, BLOCK, REPUTATION_PATH, load_default
+from phishing_model import MODEL_DIR, load_model
+
+BATCH_SIZE = 50_000
+LABELS = np.array(["Legitimate", "Phishing"], dtype=object)
+SOURCES = np.array(["model", "blocklist", "allowlist"], dtype=object)  # by reputation verdict
+
+
+# ---------------- Input ----------------
+def _decode(block):
+    try:
+        return block.decode("utf-8")
+    except UnicodeDecodeError:
+        return block.decode("latin-1")
+
+
+def iter_text_batches(stream, batch_size=BATCH_SIZE):
+    """Lists of up to `batch_size` non-blank, stripped lines from a binary stream."""
+    while True:
+        lines = list(itertools.islice(stream, batch_size))
+        if not lines:
+            return
+        urls = [line.strip() for line in _decode(b"".join(lines)).splitlines()]
+        urls = [u for u in urls if u]
+        if urls:
+            yield urls
+
+
+def iter_csv_batches(stream, batch_size=BATCH_SIZE, column=0, header=False):
+    """Lists of URLs from one column of a CSV, `batch_size` rows at a time."""
+    reader = pd.read_csv(stream, header=0 if header else None, usecols=[column], dtype=str,
+                         chunksize=batch_size, encoding="utf-8", encoding_errors="replace",
+                         keep_default_na=False, skip_blank_lines=True)
+    with reader:
+        for chunk in reader:
+            urls = chunk.iloc[:, 0].str.strip()
+            urls = urls[urls != ""]
+            if len(urls):
+                yield urls.tolist()
+
+
+def iter_url_batches(stream, kind="txt", batch_size=BATCH_SIZE, column=0, header=False):
+    """URL batches from a binary stream holding a CSV (`kind="csv"`) or one URL per line."""
+    if kind == "csv":
+        return iter_csv_batches(stream, batch_size, column, header)
+    return iter_text_batches(stream, batch_size)
+
+
+# ---------------- Scoring ----------------
+@dataclass
+class ScoreStats:
+    urls: int = 0
+    phishing: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self):
+        return self.urls / self.seconds if self.seconds else 0.0
+
+
+def score_batch(urls, model, reputation=None):
+    """
+    Results table (URL, Prediction, Score, Source) for one batch of URLs.
+    Domains on the `reputation` blocklist/allowlist override the model.
+    """
+    X = model.featurize(urls)
+    scores = model.predict_proba(X)
+    phishing = model.predict(X) == model.classes[1]
+    verdicts = np.zeros(len(urls), dtype=np.uint8)
+    if reputation is not None and len(reputation):
+        verdicts = reputation.verdicts(urls)
+        phishing = np.where(verdicts == BLOCK, True, np.where(verdicts == ALLOW, False, phishing))
+        scores = np.where(verdicts == BLOCK, 1.0, np.where(verdicts == ALLOW, 0.0, scores))
+    return pd.DataFrame({
+        "URL": urls,
+        "Prediction": LABELS[phishing.astype(np.int8)],
+        "Score": scores.round(6),
+        "Source": SOURCES[verdicts],
+    })
+
+
+def score_batches(batches, model, stats=None, reputation=None):
+    """Yield a results table per URL batch, updating `stats` as it goes."""
+    stats = stats if stats is not None else ScoreStats()
+    start = time.perf_counter() - stats.seconds
+    for urls in batches:
+        results = score_batch(urls, model, reputation)
+        stats.urls += len(results)
+        stats.phishing += int((results["Prediction"] == "Phishing").sum())
+        stats.batches += 1
+        stats.seconds = time.perf_counter() - start
+        yield results
+
+
+# ---------------- Output ----------------
+def write_results(results, out, fmt, first):
+    """Append one results table to a text stream as CSV (header on the first batch) or JSONL."""
+    if fmt == "jsonl":
+        text = results.to_json(orient="records", lines=True, force_ascii=False)
+        out.write(text if text.endswith("\n") else text + "\n")
+    else:
+        results.to_csv(out, index=False, header=first)
+    out.flush()
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score URLs for phishing in streaming batches.")
+    parser.add_argument("source", help="URL file (TXT, or CSV with --csv / .csv suffix); - for stdin")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=("csv", "jsonl"),
+                        help="output format (default: from --out suffix, else csv)")
+    parser.add_argument("--csv", action="store_true", help="treat the input as CSV")
+    parser.add_argument("--column", type=int, default=0, help="CSV column holding the URL")
+    parser.add_argument("--header", action="store_true", help="the CSV has a header row")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="URLs per batch")
+    parser.add_argument("--model-version", help="model version (default: the active one)")
+    parser.add_argument("--model-dir", default=MODEL_DIR, help="model directory")
+    parser.add_argument("--reputation", default=REPUTATION_PATH,
+                        help="domain reputation file (see domain_reputation.py; skipped if missing)")
+    parser.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if (args.out or "").lower().endswith((".jsonl", ".json")) else "csv")
+    kind = "csv" if args.csv or args.source.lower().endswith(".csv") else "txt"
+    model = load_model(args.model_version, args.model_dir)
+    reputation = load_default(args.reputation)
+
+    source = sys.stdin.buffer if args.source == "-" else open(args.source, "rb")
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    stats = ScoreStats()
+    try:
+        batches = iter_url_batches(source, kind, args.batch_size, args.column, args.header)
+        for results in score_batches(batches, model, stats, reputation):
+            write_results(results, out, fmt, first=stats.batches == 1)
+            if not args.quiet:
+                print(f"... {stats.urls:,} URLs, {stats.phishing:,} phishing, "
+                      f"{stats.rate:,.0f} URLs/s", file=sys.stderr, flush=True)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(f"scored {stats.urls:,} URLs ({stats.phishing:,} phishing) in {stats.seconds:.1f} s "
+              f"with model {model.version} — {stats.rate:,.0f} URLs/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+# phishing_service.py
+# -------------------------------------------------------------
+# Low-latency phishing scoring service with request micro-batching
+# -------------------------------------------------------------
+# A small asyncio HTTP/1.1 server (standard library only) around the active
+# phishing model.  Concurrent single-URL requests are queued and scored
+# together: the batcher waits at most `max_wait` after the first request,
+# or until `max_batch` URLs are queued, then featurizes and predicts the
+# whole batch in one call.  Recent verdicts are kept in an LRU cache, so
+# repeated URLs skip the model entirely, and domains on the reputation
+# blocklist/allowlist (domain_reputation.py) are answered without it.
+#
+#   GET  /score?url=<url>          -> {"url", "verdict", "score", "cached", "source"}
+#                                     (source: "model", "cache" or "reputation")
+#   POST /score  {"url": ...}      -> same; {"urls": [...]} -> {"results": [...]}
+#   GET  /metrics                  -> QPS, p50/p99 latency, batch and cache stats
+#   GET  /health
+#
+#   python phishing_service.py --port 8088 --max-batch 64 --max-wait-ms 2
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from domain_reputation import ALLOW, BLOCK, REPUTATION_PATH, load_default
+from phishing_model import MODEL_DIR, load_model
+
+MAX_BATCH = 64
+MAX_WAIT = 0.002
+CACHE_SIZE = 100_000
+LATENCY_WINDOW = 10_000
+QPS_WINDOW = 10.0
+MAX_BODY = 1024 * 1024
+VERDICTS = ("Legitimate", "Phishing")
+
+
+# ---------------- Cache & Metrics ----------------
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Metrics:
+    """Request latencies over the last LATENCY_WINDOW requests and QPS over QPS_WINDOW seconds."""
+
+    def __init__(self):
+        self.requests = 0
+        self.batches = 0
+        self.batched_urls = 0
+        self.reputation_hits = 0
+        self.started = time.monotonic()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._times = deque()
+
+    def record(self, seconds):
+        now = time.monotonic()
+        self.requests += 1
+        self._latencies.append(seconds)
+        self._times.append(now)
+        while self._times and now - self._times[0] > QPS_WINDOW:
+            self._times.popleft()
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_urls += size
+
+    def snapshot(self, cache):
+        now = time.monotonic()
+        while self._times and now - self._times[0] > QPS_WINDOW:
+            self._times.popleft()
+        window = min(QPS_WINDOW, now - self.started) or 1.0
+        lat = np.fromiter(self._latencies, dtype=np.float64) * 1000
+        return {
+            "requests": self.requests,
+            "qps": round(len(self._times) / window, 1),
+            "p50_ms": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+            "p99_ms": round(float(np.percentile(lat, 99)), 3) if len(lat) else None,
+            "batches": self.batches,
+            "mean_batch": round(self.batched_urls / self.batches, 2) if self.batches else 0.0,
+            "cache_size": len(cache),
+            "cache_hit_rate": round(cache.hits / max(cache.hits + cache.misses, 1), 4),
+            "reputation_hits": self.reputation_hits,
+        }
+
+
+# ---------------- Micro-batching ----------------
+class MicroBatcher:
+    """Collects concurrent score() calls into batches of up to max_batch URLs."""
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=MAX_WAIT, cache=None, metrics=None,
+                 reputation=None):
+        self.model = model
+        self.reputation = reputation
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache if cache is not None else LRUCache()
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._queue = asyncio.Queue()
+        self._pending = {}  # url -> future, so duplicate in-flight URLs share one slot
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, url):
+        """(verdict, score, source) for one URL; source is "reputation", "cache" or "model"."""
+        if self.reputation is not None and len(self.reputation):
+            listed = self.reputation.verdict(url)
+            if listed in (BLOCK, ALLOW):
+                self.metrics.reputation_hits += 1
+                phishing = listed == BLOCK
+                return VERDICTS[phishing], float(phishing), "reputation"
+        hit = self.cache.get(url)
+        if hit is not None:
+            return hit + ("cache",)
+        future = self._pending.get(url)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[url] = future
+            self._queue.put_nowait(url)
+        verdict, score = await asyncio.shield(future)
+        return verdict, score, "model"
+
+    async def _collect(self):
+        urls = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(urls) < self.max_batch:
+            while not self._queue.empty() and len(urls) < self.max_batch:
+                urls.append(self._queue.get_nowait())
+            timeout = deadline - asyncio.get_running_loop().time()
+            if len(urls) >= self.max_batch or timeout <= 0:
+                break
+            try:
+                urls.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return urls
+
+    async def _run(self):
+        while True:
+            urls = await self._collect()
+            try:
+                decision = self.model.decision_function(self.model.featurize(urls))
+                scores = 1.0 / (1.0 + np.exp(-decision))
+                positive = decision > 0
+            except Exception as e:  # fail this batch, keep serving
+                for url in urls:
+                    future = self._pending.pop(url, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                continue
+            self.metrics.record_batch(len(urls))
+            for url, is_phish, score in zip(urls, positive.tolist(), scores.tolist()):
+                result = (VERDICTS[is_phish], round(score, 6))
+                self.cache.put(url, result)
+                future = self._pending.pop(url, None)
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+
+# ---------------- HTTP ----------------
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class PhishingService:
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait=MAX_WAIT, cache_size=CACHE_SIZE,
+                 reputation=None):
+        self.model = model
+        self.metrics = Metrics()
+        self.cache = LRUCache(cache_size)
+        self.batcher = MicroBatcher(model, max_batch, max_wait, self.cache, self.metrics, reputation)
+
+    async def _result(self, url):
+        verdict, score, source = await self.batcher.score(url)
+        return {"url": url, "verdict": verdict, "score": score, "cached": source == "cache", "source": source}
+
+    async def dispatch(self, method, target, body):
+        """(status, payload) for one request."""
+        parts = urlsplit(target)
+        if parts.path == "/health":
+            return 200, {"status": "ok", "model": self.model.version}
+        if parts.path == "/metrics":
+            return 200, {"model": self.model.version, **self.metrics.snapshot(self.cache)}
+        if parts.path != "/score":
+            return 404, {"error": "not found"}
+        if method == "GET":
+            url = parse_qs(parts.query).get("url", [""])[0]
+            if not url:
+                return 400, {"error": "missing url parameter"}
+            return 200, await self._result(url)
+        if method != "POST":
+            return 405, {"error": "use GET or POST"}
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "body must be JSON"}
+        if isinstance(data, dict) and isinstance(data.get("urls"), list):
+            results = await asyncio.gather(*(self._result(str(u)) for u in data["urls"]))
+            return 200, {"results": list(results)}
+        if isinstance(data, dict) and data.get("url"):
+            return 200, await self._result(str(data["url"]))
+        return 400, {"error": "expected {\"url\": ...} or {\"urls\": [...]}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_response(400, {"error": "bad request line"}, False))
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() != "HTTP/1.0")
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(_response(400, {"error": "bad Content-Length"}, False))
+                    break
+                if length > MAX_BODY:
+                    writer.write(_response(413, {"error": "body too large"}, False))
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if status == 200 and urlsplit(target).path == "/score":
+                    self.metrics.record(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8088):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve phishing verdicts over HTTP with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="URLs per model call")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000,
+                        help="longest a request waits for its batch to fill")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="LRU verdict cache entries")
+    parser.add_argument("--model-version", help="model version (default: the active one)")
+    parser.add_argument("--model-dir", default=MODEL_DIR, help="model directory")
+    parser.add_argument("--reputation", default=REPUTATION_PATH,
+                        help="domain reputation file (see domain_reputation.py; skipped if missing)")
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model_version, args.model_dir)
+    service = PhishingService(model, args.max_batch, args.max_wait_ms / 1000, args.cache_size,
+                              load_default(args.reputation))
+    print(f"serving model {model.version} on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch}, max wait {args.max_wait_ms} ms)", flush=True)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+# pii_engine.py
+# -------------------------------------------------------------
+# Headless PII scanning engine used by PII_Identification_App.py
+# -------------------------------------------------------------
+# CSV files are read in fixed-size chunks and TXT files line by line, so
+# every row is scanned while memory stays bounded by the chunk size and the
+# per-column hit counters.  Both scanners are generators that yield the
+# running report after each chunk so callers can show live progress.
+import argparse
+import io
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (enables Arrow regex kernels for str.contains)
+    HAVE_ARROW = True
+except ImportError:
+    HAVE_ARROW = False
+
+# ---------------- PII Patterns ----------------
+PII_PATTERNS = {
+    "Email": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    "Phone": r"\b\d{10}\b",
+    "Aadhaar/SSN": r"\b\d{12}\b|\b\d{3}-\d{2}-\d{4}\b",
+    "Credit Card": r"\b\d{4}-\d{4}-\d{4}-\d{4}\b",
+    "IP Address": r"\b(?:\d{1,3}\.){3}\d{1,3}\b",
+}
+
+# Labels whose matches always begin with a digit at a word boundary.  They
+# sit behind a \b(?=\d) guard, so positions that can't start a number are
+# rejected before any of their alternatives is tried.
+_DIGIT_LED = ("Phone", "Aadhaar/SSN", "Credit Card", "IP Address")
+
+
+def _group_name(label):
+    return re.sub(r"\W+", "_", label).strip("_")
+
+
+def _guarded(label, pattern):
+    return rf"\b(?=\d)(?:{pattern})" if label in _DIGIT_LED else pattern
+
+
+def _build_regex(patterns):
+    """
+    Compile all patterns into a single alternation with one named group per
+    label.  It finds whether a string holds any PII in one pass, but as the
+    first alternative wins at each offset it can't report overlapping
+    matches of different labels; find_pii() uses LABEL_REGEXES for those.
+    """
+    groups = {label: f"(?P<{_group_name(label)}>{pattern})"
+              for label, pattern in patterns.items()}
+    plain = [groups[label] for label in patterns if label not in _DIGIT_LED]
+    guarded = [groups[label] for label in patterns if label in _DIGIT_LED]
+    if guarded:
+        plain.append(r"\b(?=\d)(?:" + "|".join(guarded) + ")")
+    return re.compile("|".join(plain))
+
+
+PII_REGEX = _build_regex(PII_PATTERNS)
+LABEL_REGEXES = {label: re.compile(_guarded(label, pattern)) for label, pattern in PII_PATTERNS.items()}
+
+CHUNK_ROWS = 50_000
+SHARD_ROWS = 10_000
+STRING_DTYPE = "string[pyarrow]" if HAVE_ARROW else "string[python]"
+TEXT_CHUNK_LINES = 10_000
+TEXT_COLUMN = "text"
+
+
+# ---------------- Report ----------------
+@dataclass
+class PIIReport:
+    """Running PII hit counts: column -> {label: number of cells/lines hit}."""
+    counts: dict = field(default_factory=dict)
+    rows_scanned: int = 0
+    samples: list = field(default_factory=list)
+
+    def add(self, column, hits):
+        self.counts.setdefault(column, Counter()).update(hits)
+
+    def labels(self, column):
+        """PII labels seen in a column, in PII_PATTERNS order."""
+        hits = self.counts.get(column, {})
+        return [label for label in PII_PATTERNS if hits.get(label)]
+
+    def all_labels(self):
+        seen = set()
+        for hits in self.counts.values():
+            seen.update(label for label, n in hits.items() if n)
+        return [label for label in PII_PATTERNS if label in seen]
+
+    def to_records(self):
+        """Rows for the downloadable PII report (columns without PII are skipped)."""
+        records = []
+        for column, hits in self.counts.items():
+            labels = self.labels(column)
+            if labels:
+                records.append({
+                    "Column": column,
+                    "Detected PII": ", ".join(labels),
+                    "Hits": ", ".join(f"{label}: {hits[label]}" for label in labels),
+                })
+        return records
+
+
+# ---------------- Matching ----------------
+class PIIMatch(NamedTuple):
+    label: str
+    start: int
+    end: int
+    text: str
+
+
+def find_pii(text):
+    """
+    Every PII match in `text` as (label, start, end, text), ordered by
+    position.  Each label is scanned separately, so matches of different
+    labels may overlap ("9876543210@x.com" is both an Email and a Phone).
+    """
+    if not PII_REGEX.search(text):
+        return []
+    matches = [PIIMatch(label, m.start(), m.end(), m.group())
+               for label, regex in LABEL_REGEXES.items() for m in regex.finditer(text)]
+    matches.sort(key=lambda m: (m.start, -m.end))
+    return matches
+
+
+def match_labels(matches):
+    """Distinct labels of a find_pii() result, in PII_PATTERNS order."""
+    seen = {m.label for m in matches}
+    return [label for label in PII_PATTERNS if label in seen]
+
+
+def highlight_matches(text, matches,
+                      template='<span style="color:red; font-weight:bold;">{}</span>'):
+    """Wrap each match span of a find_pii() result in `template`; overlapping spans are merged."""
+    spans = []
+    for m in matches:
+        if spans and m.start < spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], m.end)
+        else:
+            spans.append([m.start, m.end])
+    parts = []
+    pos = 0
+    for start, end in spans:
+        parts.append(text[pos:start])
+        parts.append(template.format(text[start:end]))
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+# ---------------- Scanning ----------------
+def scan_values(values):
+    """
+    Count, per PII label, how many of the given strings contain a match.
+    Only strings the combined regex hits are searched label by label.
+    """
+    search = PII_REGEX.search
+    labeled = LABEL_REGEXES.items()
+    return Counter(label for value in values if search(value)
+                   for label, regex in labeled if regex.search(value))
+
+
+def scan_series(series):
+    """Per-label hit counts for one DataFrame column."""
+    return scan_values(series.dropna().astype(str))
+
+
+# ---------------- Vectorized column scanning ----------------
+def pii_masks(series):
+    """
+    Per-row PII masks for one column: a boolean DataFrame aligned with
+    `series.index`, one column per label.  Each label is tested on its own
+    with str.contains, which runs on Arrow's regex kernels when pyarrow is
+    installed and on pandas' string methods otherwise.
+    """
+    values = series.astype(STRING_DTYPE)
+    return pd.DataFrame({label: values.str.contains(pattern, regex=True, na=False)
+                         for label, pattern in PII_PATTERNS.items()},
+                        index=series.index)
+
+
+def scan_series_vectorized(series):
+    """Per-label hit counts for one column, from pii_masks()."""
+    totals = pii_masks(series).sum()
+    return Counter({label: int(n) for label, n in totals.items() if n})
+
+
+def pii_rows(df):
+    """Row index labels holding each PII type: {column: {label: Index}}."""
+    rows = {}
+    for col in df.columns:
+        masks = pii_masks(df[col])
+        rows[col] = {label: df.index[masks[label].to_numpy()]
+                     for label in masks.columns if masks[label].any()}
+    return rows
+
+
+# ---------------- Parallel column scanning ----------------
+def _scan_shard(shard):
+    """Worker entry point: (column position, values, vectorized) -> (position, hits)."""
+    position, values, vectorized = shard
+    if vectorized:
+        return position, scan_series_vectorized(pd.Series(values, dtype=STRING_DTYPE))
+    return position, scan_values(values)
+
+
+def _iter_shards(df, rows_per_shard, vectorized):
+    for position in range(df.shape[1]):
+        values = df.iloc[:, position].dropna().astype(str)
+        for start in range(0, len(values), rows_per_shard):
+            yield position, values.iloc[start:start + rows_per_shard].tolist(), vectorized
+
+
+def scan_dataframe(df, workers=1, rows_per_shard=SHARD_ROWS, executor=None, vectorized=False):
+    """
+    Per-column PII hit counts for a DataFrame as {column: Counter}.
+
+    Each column is split into shards of `rows_per_shard` values which are
+    scanned on a process pool of `workers` processes (or on `executor`, if one
+    is passed in so a stream of chunks can reuse it).  With workers=1 and no
+    executor the shards are scanned serially; the merged output is identical.
+    vectorized=True counts each shard with pii_masks() instead of
+    scan_values() (same counts).
+    """
+    shards = _iter_shards(df, rows_per_shard, vectorized)
+    if executor is not None:
+        results = executor.map(_scan_shard, shards)
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_shard, shards))
+    else:
+        results = map(_scan_shard, shards)
+
+    merged = [Counter() for _ in range(df.shape[1])]
+    for position, hits in results:
+        merged[position].update(hits)
+    counts = {}
+    for col, hits in zip(df.columns, merged):
+        counts.setdefault(col, Counter()).update(hits)
+    return counts
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+        return True
+    return False
+
+
+def _with_encoding_fallback(scan, source, **kwargs):
+    """Run a scan generator as utf-8, restarting as latin1 on a decode error."""
+    try:
+        yield from scan(source, encoding="utf-8", **kwargs)
+    except UnicodeDecodeError:
+        if not isinstance(source, str) and not _rewind(source):
+            raise
+        yield from scan(source, encoding="latin1", **kwargs)
+
+
+def _scan_csv(source, encoding, chunksize, workers, vectorized):
+    report = PIIReport()
+    reader = pd.read_csv(source, encoding=encoding, dtype=str, keep_default_na=False,
+                         chunksize=chunksize)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with reader:
+            for chunk in reader:
+                for col, hits in scan_dataframe(chunk, executor=pool, vectorized=vectorized).items():
+                    report.add(col, hits)
+                report.rows_scanned += len(chunk)
+                yield report
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def scan_csv(source, chunksize=CHUNK_ROWS, workers=1, vectorized=False):
+    """
+    Stream a CSV (path or binary file object) in chunks of `chunksize` rows.
+    Each chunk's columns are scanned on `workers` processes (see scan_dataframe).
+    Yields the cumulative PIIReport after each chunk.
+    """
+    return _with_encoding_fallback(_scan_csv, source, chunksize=chunksize, workers=workers,
+                                   vectorized=vectorized)
+
+
+def _open_text(source, encoding):
+    if isinstance(source, str):
+        return open(source, encoding=encoding, newline="")
+    return io.TextIOWrapper(source, encoding=encoding, newline="")
+
+
+def _scan_text(source, encoding, chunk_lines, max_samples):
+    report = PIIReport()
+    stream = _open_text(source, encoding)
+    hits = Counter()
+    try:
+        for line in stream:
+            report.rows_scanned += 1
+            line_hits = scan_values((line,))
+            if line_hits:
+                hits.update(line_hits)
+                if len(report.samples) < max_samples:
+                    report.samples.append(line.rstrip("\r\n"))
+            if report.rows_scanned % chunk_lines == 0:
+                report.add(TEXT_COLUMN, hits)
+                hits = Counter()
+                yield report
+        report.add(TEXT_COLUMN, hits)
+        yield report
+    finally:
+        # Don't let the wrapper close an uploaded file object we don't own.
+        if isinstance(stream, io.TextIOWrapper) and not isinstance(source, str):
+            stream.detach()
+        else:
+            stream.close()
+
+
+def scan_text(source, chunk_lines=TEXT_CHUNK_LINES, max_samples=50):
+    """
+    Stream a text file (path or binary file object) line by line.
+    Yields the cumulative PIIReport every `chunk_lines` lines; up to
+    `max_samples` lines containing PII are kept for highlighting.
+    """
+    return _with_encoding_fallback(_scan_text, source, chunk_lines=chunk_lines,
+                                   max_samples=max_samples)
+
+
+def scan_file(path, **kwargs):
+    """Scan a path by extension and return the final PIIReport."""
+    scanner = scan_csv if path.lower().endswith(".csv") else scan_text
+    report = PIIReport()
+    for report in scanner(path, **kwargs):
+        pass
+    return report
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a CSV/TXT file and report PII per column.")
+    parser.add_argument("path", help="CSV or TXT file to scan")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows per CSV chunk")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="processes for CSV column scanning (1 = serial)")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="count CSV hits with per-row str.contains masks")
+    parser.add_argument("--out", help="write the PII report CSV here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.path.lower().endswith(".csv"):
+        scanner = scan_csv(args.path, chunksize=args.chunksize, workers=args.workers,
+                           vectorized=args.vectorized)
+    else:
+        scanner = scan_text(args.path)
+
+    report = PIIReport()
+    for report in scanner:
+        print(f"... {report.rows_scanned:,} rows scanned", flush=True)
+
+    report_df = pd.DataFrame(report.to_records(), columns=["Column", "Detected PII", "Hits"])
+    if args.out:
+        report_df.to_csv(args.out, index=False)
+    else:
+        print(report_df.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+# sandbox_pool.py
+# -------------------------------------------------------------
+# Pre-forked worker interpreters for running decrypted snippets
+# -------------------------------------------------------------
+# Each snippet runs in its own child interpreter (python -I), never in the
+# Streamlit process: a slow or looping snippet can't block the server, and
+# every run has its own stdout, so concurrent sessions can't mix output.
+# Interpreter start-up is taken off the request path by keeping `size`
+# idle workers ready; a worker serves exactly one run (it exits afterwards)
+# and a replacement is started in the background.
+#
+# Per run (Limits):
+#   cpu_seconds   RLIMIT_CPU; the child gets SIGXCPU, then SIGKILL
+#   memory_mb     resident memory, polled by the parent from /proc; the
+#                 child is killed past it.  RLIMIT_AS is set to
+#                 ADDRESS_SPACE_FACTOR times as much as a backstop (or to
+#                 memory_mb itself without /proc): allocations past it fail
+#                 with MemoryError, which ends the run as an error
+#   timeout       wall clock; the child's process group is killed
+#   max_output    bytes of stdout/stderr kept; the child is killed past it
+# stdout and stderr stream back as the snippet writes them (Run.iter_output).
+# How a run ended is decided by the parent only: the snippet runs inside the
+# worker, so anything the worker could report (exit codes, messages, pipes)
+# the snippet could fake.  "cpu limit" needs a CPU-limit signal and the
+# CPU time to match, "memory limit" a parent kill or a peak resident size
+# at the limit (from the child's rusage).
+#
+# This bounds resources, it is not a security boundary: a snippet still
+# runs as the server's user, with its file system and network access.  The
+# rlimits need the `resource` module (POSIX); elsewhere only the wall-clock
+# timeout and the output cap apply.
+#
+#   python sandbox_pool.py snippet.py --cpu 2 --memory 256 --timeout 5
+import argparse
+import codecs
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+    HAVE_RLIMITS = True
+except ImportError:
+    HAVE_RLIMITS = False
+
+POOL_SIZE = int(os.environ.get("SANDBOX_POOL_SIZE", 2))
+MAX_RUNNING = int(os.environ.get("SANDBOX_MAX_RUNNING", 8))
+READ_SIZE = 4096
+MB = 1024 * 1024
+ADDRESS_SPACE_FACTOR = 4
+MEMORY_POLL = 0.02  # seconds between resident-size checks
+CPU_ACCOUNTING_SLACK = 0.9  # rusage can read a few ticks below the RLIMIT_CPU that fired
+HAVE_PROC = os.path.exists("/proc/self/statm")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if HAVE_PROC else 0
+RUSAGE_RSS_UNIT = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KiB elsewhere
+
+
+@dataclass(frozen=True)
+class Limits:
+    cpu_seconds: int = 5
+    memory_mb: int = 256
+    timeout: float = 10.0
+    max_output: int = 1024 * 1024
+
+
+@dataclass
+class RunResult:
+    status: str  # ok | error | timeout | cpu limit | memory limit | output limit
+    returncode: int
+    output: str
+    seconds: float
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+# ---------------- Worker (child process) ----------------
+def _apply_limits(limits):
+    if not HAVE_RLIMITS:
+        return
+    cpu = max(1, int(limits["cpu_seconds"]))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = int(limits["address_space_mb"]) * MB
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _worker_main():
+    """Wait for one job on stdin (a JSON line of limits, then the code), run it, exit."""
+    limits = json.loads(sys.stdin.buffer.readline())
+    code = sys.stdin.buffer.read()
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)  # input() sees end of file instead of the job pipe
+    os.close(devnull)
+    _apply_limits(limits)
+    sys.argv = ["<snippet>"]
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    try:
+        exec(compile(code, "<snippet>", "exec"), namespace)
+    except MemoryError:
+        print("MemoryError: the snippet exceeded its address space limit", file=sys.stderr)
+        os._exit(1)
+    except SystemExit:
+        raise
+    except BaseException:
+        import traceback
+        etype, value, tb = sys.exc_info()
+        traceback.print_exception(etype, value, tb.tb_next)  # drop this frame
+        sys.exit(1)
+
+
+# ---------------- Runs ----------------
+def _job_limits(limits):
+    """The limits as sent to a worker, with the RLIMIT_AS size it should set."""
+    job = asdict(limits)
+    job["address_space_mb"] = limits.memory_mb * (ADDRESS_SPACE_FACTOR if HAVE_PROC else 1)
+    return job
+
+
+def _resident_bytes(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+class Run:
+    """One snippet executing in a worker; iterate its output, then take result()."""
+
+    def __init__(self, proc, limits, on_exit):
+        self.proc = proc
+        self.limits = limits
+        self.started = time.monotonic()
+        self._chunks = queue.Queue()
+        self._output = []
+        self._size = 0
+        self._killed = None  # status forced by the parent
+        self._usage = None  # the child's rusage, once reaped (POSIX)
+        self._on_exit = on_exit
+        self._done = threading.Event()
+        self._timer = threading.Timer(limits.timeout, self._kill, ("timeout",))
+        self._timer.daemon = True
+        self._timer.start()
+        threading.Thread(target=self._pump, daemon=True).start()
+        if HAVE_PROC:
+            threading.Thread(target=self._watch_memory, daemon=True).start()
+
+    def _kill(self, status):
+        if not self._done.is_set():  # not poll(): only _reap() may collect the child
+            self._killed = self._killed or status
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError, PermissionError):
+                self.proc.kill()
+
+    def _watch_memory(self):
+        limit = self.limits.memory_mb * MB
+        while not self._done.wait(MEMORY_POLL):
+            try:
+                if _resident_bytes(self.proc.pid) > limit:
+                    self._kill("memory limit")
+                    return
+            except (OSError, ValueError, IndexError):  # exited
+                return
+
+    def _reap(self):
+        """Wait for the child, keeping its resource usage."""
+        if hasattr(os, "wait4"):
+            _, status, self._usage = os.wait4(self.proc.pid, 0)
+            self.proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            self.proc.wait()
+
+    def _pump(self):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                data = self.proc.stdout.read1(READ_SIZE)
+                if not data:
+                    break
+                room = self.limits.max_output - self._size
+                if room <= 0:
+                    continue
+                if len(data) > room:
+                    data = data[:room]
+                    self._kill("output limit")
+                self._size += len(data)
+                text = decoder.decode(data)
+                if text:
+                    self._output.append(text)
+                    self._chunks.put(text)
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                self._output.append(tail)
+                self._chunks.put(tail)
+        finally:
+            self.proc.stdout.close()
+            self._reap()
+            self._timer.cancel()
+            self._done.set()
+            self._chunks.put(None)
+            self._on_exit()
+
+    def iter_output(self):
+        """Output text as it arrives, until the snippet exits or is killed."""
+        while True:
+            text = self._chunks.get()
+            if text is None:
+                self._chunks.put(None)  # later callers stop too
+                return
+            yield text
+
+    def cancel(self):
+        self._kill("timeout")
+
+    def result(self):
+        """Wait for the run to finish and classify how it ended."""
+        self._done.wait()
+        code = self.proc.returncode
+        if self._killed:
+            status = self._killed
+        elif code == 0:
+            status = "ok"
+        elif self._hit_cpu_limit(code):
+            status = "cpu limit"
+        elif self._hit_memory_limit():
+            status = "memory limit"
+        else:
+            status = "error"
+        return RunResult(status, code, "".join(self._output), time.monotonic() - self.started)
+
+    def _hit_cpu_limit(self, code):
+        """Killed by RLIMIT_CPU, not by another SIGKILL (the OOM killer, an operator)."""
+        if not HAVE_RLIMITS or code not in (-signal.SIGXCPU, -signal.SIGKILL) or self._usage is None:
+            return False
+        used = self._usage.ru_utime + self._usage.ru_stime
+        return used >= CPU_ACCOUNTING_SLACK * max(1, int(self.limits.cpu_seconds))
+
+    def _hit_memory_limit(self):
+        usage = self._usage
+        return usage is not None and usage.ru_maxrss * RUSAGE_RSS_UNIT >= self.limits.memory_mb * MB
+
+
+# ---------------- Pool ----------------
+class SandboxPool:
+    """
+    Keeps `size` idle worker interpreters started; run() hands each snippet
+    to one of them.  At most `max_running` snippets execute at once, further
+    run() calls wait for a slot.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_running=MAX_RUNNING, limits=Limits()):
+        self.size = size
+        self.limits = limits
+        self.workdir = tempfile.mkdtemp(prefix="sandbox_")
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_running)
+        self._closed = False
+        for _ in range(size):
+            self._idle.append(self._spawn())
+
+    def _spawn(self):
+        env = {"PATH": os.defpath, "PYTHONIOENCODING": "utf-8", "PYTHONDONTWRITEBYTECODE": "1"}
+        return subprocess.Popen([sys.executable, "-I", "-u", os.path.abspath(__file__), "--worker"],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                cwd=self.workdir, env=env, start_new_session=True)
+
+    def _replenish(self):
+        with self._lock:
+            if self._closed or len(self._idle) >= self.size:
+                return
+        proc = self._spawn()
+        with self._lock:
+            if self._closed or len(self._idle) >= self.size:
+                proc.kill()
+                proc.wait()
+            else:
+                self._idle.append(proc)
+
+    def _checkout(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SandboxPool is closed")
+            while self._idle:
+                proc = self._idle.pop()
+                if proc.poll() is None:
+                    break
+            else:
+                proc = None
+        threading.Thread(target=self._replenish, daemon=True).start()
+        return proc or self._spawn()
+
+    def run(self, code, limits=None):
+        """Start `code` (str or bytes) in a worker and return its Run."""
+        limits = limits or self.limits
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+        self._slots.acquire()
+        try:
+            proc = self._checkout()
+            try:
+                proc.stdin.write(json.dumps(_job_limits(limits)).encode("utf-8") + b"\n" + code)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass  # the worker died; result() reports its exit status
+        except BaseException:
+            self._slots.release()
+            raise
+        return Run(proc, limits, self._slots.release)
+
+    def execute(self, code, limits=None):
+        """Run `code` to completion and return its RunResult."""
+        return self.run(code, limits).result()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for proc in idle:
+            proc.kill()
+            proc.wait()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_pool():
+    """The process-wide pool, started on first use (shared by all Streamlit sessions)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Python file in a resource-limited worker.")
+    parser.add_argument("script", help="Python file to run ('-' for stdin)")
+    parser.add_argument("--cpu", type=int, default=Limits.cpu_seconds, help="CPU seconds")
+    parser.add_argument("--memory", type=int, default=Limits.memory_mb, help="resident memory in MB")
+    parser.add_argument("--timeout", type=float, default=Limits.timeout, help="wall-clock seconds")
+    args = parser.parse_args(argv)
+
+    if args.script == "-":
+        code = sys.stdin.buffer.read()
+    else:
+        with open(args.script, "rb") as f:
+            code = f.read()
+    pool = SandboxPool(size=1)
+    try:
+        run = pool.run(code, Limits(args.cpu, args.memory, args.timeout))
+        for text in run.iter_output():
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        result = run.result()
+    finally:
+        pool.close()
+    print(f"[{result.status}, exit {result.returncode}, {result.seconds:.2f} s]", file=sys.stderr)
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        _worker_main()
+    else:
+        sys.exit(main())
@@ -0,0 +1,130 @@
+# scan_cache.py
+# -------------------------------------------------------------
+# Shared on-disk result cache for the PII, vulnerability and phishing apps
+# -------------------------------------------------------------
+# Results are keyed by a SHA-256 of the scanned content plus a namespace and
+# a ruleset/model version, so re-uploading the same file (or a Streamlit
+# rerun after a widget change) returns the previous report without rescanning.
+# Entries are pickles in one directory; the least recently used ones are
+# evicted once the directory grows past its size cap.
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+CACHE_DIR = os.environ.get("SCAN_CACHE_DIR", ".scan_cache")
+MAX_CACHE_BYTES = int(os.environ.get("SCAN_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+BLOCK_SIZE = 1024 * 1024
+
+
+# ---------------- Hashing ----------------
+def content_hash(data):
+    """SHA-256 hex digest of bytes, str, or a binary file object (rewound afterwards)."""
+    h = hashlib.sha256()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        h.update(data)
+        return h.hexdigest()
+    data.seek(0)
+    for block in iter(lambda: data.read(BLOCK_SIZE), b""):
+        h.update(block)
+    data.seek(0)
+    return h.hexdigest()
+
+
+def ruleset_version(*parts):
+    """Short stable version string for a ruleset, e.g. a dict of regex patterns."""
+    blob = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+# ---------------- Cache ----------------
+class ScanCache:
+    """
+    Content-addressed pickle cache with LRU eviction.
+
+    `namespace` separates the apps and `version` identifies the ruleset or
+    model; changing either makes old entries unreachable, and they age out
+    through normal eviction.
+    """
+
+    def __init__(self, namespace, version, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.namespace = namespace
+        self.version = version
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{self.namespace}-{self.version}-{digest}.pkl")
+
+    def get(self, digest):
+        """
+        Cached value for `digest`, or None.  A hit refreshes the entry's LRU
+        position; an entry that can't be unpickled for any reason (truncated,
+        corrupted, or written by code that has since changed) is deleted.
+        """
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:  # a corrupt pickle can raise nearly anything
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, digest, value):
+        """Store `value` atomically, then evict old entries over the size cap."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(digest))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def get_or_compute(self, digest, compute):
+        """Return the cached value for `digest`, computing and storing it on a miss."""
+        value = self.get(digest)
+        if value is None:
+            value = compute()
+            self.put(digest, value)
+        return value
+
+    def evict(self):
+        """Delete least recently used entries until the directory fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pkl"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove every entry of this namespace (all versions)."""
+        prefix = f"{self.namespace}-"
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(prefix) and entry.name.endswith(".pkl"):
+                os.remove(entry.path)
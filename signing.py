@@ -0,0 +1,219 @@
+# signing.py
+# -------------------------------------------------------------
+# Transaction signing for the Digital Signatures lab
+# -------------------------------------------------------------
+# Key pairs live in a keystore directory (PKCS#8 PEM, file mode 0600,
+# encrypted when SIGNING_KEY_PASSPHRASE is set) and are loaded, or
+# generated on first use, once per process; later calls return the cached
+# pair, so signing never pays for an RSA key generation.  The PSS padding
+# and hash objects are built once at import.
+#
+# Modes:
+#   rsa-pss   RSA-2048, PSS with MGF1-SHA256, maximum salt length
+#   ed25519   Ed25519: much faster signing, 64-byte signatures
+#
+# sign_batch()/verify_batch() split a list of messages into one slice per
+# worker thread (per-message tasks would cost more than an Ed25519
+# signature).
+#
+#   python signing.py sign --mode ed25519 "Payment of $100 to Bob"
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
+
+KEYSTORE_DIR = os.environ.get("SIGNING_KEYSTORE", ".keystore")
+PASSPHRASE_ENV = "SIGNING_KEY_PASSPHRASE"
+MODES = ("rsa-pss", "ed25519")
+DEFAULT_MODE = "rsa-pss"
+RSA_KEY_SIZE = 2048
+SIGN_WORKERS = min(8, os.cpu_count() or 1)
+
+PSS_PADDING = padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+SIGNATURE_HASH = hashes.SHA256()
+
+
+# ---------------- Keys ----------------
+@dataclass(frozen=True)
+class KeyPair:
+    mode: str
+    private_key: object
+    public_key: object
+
+    @property
+    def key_id(self):
+        """Short fingerprint of the public key."""
+        der = self.public_key.public_bytes(serialization.Encoding.DER,
+                                           serialization.PublicFormat.SubjectPublicKeyInfo)
+        return hashlib.sha256(der).hexdigest()[:16]
+
+    def public_pem(self):
+        return self.public_key.public_bytes(serialization.Encoding.PEM,
+                                            serialization.PublicFormat.SubjectPublicKeyInfo)
+
+
+def generate_keypair(mode=DEFAULT_MODE):
+    if mode == "rsa-pss":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+    elif mode == "ed25519":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unknown signing mode {mode!r}; choose from {MODES}")
+    return KeyPair(mode, private_key, private_key.public_key())
+
+
+def _passphrase():
+    value = os.environ.get(PASSPHRASE_ENV)
+    return value.encode("utf-8") if value else None
+
+
+def _key_path(directory, mode):
+    return os.path.join(directory, f"{mode}.pem")
+
+
+def save_keypair(keypair, directory=KEYSTORE_DIR):
+    """Write the private key atomically, readable by the owner only."""
+    os.makedirs(directory, exist_ok=True)
+    passphrase = _passphrase()
+    encryption = (serialization.BestAvailableEncryption(passphrase) if passphrase
+                  else serialization.NoEncryption())
+    pem = keypair.private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                            encryption)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")  # created with mode 0600
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp, _key_path(directory, keypair.mode))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _read_keypair(directory, mode):
+    with open(_key_path(directory, mode), "rb") as f:
+        pem = f.read()
+    try:
+        private_key = serialization.load_pem_private_key(pem, password=_passphrase())
+    except (TypeError, ValueError) as e:  # missing or wrong passphrase, or not a key
+        raise ValueError(f"Cannot load {_key_path(directory, mode)} (check {PASSPHRASE_ENV}): {e}") from None
+    expected = rsa.RSAPrivateKey if mode == "rsa-pss" else ed25519.Ed25519PrivateKey
+    if not isinstance(private_key, expected):
+        raise ValueError(f"{_key_path(directory, mode)} does not hold a {mode} key")
+    return KeyPair(mode, private_key, private_key.public_key())
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def load_keypair(mode=DEFAULT_MODE, directory=KEYSTORE_DIR):
+    """
+    The keystore's key pair for `mode`, generated and saved on first use.
+    Read once per process; later calls return the same object.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown signing mode {mode!r}; choose from {MODES}")
+    path = os.path.abspath(_key_path(directory, mode))
+    with _load_lock:
+        if path not in _loaded:
+            try:
+                _loaded[path] = _read_keypair(directory, mode)
+            except FileNotFoundError:
+                keypair = generate_keypair(mode)
+                save_keypair(keypair, directory)
+                _loaded[path] = keypair
+        return _loaded[path]
+
+
+def rotate_keypair(mode=DEFAULT_MODE, directory=KEYSTORE_DIR):
+    """Replace the stored key pair for `mode` with a fresh one and return it."""
+    keypair = generate_keypair(mode)
+    with _load_lock:
+        save_keypair(keypair, directory)
+        _loaded[os.path.abspath(_key_path(directory, mode))] = keypair
+    return keypair
+
+
+# ---------------- Sign & Verify ----------------
+def _as_bytes(message):
+    return message.encode("utf-8") if isinstance(message, str) else message
+
+
+def sign_message(keypair, message):
+    if keypair.mode == "ed25519":
+        return keypair.private_key.sign(_as_bytes(message))
+    return keypair.private_key.sign(_as_bytes(message), PSS_PADDING, SIGNATURE_HASH)
+
+
+def verify_signature(public_key, message, signature):
+    """True if `signature` is valid for `message` under `public_key` (RSA-PSS or Ed25519)."""
+    try:
+        if isinstance(public_key, ed25519.Ed25519PublicKey):
+            public_key.verify(signature, _as_bytes(message))
+        else:
+            public_key.verify(signature, _as_bytes(message), PSS_PADDING, SIGNATURE_HASH)
+        return True
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+
+
+def _slices(items, parts):
+    step = -(-len(items) // parts)
+    return [items[i:i + step] for i in range(0, len(items), step)]
+
+
+def _map_slices(fn, items, workers):
+    """fn(slice) -> list over `workers` contiguous slices of items, concatenated in order."""
+    workers = max(1, min(workers, len(items)))
+    if workers == 1:
+        return fn(items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [result for part in pool.map(fn, _slices(items, workers)) for result in part]
+
+
+def sign_batch(keypair, messages, workers=SIGN_WORKERS):
+    """Signatures for a list of messages, in order."""
+    messages = list(messages)
+    return _map_slices(lambda part: [sign_message(keypair, m) for m in part], messages, workers)
+
+
+def verify_batch(public_key, messages, signatures, workers=SIGN_WORKERS):
+    """[bool] for each (message, signature) pair, in order."""
+    pairs = list(zip(messages, signatures))
+    return _map_slices(lambda part: [verify_signature(public_key, m, s) for m, s in part], pairs, workers)
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sign messages with the keystore's key pair.")
+    parser.add_argument("command", choices=("sign", "public-key", "rotate"))
+    parser.add_argument("messages", nargs="*", help="messages to sign (default: one per line on stdin)")
+    parser.add_argument("--mode", choices=MODES, default=DEFAULT_MODE)
+    parser.add_argument("--keystore", default=KEYSTORE_DIR)
+    args = parser.parse_intermixed_args(argv)
+
+    if args.command == "rotate":
+        keypair = rotate_keypair(args.mode, args.keystore)
+        print(f"new {args.mode} key {keypair.key_id}", file=sys.stderr)
+        return 0
+    keypair = load_keypair(args.mode, args.keystore)
+    if args.command == "public-key":
+        sys.stdout.write(keypair.public_pem().decode("ascii"))
+        return 0
+    messages = args.messages or [line.rstrip("\n") for line in sys.stdin]
+    for message, signature in zip(messages, sign_batch(keypair, messages)):
+        print(f"{signature.hex()}\t{message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
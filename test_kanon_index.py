@@ -0,0 +1,43 @@
+# test_kanon_index.py
+# -------------------------------------------------------------
+# Checks for kanon_index's equivalence-class counts
+# -------------------------------------------------------------
+# Usage:  python -m pytest test_kanon_index.py
+import numpy as np
+import pandas as pd
+
+from kanon_hierarchies import Hierarchy
+from kanon_index import EquivalenceIndex
+
+
+class Decades(Hierarchy):
+    """Level 1: decade.  Level 2: below / from 25, which nests in level 1 only without 20-29."""
+    max_level = 3
+
+    def _generalize(self, series, level):
+        if level == 1:
+            return series // 10
+        return np.where(series < 25, "lo", "hi")
+
+
+def test_missing_values_form_their_own_class():
+    df = pd.DataFrame({"Age": [30, 30, 40, np.nan, np.nan], "Zip": ["1", "1", "2", "2", "2"]})
+    index = EquivalenceIndex(df, ["Age", "Zip"])
+    assert index.k == 1
+    assert index.n_classes == 3
+    assert index.n_rows == 5
+    assert index.groups()["count"].tolist() == [2, 1, 2]
+    assert index.rows_below(2) == 1
+    assert index.groups()["Age"].isna().tolist() == [False, False, True]
+
+
+def test_roll_up_after_append_sees_new_values():
+    hierarchies = {"Age": Decades()}
+    index = EquivalenceIndex(pd.DataFrame({"Age": [5, 15, 30]}), ["Age"], hierarchies, {"Age": 1})
+    assert index.can_roll_up("Age", 2)
+    index.append(pd.DataFrame({"Age": [21, 28]}, index=[3, 4]))
+    assert not index.can_roll_up("Age", 2)
+    index.set_level("Age", 2)
+
+    fresh = EquivalenceIndex(pd.DataFrame({"Age": [5, 15, 30, 21, 28]}), ["Age"], hierarchies, {"Age": 2})
+    assert sorted(index.class_sizes().tolist()) == sorted(fresh.class_sizes().tolist()) == [2, 3]
@@ -0,0 +1,23 @@
+# test_pii_engine.py
+# -------------------------------------------------------------
+# Checks for pii_engine's matcher
+# -------------------------------------------------------------
+# Usage:  python -m pytest test_pii_engine.py
+from pii_engine import find_pii, highlight_matches, match_labels, scan_values
+
+
+def test_overlapping_labels_are_all_reported():
+    text = "call 9876543210@x.com"
+    matches = find_pii(text)
+    assert [(m.label, m.start, m.end) for m in matches] == [("Email", 5, 21), ("Phone", 5, 15)]
+    assert match_labels(matches) == ["Email", "Phone"]
+    assert scan_values([text]) == {"Email": 1, "Phone": 1}
+
+
+def test_highlight_merges_overlapping_spans():
+    text = "call 9876543210@x.com now"
+    assert highlight_matches(text, find_pii(text), "[{}]") == "call [9876543210@x.com] now"
+
+
+def test_no_pii():
+    assert find_pii("nothing to see here") == []
@@ -1,5 +1,7 @@
 import random
 
+from domain_reputation import DomainReputation
+
 demo = ["alice@example.com","bob@evil.com","carol@example.org","team@bad.example"]
 
 # Ask user once and reuse the response
@@ -7,9 +9,11 @@ s = input("Enter emails (comma separated) or press Enter for demo: ").strip()
 mails = s.split(',') if s else demo
 
 SUSP = {"evil.com","bad.example"}
+# Suffix-matched on the address's domain: "x@mail.evil.com" is flagged, "x@notevil.com" is not
+SUSP_INDEX = DomainReputation.from_lists(block=SUSP)
 
 for m in [x.strip() for x in mails]:
-    risk = 0.3 + 0.5 * (any(d in m for d in SUSP)) + random.uniform(0, 0.2)
+    risk = 0.3 + 0.5 * SUSP_INDEX.is_blocked(m) + random.uniform(0, 0.2)
     status = "Compromised" if risk > 0.7 else "Safe"
     print("Email:", m, "| Risk:", round(risk, 2), "| Status:", status)
 
@@ -0,0 +1,262 @@
+# vuln_ast.py
+# -------------------------------------------------------------
+# AST-based vulnerability checks for Python source
+# -------------------------------------------------------------
+# Each file is parsed once with `ast` and every check runs as a method of
+# one NodeVisitor, so a single walk over the tree covers them all.  Working
+# on syntax instead of text means comments, docstrings and string literals
+# never trigger a finding, method calls such as model.eval() are not
+# mistaken for the builtin, and nothing can backtrack on a long line.
+#
+# Checks (reported under the same names as vuln_engine.VULNERABILITY_RULES):
+#   Use of eval() / Use of exec()  calls to the builtins
+#   Command injection risk         a non-constant command run through a shell
+#                                  (os.system, os.popen, subprocess with
+#                                  shell=True or a command string built in place)
+#   SQL Injection risk             SQL text built with +, %, .format() or an
+#                                  f-string from non-constant values
+#   Hardcoded password             string literals assigned to, passed as, or
+#                                  compared with credential-like names
+#
+# Parsing dominates the cost, so a file is only parsed when its text holds
+# one of the words some check needs (TRIGGERS); most files skip ast entirely.
+#
+# analyze_python() raises SyntaxError for code that doesn't parse (e.g.
+# Python 2); vuln_engine falls back to the regex rules for those files.
+import ast
+import re
+
+# Bump when a check changes, so cached findings are invalidated.
+AST_VERSION = 1
+
+BUILTIN_CALLS = {"eval": "Use of eval()", "exec": "Use of exec()",
+                 "builtins.eval": "Use of eval()", "builtins.exec": "Use of exec()"}
+# always run their command through a shell
+SHELL_CALLS = frozenset({"os.system", "os.popen", "subprocess.getoutput", "subprocess.getstatusoutput"})
+# use a shell only with shell=True; otherwise an argument list can't be injected into
+SUBPROCESS_CALLS = frozenset({"subprocess.Popen", "subprocess.call", "subprocess.run",
+                              "subprocess.check_call", "subprocess.check_output"})
+SQL_TEXT = re.compile(r"\b(SELECT\b.+\bFROM|INSERT\s+INTO|UPDATE\b.+\bSET|DELETE\s+FROM)\b",
+                      re.IGNORECASE | re.DOTALL)
+IDENTIFIER = re.compile(r"^[A-Za-z_][\w.-]*$")  # config-style keys, not prose
+CREDENTIAL_NAME = re.compile(r"passw(or)?d|\bpwd\b|_pwd$|^pwd|secret|api_?key|access_?key|"
+                             r"private_?key|auth_?token|credential", re.IGNORECASE)
+# Any finding needs one of these words in the source text.
+TRIGGERS = re.compile(r"\b(?:eval|exec|subprocess|system|popen|getoutput|getstatusoutput)\b|"
+                      r"\bselect\b|\binsert\s+into\b|\bupdate\s+\w+\s+set\b|\bdelete\s+from\b|"
+                      + CREDENTIAL_NAME.pattern, re.IGNORECASE)
+
+
+# ---------------- Helpers ----------------
+def _is_str(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
+
+
+def _is_constant(node):
+    """Literal command: a constant, or a list/tuple of constants."""
+    if isinstance(node, ast.Constant):
+        return True
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return all(isinstance(e, ast.Constant) for e in node.elts)
+    return False
+
+
+def _target_name(node):
+    """Name a value is bound to: x, obj.x, d["x"] -> "x"; None otherwise."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript) and _is_str(node.slice) and IDENTIFIER.match(node.slice.value):
+        return node.slice.value
+    return None
+
+
+def _is_built_string(node):
+    """A string assembled in place: concatenation, % formatting, f-string or .format()."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        return True
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(v, ast.FormattedValue) for v in node.values)
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "format")
+
+
+def _add_operands(node):
+    """Operands of a chain of + (a + b + c -> [a, b, c])."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _add_operands(node.left) + _add_operands(node.right)
+    return [node]
+
+
+# ---------------- Checks ----------------
+class _Checks(ast.NodeVisitor):
+    def __init__(self):
+        self.findings = []  # (node, rule)
+        self.aliases = {}  # local name -> dotted import path
+
+    def report(self, node, rule):
+        self.findings.append((node, rule))
+
+    def qualified(self, node):
+        """Dotted name of a call target, with import aliases resolved (os.system, sp.run -> subprocess.run)."""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(self.aliases.get(node.id, node.id))
+        return ".".join(reversed(parts))
+
+    # imports, for alias resolution
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                top = alias.name.split(".", 1)[0]
+                self.aliases[top] = top
+
+    def visit_ImportFrom(self, node):
+        if node.module and not node.level:
+            for alias in node.names:
+                self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    # eval/exec, command injection, SQL via str.format
+    def visit_Call(self, node):
+        name = self.qualified(node.func)
+        if name in BUILTIN_CALLS:
+            self.report(node, BUILTIN_CALLS[name])
+        elif name in SHELL_CALLS or name in SUBPROCESS_CALLS:
+            command = node.args[0] if node.args else next(
+                (kw.value for kw in node.keywords if kw.arg in ("args", "cmd", "command")), None)
+            shell = name in SHELL_CALLS or any(
+                kw.arg == "shell" and not (isinstance(kw.value, ast.Constant) and not kw.value.value)
+                for kw in node.keywords)
+            if command is not None and not _is_constant(command) and (shell or _is_built_string(command)):
+                self.report(node, "Command injection risk")
+        if (isinstance(node.func, ast.Attribute) and node.func.attr == "format"
+                and _is_str(node.func.value) and SQL_TEXT.search(node.func.value.value)
+                and not all(_is_constant(a) for a in node.args + [kw.value for kw in node.keywords])):
+            self.report(node, "SQL Injection risk")
+        for kw in node.keywords:
+            if kw.arg and CREDENTIAL_NAME.search(kw.arg) and _is_str(kw.value) and kw.value.value:
+                self.report(kw.value, "Hardcoded password")
+        self.generic_visit(node)
+
+    # string-built SQL
+    def visit_BinOp(self, node):
+        if isinstance(node.op, ast.Add):
+            operands = _add_operands(node)
+            if (any(_is_str(o) and SQL_TEXT.search(o.value) for o in operands)
+                    and not all(isinstance(o, ast.Constant) for o in operands)):
+                self.report(node, "SQL Injection risk")
+            for operand in operands:  # the chain itself is reported once
+                self.visit(operand)
+            return
+        if (isinstance(node.op, ast.Mod) and _is_str(node.left) and SQL_TEXT.search(node.left.value)
+                and not _is_constant(node.right)):
+            self.report(node, "SQL Injection risk")
+        self.generic_visit(node)
+
+    def visit_JoinedStr(self, node):
+        text = "".join(v.value for v in node.values if _is_str(v))
+        if SQL_TEXT.search(text) and any(isinstance(v, ast.FormattedValue) for v in node.values):
+            self.report(node, "SQL Injection risk")
+        self.generic_visit(node)
+
+    # hardcoded credentials
+    def _check_binding(self, target, value):
+        name = _target_name(target)
+        if name and CREDENTIAL_NAME.search(name) and _is_str(value) and value.value:
+            self.report(value, "Hardcoded password")
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, (ast.Tuple, ast.List)) and isinstance(node.value, (ast.Tuple, ast.List)):
+                for t, v in zip(target.elts, node.value.elts):
+                    self._check_binding(t, v)
+            else:
+                self._check_binding(target, node.value)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self._check_binding(node.target, node.value)
+        self.generic_visit(node)
+
+    def visit_Dict(self, node):
+        for key, value in zip(node.keys, node.values):
+            if (_is_str(key) and IDENTIFIER.match(key.value) and CREDENTIAL_NAME.search(key.value)
+                    and _is_str(value) and value.value):
+                self.report(value, "Hardcoded password")
+        self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        if len(node.ops) == 1 and isinstance(node.ops[0], (ast.Eq, ast.NotEq)):
+            left, right = node.left, node.comparators[0]
+            for name_node, value in ((left, right), (right, left)):
+                name = _target_name(name_node)
+                if name and CREDENTIAL_NAME.search(name) and _is_str(value) and value.value:
+                    self.report(node, "Hardcoded password")
+                    break
+        self.generic_visit(node)
+
+    def _check_defaults(self, args):
+        positional = args.posonlyargs + args.args
+        for arg, default in zip(positional[len(positional) - len(args.defaults):], args.defaults):
+            self._check_binding(ast.Name(arg.arg), default)
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+            if default is not None:
+                self._check_binding(ast.Name(arg.arg), default)
+
+    def visit_FunctionDef(self, node):
+        self._check_defaults(node.args)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._check_defaults(node.args)
+        self.generic_visit(node)
+
+
+# ---------------- Analysis ----------------
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")  # the line breaks ast counts (str.splitlines knows more)
+
+
+def _char_column(line, byte_offset):
+    """ast column offsets count UTF-8 bytes; convert to characters."""
+    if line.isascii():
+        return byte_offset
+    return len(line.encode("utf-8")[:byte_offset].decode("utf-8", errors="ignore"))
+
+
+def analyze_python(code, filename="<source>"):
+    """
+    Findings in Python source as (line, column, end, rule, code) tuples, the
+    same layout as vuln_engine.Finding: one per (line, rule), first span,
+    sorted by line.  Raises SyntaxError if the code does not parse (unless no
+    check could fire on it, in which case it is not parsed at all).
+    """
+    if not TRIGGERS.search(code):
+        return []
+    tree = ast.parse(code, filename)
+    checks = _Checks()
+    checks.visit(tree)
+    lines = _LINE_BREAK.split(code)
+    seen = set()
+    findings = []
+    for node, rule in sorted(checks.findings, key=lambda f: (f[0].lineno, f[0].col_offset)):
+        if (node.lineno, rule) in seen:
+            continue
+        seen.add((node.lineno, rule))
+        line = lines[node.lineno - 1] if node.lineno <= len(lines) else ""
+        column = _char_column(line, node.col_offset) + 1
+        if node.end_lineno == node.lineno:
+            end = _char_column(line, node.end_col_offset) + 1
+        else:
+            end = len(line.rstrip()) + 1
+        findings.append((node.lineno, column, end, rule, line.strip()))
+    return findings
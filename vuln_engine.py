@@ -0,0 +1,481 @@
+# vuln_engine.py
+# -------------------------------------------------------------
+# Headless vulnerability scanning engine used by vulnerability.py
+# -------------------------------------------------------------
+# The ruleset is compiled once into a single alternation that is run over
+# the whole file: one C-level regex pass finds the next line holding any
+# match, and only those lines are re-checked rule by rule to label the
+# findings and their column spans.  Lines that match nothing (nearly all of
+# them) cost no Python work at all.  Findings are identical to the old
+# per-line, per-rule loop: at most one per (line, rule), first match span,
+# with lines split and numbered as str.splitlines() does.
+#
+# Python files are analyzed on their syntax tree instead (vuln_ast.py), which
+# avoids the regex false positives on comments and strings; files that don't
+# parse fall back to the regex rules.
+#
+# Very large inputs can be scanned as a stream instead: lines are read with a
+# bounded readline, lines longer than MAX_SCAN_CHARS are cut into overlapping
+# segments so no single regex call sees more than that, and findings are
+# yielded chunk by chunk.
+#
+# Directory mode walks a tree and scans files in batches on a process pool,
+# yielding results in a stable order with a bounded number of batches in
+# flight, so 100k-file repositories stream through in constant memory.
+#
+#   python vuln_engine.py src/ --workers 8 --format jsonl --out findings.jsonl
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+from scan_cache import ruleset_version
+from vuln_ast import AST_VERSION, analyze_python
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# ---------------- Vulnerability Rules ----------------
+VULNERABILITY_RULES = {
+    "Use of eval()": r"\beval\(",
+    "Use of exec()": r"\bexec\(",
+    "Hardcoded password": r"password\s*=\s*[\"'].*[\"']",
+    "SQL Injection risk": r"(SELECT|INSERT|UPDATE|DELETE).*\+.*",
+    "Command injection risk": r"(os\.system|subprocess\.Popen|os\.popen)\(",
+    "Insecure function (C)": r"\bgets\(",
+}
+
+FINDING_FIELDS = ("Line", "Column", "End", "Vulnerability", "Code")
+# Covers the rules, the Python checks and the finding layout; cached results
+# keyed on it go stale automatically when any of them changes.
+RULESET_VERSION = ruleset_version(VULNERABILITY_RULES, FINDING_FIELDS, AST_VERSION)
+
+PYTHON_EXTENSIONS = (".py", ".pyw")
+SOURCE_EXTENSIONS = (".py", ".java", ".c", ".cpp", ".h", ".hpp", ".js", ".ts")
+EXCLUDE_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+                          ".tox", ".mypy_cache", "build", "dist"})
+MAX_FILE_BYTES = 10 * 1024 * 1024
+BATCH_FILES = 128
+
+MAX_SCAN_CHARS = 4096  # longest text one regex call sees in a streaming scan
+SEGMENT_OVERLAP = 256  # shared by consecutive segments of a long line
+STREAM_CHUNK_LINES = 10_000
+PREVIEW_CHARS = 240  # Code shown for a finding on a long line
+CONTEXT_LINES = 3
+
+
+def _first_chars(items):
+    """
+    (characters a match can start with, whether it can match empty) for a
+    parsed pattern; characters is None when they can't be enumerated.
+    """
+    chars = set()
+    for op, av in items:
+        name = str(op)
+        if name == "AT":  # \b, ^, $: zero width
+            continue
+        if name == "LITERAL":
+            return chars | {chr(av)}, False
+        if name == "IN":
+            for set_op, value in av:
+                if str(set_op) == "LITERAL":
+                    chars.add(chr(value))
+                elif str(set_op) == "RANGE" and value[1] - value[0] < 256:
+                    chars.update(map(chr, range(value[0], value[1] + 1)))
+                else:
+                    return None, False
+            return chars, False
+        if name == "SUBPATTERN":
+            if av[1] & sre_parse.SRE_FLAG_IGNORECASE:
+                return None, False
+            sub, nullable = _first_chars(av[3])
+        elif name == "BRANCH":
+            sub, nullable = set(), False
+            for branch in av[1]:
+                first, empty = _first_chars(branch)
+                if first is None:
+                    return None, False
+                sub |= first
+                nullable = nullable or empty
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            sub, nullable = _first_chars(av[2])
+            nullable = nullable or av[0] == 0
+        else:
+            return None, False
+        if sub is None:
+            return None, False
+        chars |= sub
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def compile_rules(rules):
+    """
+    (combined prefilter regex, [(rule, compiled regex)]) for a {rule: pattern}
+    dict.  When every rule's possible first characters are known, the
+    alternation is guarded by a lookahead on their union, which lets the
+    regex engine skip most positions without trying each branch.
+    """
+    compiled = [(rule, re.compile(pattern)) for rule, pattern in rules.items()]
+    combined = "|".join(f"(?:{pattern})" for pattern in rules.values())
+    first = set()
+    for pattern in rules.values():
+        parsed = sre_parse.parse(pattern)
+        chars, nullable = _first_chars(parsed)
+        if chars is None or nullable or parsed.state.flags & sre_parse.SRE_FLAG_IGNORECASE:
+            first = None
+            break
+        first |= chars
+    if first:
+        combined = f"(?=[{''.join(re.escape(c) for c in sorted(first))}])(?:{combined})"
+    # MULTILINE so ^/$ behave as they do on a single line
+    return re.compile(combined, re.MULTILINE), compiled
+
+
+_COMBINED, _COMPILED = compile_rules(VULNERABILITY_RULES)
+
+# line breaks str.splitlines() honours besides "\n" and "\r\n"
+_OTHER_BREAKS = re.compile("\r(?!\n)|[\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+# ---------------- Matching ----------------
+class Finding(NamedTuple):
+    line: int
+    column: int  # 1-based, inclusive
+    end: int  # 1-based, exclusive
+    rule: str
+    code: str
+
+    def to_record(self):
+        return dict(zip(FINDING_FIELDS, (self.line, self.column, self.end, self.rule, self.code)))
+
+
+def _match_line(findings, line_no, line, compiled):
+    for rule, regex in compiled:
+        hit = regex.search(line)
+        if hit is not None:
+            findings.append(Finding(line_no, hit.start() + 1, hit.end() + 1, rule, line.strip()))
+
+
+def find_vulnerabilities(code, combined=_COMBINED, compiled=_COMPILED):
+    """Every finding in a source string, in line order (rules in ruleset order within a line)."""
+    findings = []
+    search = combined.search
+    if _OTHER_BREAKS.search(code):  # rare ("\r"-only files, form feeds...): split like splitlines()
+        for line_no, line in enumerate(code.splitlines(), start=1):
+            if search(line) is not None:
+                _match_line(findings, line_no, line, compiled)
+        return findings
+    line_no, line_start = 1, 0  # number and offset of the line the search resumes on
+    m = search(code)
+    while m is not None:
+        start = m.start()
+        line_no += code.count("\n", line_start, start)
+        line_start = code.rfind("\n", 0, start) + 1
+        line_end = code.find("\n", start)
+        if line_end < 0:
+            line_end = len(code)
+        line = code[line_start:line_end]
+        if line.endswith("\r"):
+            line = line[:-1]
+        _match_line(findings, line_no, line, compiled)
+        # a match may run past the end of its line; resume on the next one
+        if line_end >= len(code):
+            break
+        line_no += 1
+        line_start = line_end + 1
+        m = search(code, line_start)
+    return findings
+
+
+def analyzer_for(path, python_ast=True):
+    """Which analyzer analyze_source() uses for a file name: "python-ast" or "regex"."""
+    if python_ast and path and path.lower().endswith(PYTHON_EXTENSIONS):
+        return "python-ast"
+    return "regex"
+
+
+def analyze_source(code, path=None, python_ast=True):
+    """Findings for a source string: AST checks for Python files that parse, regex rules otherwise."""
+    if analyzer_for(path, python_ast) == "python-ast":
+        try:
+            return [Finding(*f) for f in analyze_python(code, path)]
+        except (SyntaxError, ValueError, RecursionError):
+            pass
+    return find_vulnerabilities(code)
+
+
+def scan_code(code, filename=None):
+    """Findings for a source string as table records (see FINDING_FIELDS)."""
+    return [f.to_record() for f in analyze_source(code, filename)]
+
+
+# ---------------- Streaming ----------------
+def _iter_segments(stream, max_scan=MAX_SCAN_CHARS, overlap=SEGMENT_OVERLAP):
+    """
+    (line number, column offset, text) pieces of a binary stream, at most
+    `max_scan` bytes each plus `overlap` characters carried over from the
+    previous piece of the same line.  Never holds more than one piece.
+    """
+    line_no, offset, tail = 1, 0, ""
+    while True:
+        raw = stream.readline(max_scan)
+        if not raw:
+            return
+        ended = raw.endswith(b"\n")
+        piece = raw.decode("utf-8", errors="replace")
+        text = tail + (piece.rstrip("\r\n") if ended else piece)
+        yield line_no, offset - len(tail), text
+        if ended:
+            line_no, offset, tail = line_no + 1, 0, ""
+        else:
+            offset += len(piece)
+            tail = text[-overlap:] if overlap else ""
+
+
+def _preview(text, column):
+    """The Code shown for a finding: the stripped line, or a window around the match on a long line."""
+    if len(text) <= PREVIEW_CHARS:
+        return text.strip()
+    start = max(column - 1 - PREVIEW_CHARS // 4, 0)
+    window = text[start:start + PREVIEW_CHARS].strip()
+    return ("…" if start else "") + window + ("…" if start + PREVIEW_CHARS < len(text) else "")
+
+
+def iter_stream_findings(stream, chunk_lines=STREAM_CHUNK_LINES, max_scan=MAX_SCAN_CHARS):
+    """
+    Scan a binary stream with the regex rules in constant memory, yielding
+    (lines read so far, [Finding]) after every `chunk_lines` segments.
+    Matches on lines up to `max_scan` characters are the same as
+    find_vulnerabilities(); longer lines are scanned segment by segment, so
+    a match longer than SEGMENT_OVERLAP across a segment boundary can be missed.
+    """
+    segments = _iter_segments(stream, max_scan)
+    last_line, seen = 0, set()
+    while True:
+        chunk = list(itertools.islice(segments, chunk_lines))
+        if not chunk:
+            return
+        findings = []
+        for f in find_vulnerabilities("\n".join(text for _, _, text in chunk)):
+            line_no, offset, text = chunk[f.line - 1]
+            if line_no != last_line:
+                last_line, seen = line_no, set()
+            if f.rule in seen:  # one finding per (line, rule), as in find_vulnerabilities
+                continue
+            seen.add(f.rule)
+            findings.append(Finding(line_no, f.column + offset, f.end + offset, f.rule,
+                                    _preview(text, f.column)))
+        yield chunk[-1][0], findings
+
+
+def flagged_regions(findings, context=CONTEXT_LINES):
+    """
+    Merged line windows around findings: [(first line, last line, [Finding])],
+    `context` lines either side, in line order.
+    """
+    regions = []
+    for f in sorted(findings, key=lambda f: f.line):
+        first, last = max(f.line - context, 1), f.line + context
+        if regions and first <= regions[-1][1] + 1:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], last), regions[-1][2] + [f])
+        else:
+            regions.append((first, last, [f]))
+    return regions
+
+
+def iter_display_lines(stream, max_chars=PREVIEW_CHARS * 2):
+    """Lines of a binary stream for display, cut to `max_chars` (the rest of a long line is skipped, not kept)."""
+    shown = None
+    for _, offset, text in _iter_segments(stream, max_chars, overlap=0):
+        if offset == 0:
+            if shown is not None:
+                yield shown
+            shown = text
+        elif not shown.endswith("…"):
+            shown += " …"
+    if shown is not None:
+        yield shown
+
+
+def region_lines(lines, regions):
+    """
+    [[(line number, text)] per region] from an iterable of text lines,
+    keeping only the lines the regions cover and stopping after the last.
+    """
+    out = [[] for _ in regions]
+    if not regions:
+        return out
+    end = max(last for _, last, _ in regions)
+    for line_no, text in enumerate(lines, start=1):
+        if line_no > end:
+            break
+        for i, (first, last, _) in enumerate(regions):
+            if first <= line_no <= last:
+                out[i].append((line_no, text))
+    return out
+
+
+# ---------------- Files ----------------
+@dataclass
+class FileResult:
+    path: str
+    findings: list = field(default_factory=list)
+    size: int = 0
+    skipped: str = ""  # reason the file was not scanned ("binary", "too large", an OS error)
+
+
+def decode_source(data):
+    """Source bytes as text: UTF-8, falling back to latin-1."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def scan_file(path, max_bytes=MAX_FILE_BYTES, python_ast=True):
+    """FileResult for one file; binary and oversized files are skipped, not scanned."""
+    try:
+        size = os.path.getsize(path)
+        if size > max_bytes:
+            return FileResult(path, size=size, skipped="too large")
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return FileResult(path, skipped=f"{type(e).__name__}: {e.strerror or e}")
+    if b"\0" in data[:8192]:
+        return FileResult(path, size=size, skipped="binary")
+    return FileResult(path, analyze_source(decode_source(data), path, python_ast), size)
+
+
+def _scan_batch(batch):
+    """Worker entry point: (paths, max_bytes, python_ast) -> [FileResult]."""
+    paths, max_bytes, python_ast = batch
+    return [scan_file(path, max_bytes, python_ast) for path in paths]
+
+
+def iter_source_files(root, extensions=SOURCE_EXTENSIONS, exclude_dirs=EXCLUDE_DIRS):
+    """Paths of source files under `root` (or `root` itself if it is a file), in sorted walk order."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in exclude_dirs)
+        for name in sorted(filenames):
+            if extensions is None or name.lower().endswith(extensions):
+                yield os.path.join(dirpath, name)
+
+
+def _batches(paths, size, max_bytes, python_ast):
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) >= size:
+            yield batch, max_bytes, python_ast
+            batch = []
+    if batch:
+        yield batch, max_bytes, python_ast
+
+
+def scan_paths(paths, workers=1, batch_files=BATCH_FILES, max_bytes=MAX_FILE_BYTES, python_ast=True):
+    """
+    Yield a FileResult per path, in input order.  Paths are scanned in
+    batches of `batch_files` on `workers` processes, keeping at most
+    2 x workers batches in flight so arbitrarily long path streams are fine.
+    """
+    batches = _batches(paths, batch_files, max_bytes, python_ast)
+    if workers <= 1:
+        for batch in batches:
+            yield from _scan_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for batch in batches:
+                pending.append(pool.submit(_scan_batch, batch))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def scan_tree(root, workers=1, extensions=SOURCE_EXTENSIONS, **kwargs):
+    """scan_paths() over every source file under `root`."""
+    return scan_paths(iter_source_files(root, extensions), workers, **kwargs)
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+# ---------------- Output ----------------
+def write_findings(out, fmt, result):
+    """Write one FileResult's findings to a text stream as JSONL or path:line:col text."""
+    for f in result.findings:
+        if fmt == "jsonl":
+            out.write(json.dumps({"Path": result.path, **f.to_record()}) + "\n")
+        else:
+            out.write(f"{result.path}:{f.line}:{f.column}: {f.rule}: {f.code}\n")
+
+
+def parse_extensions(ext):
+    """--ext value -> extensions tuple for iter_source_files ("all" -> None)."""
+    if ext == "all":
+        return None
+    if ext:
+        return tuple(e if e.startswith(".") else f".{e}" for e in ext.lower().split(","))
+    return SOURCE_EXTENSIONS
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan source files or directory trees for vulnerabilities.")
+    parser.add_argument("paths", nargs="+", help="files or directories to scan")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="processes (1 = serial)")
+    parser.add_argument("--ext", help="comma-separated extensions to scan "
+                                      f"(default: {','.join(SOURCE_EXTENSIONS)}; 'all' for every file)")
+    parser.add_argument("--max-bytes", type=int, default=MAX_FILE_BYTES, help="skip larger files")
+    parser.add_argument("--no-ast", action="store_true", help="use the regex rules for Python files too")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text")
+    parser.add_argument("--out", help="write findings here instead of stdout")
+    parser.add_argument("--exit-zero", action="store_true", help="exit 0 even when findings are reported")
+    args = parser.parse_args(argv)
+
+    extensions = parse_extensions(args.ext)
+    paths = (path for root in args.paths for path in iter_source_files(root, extensions))
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    files = findings = skipped = size = 0
+    start = time.perf_counter()
+    try:
+        for result in scan_paths(paths, args.workers, max_bytes=args.max_bytes,
+                                 python_ast=not args.no_ast):
+            files += 1
+            findings += len(result.findings)
+            skipped += bool(result.skipped)
+            size += result.size
+            write_findings(out, args.format, result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"scanned {files:,} files ({size / 1e6:,.1f} MB, {skipped:,} skipped) in {elapsed:.2f} s "
+          f"— {files / max(elapsed, 1e-9):,.0f} files/s; {findings:,} findings", file=sys.stderr)
+    return 1 if findings and not args.exit_zero else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
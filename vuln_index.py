@@ -0,0 +1,230 @@
+# vuln_index.py
+# -------------------------------------------------------------
+# Incremental vulnerability scanning with a persistent per-file index
+# -------------------------------------------------------------
+# The index maps every scanned file to its content id (a git blob id, so it
+# can come straight from `git ls-files -s`) and keeps the findings per
+# content id and analyzer.  On the next run only files whose content id is new are
+# scanned; everything else reuses the stored findings.  Content ids are
+# found without reading files wherever possible:
+#
+#   1. clean tracked files in a git work tree: the blob id from the git index
+#   2. files whose size and mtime match the previous run: the stored id
+#   3. anything else: hashed here (same algorithm as `git hash-object`)
+#
+# The index records the ruleset version (vuln_engine.RULESET_VERSION); when
+# VULNERABILITY_RULES changes, the old index is discarded and everything is
+# rescanned.  Findings are keyed by content, so renamed, moved or copied
+# files are never rescanned either.
+#
+#   python vuln_index.py . --index .vuln_index.pkl --workers 8
+import argparse
+import hashlib
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+from vuln_engine import (MAX_FILE_BYTES, RULESET_VERSION, SOURCE_EXTENSIONS, FileResult,
+                         analyzer_for, default_workers, iter_source_files, parse_extensions,
+                         scan_paths, write_findings)
+
+INDEX_PATH = os.environ.get("VULN_INDEX", ".vuln_index.pkl")
+INDEX_FORMAT = 2
+BLOCK_SIZE = 1024 * 1024
+# mtimes this close to the previous save can't be trusted (the file may have
+# changed again within the same timestamp tick), as with git's racy-clean check
+RACY_NS = 2_000_000_000
+
+
+# ---------------- Content ids ----------------
+def blob_id(path):
+    """Git blob id (SHA-1 of "blob <size>\\0" + content) of a file."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        h.update(b"blob %d\0" % os.fstat(f.fileno()).st_size)
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _git(root, *args):
+    return subprocess.run(["git", "-C", root, *args], capture_output=True, check=True).stdout
+
+
+def git_blob_ids(root):
+    """
+    {path relative to root: blob id} for tracked files whose work-tree copy
+    matches the git index; {} when `root` is not inside a git work tree.
+    """
+    try:
+        staged = _git(root, "ls-files", "--stage", "-z")
+        modified = set(_git(root, "ls-files", "--modified", "-z").split(b"\0"))
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    blobs = {}
+    for record in staged.split(b"\0"):
+        if not record:
+            continue
+        info, _, name = record.partition(b"\t")
+        mode, blob, stage = info.split()
+        if stage == b"0" and mode.startswith(b"100") and name not in modified:
+            blobs[os.path.normpath(os.fsdecode(name))] = blob.decode("ascii")
+    return blobs
+
+
+# ---------------- Index ----------------
+@dataclass
+class IndexStats:
+    files: int = 0
+    scanned: int = 0
+    reused: int = 0
+    hashed: int = 0
+    findings: int = 0
+    seconds: float = 0.0
+
+
+class ScanIndex:
+    """
+    Persistent {path: (size, mtime_ns, content id)} and
+    {(content id, analyzer): findings} tables for one tree.  load() discards an index written for another
+    ruleset version, format or root.
+    """
+
+    def __init__(self, root, version=RULESET_VERSION):
+        self.path = root  # as given, so reported paths look like vuln_engine's
+        self.root = os.path.abspath(root)
+        self.version = version
+        self.files = {}
+        self.findings = {}
+        self.saved_ns = 0
+
+    @classmethod
+    def load(cls, path, root, version=RULESET_VERSION):
+        index = cls(root, version)
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return index
+        if (isinstance(state, dict) and state.get("format") == INDEX_FORMAT
+                and state.get("version") == version and state.get("root") == index.root):
+            index.files = state["files"]
+            index.findings = state["findings"]
+            index.saved_ns = state["saved_ns"]
+        return index
+
+    def save(self, path):
+        """Write the index atomically."""
+        state = {"format": INDEX_FORMAT, "version": self.version, "root": self.root,
+                 "saved_ns": time.time_ns(), "files": self.files, "findings": self.findings}
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _content_id(self, rel, path, st, git_blobs, stats):
+        blob = git_blobs.get(rel)
+        if blob is not None:
+            return blob
+        entry = self.files.get(rel)
+        if (entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns
+                and st.st_mtime_ns < self.saved_ns - RACY_NS):
+            return entry[2]
+        stats.hashed += 1
+        return blob_id(path)
+
+    def update(self, extensions=SOURCE_EXTENSIONS, workers=1, max_bytes=MAX_FILE_BYTES, use_git=True,
+               python_ast=True):
+        """
+        Bring the index up to date with the tree and return
+        ([FileResult] for every source file in walk order, IndexStats).
+        Files that vanished are dropped, along with findings no file refers to.
+        """
+        start = time.perf_counter()
+        stats = IndexStats()
+        git_blobs = git_blob_ids(self.path) if use_git else {}
+        files, results, pending = {}, [], {}
+        for path in iter_source_files(self.path, extensions):
+            rel = os.path.relpath(path, self.path)
+            try:
+                st = os.stat(path)
+                if st.st_size > max_bytes:
+                    results.append(FileResult(path, size=st.st_size, skipped="too large"))
+                    continue
+                blob = self._content_id(rel, path, st, git_blobs, stats)
+            except OSError as e:
+                results.append(FileResult(path, skipped=f"{type(e).__name__}: {e.strerror or e}"))
+                continue
+            files[rel] = (st.st_size, st.st_mtime_ns, blob)
+            key = (blob, analyzer_for(path, python_ast))
+            if key not in self.findings:
+                pending.setdefault(key, path)
+            results.append((path, st.st_size, key))
+
+        for result in scan_paths(pending.values(), workers, max_bytes=max_bytes, python_ast=python_ast):
+            blob = files[os.path.relpath(result.path, self.path)][2]
+            self.findings[blob, analyzer_for(result.path, python_ast)] = (result.findings, result.skipped)
+        stats.scanned = len(pending)
+
+        out = []
+        for item in results:
+            if isinstance(item, FileResult):
+                out.append(item)
+                continue
+            path, size, key = item
+            findings, skipped = self.findings[key]
+            out.append(FileResult(path, findings, size, skipped))
+            stats.findings += len(findings)
+        live = {item[2] for item in results if not isinstance(item, FileResult)}
+        self.findings = {key: value for key, value in self.findings.items() if key in live}
+        self.files = files
+        stats.files = len(out)
+        stats.reused = stats.files - stats.scanned
+        stats.seconds = time.perf_counter() - start
+        return out, stats
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally scan a source tree for vulnerabilities.")
+    parser.add_argument("root", nargs="?", default=".", help="tree to scan")
+    parser.add_argument("--index", default=INDEX_PATH, help="index file (created if missing)")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="processes (1 = serial)")
+    parser.add_argument("--ext", help="comma-separated extensions to scan ('all' for every file)")
+    parser.add_argument("--max-bytes", type=int, default=MAX_FILE_BYTES, help="skip larger files")
+    parser.add_argument("--no-git", action="store_true", help="don't take content ids from the git index")
+    parser.add_argument("--no-ast", action="store_true", help="use the regex rules for Python files too")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text")
+    parser.add_argument("--out", help="write findings here instead of stdout")
+    parser.add_argument("--exit-zero", action="store_true", help="exit 0 even when findings are reported")
+    args = parser.parse_args(argv)
+
+    index = ScanIndex.load(args.index, args.root)
+    results, stats = index.update(parse_extensions(args.ext), args.workers, args.max_bytes,
+                                  use_git=not args.no_git, python_ast=not args.no_ast)
+    index.save(args.index)
+
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    try:
+        for result in results:
+            write_findings(out, args.format, result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{stats.files:,} files: {stats.scanned:,} scanned, {stats.reused:,} reused from the index "
+          f"({stats.hashed:,} hashed) in {stats.seconds:.2f} s; {stats.findings:,} findings",
+          file=sys.stderr)
+    return 1 if stats.findings and not args.exit_zero else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,75 @@
+import io
+
 import streamlit as st
-import re
-
-# ---------------- Vulnerability Rules ----------------
-VULNERABILITY_RULES = {
-    "Use of eval()": r"\beval\(",
-    "Use of exec()": r"\bexec\(",
-    "Hardcoded password": r"password\s*=\s*[\"'].*[\"']",
-    "SQL Injection risk": r"(SELECT|INSERT|UPDATE|DELETE).*\+.*",
-    "Command injection risk": r"(os\.system|subprocess\.Popen|os\.popen)\(",
-    "Insecure function (C)": r"\bgets\(",
-}
-
-# ---------------- Scan Function ----------------
-def scan_code(code):
-    results = []
-    lines = code.splitlines()
-    for i, line in enumerate(lines, start=1):
-        for vuln, pattern in VULNERABILITY_RULES.items():
-            if re.search(pattern, line):
-                results.append({
-                    "Line": i,
-                    "Vulnerability": vuln,
-                    "Code": line.strip()
-                })
-    return results
+
+from scan_cache import ScanCache, content_hash
+from vuln_engine import (RULESET_VERSION, analyze_source, analyzer_for, decode_source, flagged_regions,
+                         iter_display_lines, iter_stream_findings, region_lines)
+
+REGIONS_PER_PAGE = 10
+AST_MAX_BYTES = 2 * 1024 * 1024  # larger .py uploads are streamed through the regex rules
+
+# ---------------- Cached Scan ----------------
+# Same code + same ruleset -> previous findings straight from the on-disk cache
+scan_cache = ScanCache("vuln-findings", RULESET_VERSION)
+
+def cached_scan_code(code, filename=None):
+    # .py uploads get the AST analyzer, so the analyzer is part of the key
+    digest = f"{content_hash(code)}-{analyzer_for(filename)}"
+    return scan_cache.get_or_compute(digest, lambda: analyze_source(code, filename))
+
+def scan_upload(uploaded_file):
+    """Findings for an upload: cached, AST-analyzed (small .py files) or streamed with live progress."""
+    use_ast = analyzer_for(uploaded_file.name) == "python-ast" and uploaded_file.size <= AST_MAX_BYTES
+    digest = f"{content_hash(uploaded_file)}-{'python-ast' if use_ast else 'stream'}"
+    findings = scan_cache.get(digest)
+    if findings is not None:
+        return findings
+    if use_ast:
+        findings = analyze_source(decode_source(uploaded_file.getvalue()), uploaded_file.name)
+    else:
+        progress = st.progress(0.0)
+        status = st.empty()
+        findings = []
+        for lines, batch in iter_stream_findings(uploaded_file):
+            findings.extend(batch)
+            progress.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0))
+            status.write(f"{lines:,} lines scanned — {len(findings):,} findings so far")
+        progress.progress(1.0)
+        uploaded_file.seek(0)
+    scan_cache.put(digest, findings)
+    return findings
+
+# ---------------- Results View ----------------
+def show_findings(findings, open_source, key):
+    """
+    Findings table plus a paginated view of the flagged regions only; the
+    source is re-read per page through open_source() (a binary stream), so
+    the whole file is never rendered.
+    """
+    if not findings:
+        st.success("✅ No obvious vulnerabilities detected!")
+        return
+    st.subheader(f"⚠️ Vulnerabilities Detected ({len(findings):,})")
+    st.dataframe([f.to_record() for f in findings], hide_index=True)
+
+    regions = flagged_regions(findings)
+    pages = (len(regions) + REGIONS_PER_PAGE - 1) // REGIONS_PER_PAGE
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Flagged regions — page (of {pages})", min_value=1, max_value=pages,
+                               value=1, step=1, key=f"{key}_page")
+    shown = regions[(page - 1) * REGIONS_PER_PAGE:page * REGIONS_PER_PAGE]
+    stream = open_source()
+    stream.seek(0)
+    for (first, last, hits), lines in zip(shown, region_lines(iter_display_lines(stream), shown)):
+        rules = ", ".join(dict.fromkeys(f.rule for f in hits))
+        if lines:
+            first, last = lines[0][0], lines[-1][0]
+        st.markdown(f"**Lines {first:,}–{last:,}** — {rules}")
+        width = len(str(last))
+        st.code("\n".join(f"{n:>{width}}  {text}" for n, text in lines), language="")
+    stream.seek(0)
 
 # ---------------- Streamlit UI ----------------
 st.set_page_config(page_title="Vulnerability Analyzer", page_icon="🔍", layout="wide")
@@ -54,15 +100,14 @@ with tab_upload:
     )
 
     if uploaded_file:
-        code_text = uploaded_file.read().decode("utf-8")
-        st.code(code_text, language="")
+        # The file is scanned as a stream; only flagged regions are ever rendered.
+        upload_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+        st.caption(f"{uploaded_file.name} — {uploaded_file.size / 1024:,.1f} KB")
         if st.button("🔍 Scan Uploaded Code", key="scan_file_button"):
-            results = scan_code(code_text)
-            if results:
-                st.subheader("⚠️ Vulnerabilities Detected")
-                st.table(results)
-            else:
-                st.success("✅ No obvious vulnerabilities detected!")
+            st.session_state["scanned_upload"] = upload_id
+        if st.session_state.get("scanned_upload") == upload_id:
+            findings = scan_upload(uploaded_file)
+            show_findings(findings, lambda: uploaded_file, key="upload")
 
 # -------- Paste Code Tab --------
 with tab_paste:
@@ -73,12 +118,10 @@ with tab_paste:
         if code_text.strip() == "":
             st.warning("⚠️ Please enter code to scan.")
         else:
-            results = scan_code(code_text)
-            if results:
-                st.subheader("⚠️ Vulnerabilities Detected")
-                st.table(results)
-            else:
-                st.success("✅ No obvious vulnerabilities detected!")
+            st.session_state["scanned_paste"] = content_hash(code_text)
+    if code_text.strip() and st.session_state.get("scanned_paste") == content_hash(code_text):
+        findings = cached_scan_code(code_text)
+        show_findings(findings, lambda: io.BytesIO(code_text.encode("utf-8")), key="paste")
 
 # --- Footer ---
 st.markdown("---")